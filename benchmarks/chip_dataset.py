@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Benchmark reading semantic segmentation chips from PNGs and from shards.
+
+Run with: python -m benchmarks.chip_dataset
+"""
+import os
+from os.path import join
+import time
+
+import click
+import numpy as np
+from PIL import Image
+
+from rastervision.pipeline import rv_config
+from rastervision.pytorch_learner import ChipShardWriter, SHARD_DIR
+from rastervision.pytorch_learner.semantic_segmentation_learner import (
+    SemanticSegmentationDataset, SemanticSegmentationShardDataset)
+
+
+def time_dataset(ds, num_passes):
+    start = time.process_time()
+    for _ in range(num_passes):
+        for ind in np.random.permutation(len(ds)):
+            ds[ind]
+    return time.process_time() - start
+
+
+@click.command()
+@click.option('--chip-sz', default=256, help='Height and width of each chip.')
+@click.option('--num-chips', default=500, help='Number of chips.')
+@click.option('--num-passes', default=2, help='Number of passes over chips.')
+def main(chip_sz, num_chips, num_passes):
+    np.random.seed(1234)
+    with rv_config.get_tmp_dir() as tmp_dir:
+        png_dir = join(tmp_dir, 'png')
+        os.makedirs(join(png_dir, 'img'))
+        os.makedirs(join(png_dir, 'labels'))
+
+        def open_file(path):
+            path = join(tmp_dir, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            return open(path, 'wb')
+
+        shard_writer = ChipShardWriter(open_file, tmp_dir)
+        for i in range(num_chips):
+            img = np.random.randint(
+                0, 256, (chip_sz, chip_sz, 3), dtype=np.uint8)
+            label = np.random.randint(0, 4, (chip_sz, chip_sz), dtype=np.uint8)
+            Image.fromarray(img).save(join(png_dir, 'img', '{}.png'.format(i)))
+            Image.fromarray(label).save(
+                join(png_dir, 'labels', '{}.png'.format(i)))
+            shard_writer.write('shard', img, label)
+        shard_writer.close()
+
+        png_ds = SemanticSegmentationDataset(png_dir)
+        shard_ds = SemanticSegmentationShardDataset(
+            join(tmp_dir, 'shard', SHARD_DIR))
+        png_time = time_dataset(png_ds, num_passes)
+        shard_time = time_dataset(shard_ds, num_passes)
+        num_samples = num_chips * num_passes
+        print('png {:.0f} samples/s, shards {:.0f} samples/s, '
+              'speedup {:.1f}x'.format(num_samples / png_time,
+                                       num_samples / shard_time,
+                                       png_time / shard_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""Benchmark ObjectDetectionLabels.prune_duplicates against the previous NMS.
+
+The previous implementation compares each selected box to all remaining boxes
+in the scene, which is quadratic in the number of boxes.
+
+Run with: python -m benchmarks.object_detection_nms
+"""
+import time
+
+import click
+import numpy as np
+
+from rastervision.core.data import ObjectDetectionLabels
+from rastervision.core.data.label.tfod_utils.np_box_list_ops import (
+    non_max_suppression)
+
+
+def make_labels(num_boxes, scene_sz, box_sz, num_classes):
+    """Make labels that look like sliding window predictions of small objects.
+
+    Each object is predicted a few times with a small amount of jitter.
+    """
+    num_objects = num_boxes // 4
+    centers = np.random.uniform(0, scene_sz, (num_objects, 2))
+    centers = np.repeat(centers, 4, axis=0)[:num_boxes]
+    centers += np.random.normal(0, box_sz / 10, centers.shape)
+    sizes = np.random.uniform(box_sz / 2, box_sz, (num_boxes, 1))
+    npboxes = np.concatenate(
+        [centers - sizes / 2, centers + sizes / 2], axis=1)
+    class_ids = np.random.randint(0, num_classes, num_boxes)
+    scores = np.random.uniform(0, 1, num_boxes)
+    return ObjectDetectionLabels(npboxes, class_ids, scores=scores)
+
+
+@click.command()
+@click.option('--num-boxes', default=100000, help='Number of boxes.')
+@click.option('--scene-sz', default=20000, help='Height and width of scene.')
+@click.option('--box-sz', default=30, help='Maximum size of boxes.')
+@click.option('--chip-sz', default=300, help='Size of grid cells.')
+@click.option('--num-classes', default=2, help='Number of classes.')
+@click.option(
+    '--skip-old',
+    is_flag=True,
+    help='Skip the previous implementation, which is slow for many boxes.')
+def main(num_boxes, scene_sz, box_sz, chip_sz, num_classes, skip_old):
+    np.random.seed(1234)
+    labels = make_labels(num_boxes, scene_sz, box_sz, num_classes)
+    score_thresh = 0.5
+    merge_thresh = 0.5
+
+    start = time.perf_counter()
+    pruned_labels = ObjectDetectionLabels.prune_duplicates(
+        labels, score_thresh, merge_thresh, cell_sz=chip_sz)
+    new_time = time.perf_counter() - start
+    print('grid nms: {:.3f}s, {} boxes'.format(new_time, len(pruned_labels)))
+
+    start = time.perf_counter()
+    class_aware_labels = ObjectDetectionLabels.prune_duplicates(
+        labels, score_thresh, merge_thresh, cell_sz=chip_sz, class_aware=True)
+    print('grid nms (class aware): {:.3f}s, {} boxes'.format(
+        time.perf_counter() - start, len(class_aware_labels)))
+
+    if not skip_old:
+        start = time.perf_counter()
+        old_boxlist = non_max_suppression(
+            labels.boxlist,
+            max_output_size=1000000,
+            iou_threshold=merge_thresh,
+            score_threshold=score_thresh)
+        old_time = time.perf_counter() - start
+        old_labels = ObjectDetectionLabels.from_boxlist(old_boxlist)
+        print('old nms: {:.3f}s, {} boxes'.format(old_time, len(old_labels)))
+        np.testing.assert_array_equal(old_labels.get_npboxes(),
+                                      pruned_labels.get_npboxes())
+        np.testing.assert_array_equal(old_labels.get_scores(),
+                                      pruned_labels.get_scores())
+        np.testing.assert_array_equal(old_labels.get_class_ids(),
+                                      pruned_labels.get_class_ids())
+        print('outputs are identical, speedup: {:.1f}x'.format(
+            old_time / new_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Benchmark SegmentationClassTransformer against the np.vectorize version.
+
+Run with: python -m benchmarks.segmentation_class_transformer --size 10000
+"""
+import time
+
+import click
+import numpy as np
+
+from rastervision.core.data import ClassConfig, SegmentationClassTransformer
+from rastervision.core.data.utils import (color_to_triple, color_to_integer,
+                                          rgb_to_int_array)
+
+
+class VectorizedClassTransformer():
+    """The previous implementation, which calls a Python function per pixel."""
+
+    def __init__(self, class_config):
+        color_to_class = class_config.get_color_to_class_id()
+        color_int_to_class = dict(
+            zip([color_to_integer(c) for c in color_to_class.keys()],
+                color_to_class.values()))
+        null_class_id = class_config.get_null_class_id()
+        self.transform_color_int_to_class = np.vectorize(
+            lambda c: color_int_to_class.get(c, null_class_id),
+            otypes=[np.uint8])
+
+        class_to_color_triple = dict(
+            zip(color_to_class.values(),
+                [color_to_triple(c) for c in color_to_class.keys()]))
+
+        def make_channel_fn(channel):
+            return np.vectorize(
+                lambda c: class_to_color_triple.get(c, (0, 0, 0))[channel],
+                otypes=[np.uint8])
+
+        self.transform_class_to_color = [make_channel_fn(c) for c in range(3)]
+
+    def rgb_to_class(self, rgb_labels):
+        color_int_labels = rgb_to_int_array(rgb_labels)
+        return self.transform_color_int_to_class(color_int_labels).astype(
+            np.uint8)
+
+    def class_to_rgb(self, class_labels):
+        rgb_labels = np.empty(class_labels.shape + (3, ))
+        for chan in range(3):
+            rgb_labels[:, :, chan] = self.transform_class_to_color[chan](
+                class_labels)
+        return rgb_labels.astype(np.uint8)
+
+
+def time_fn(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+@click.command()
+@click.option('--size', default=10000, help='Height and width of the raster.')
+@click.option(
+    '--num-classes', default=6, help='Number of classes, excluding null.')
+@click.option(
+    '--skip-baseline',
+    is_flag=True,
+    help='Only time the lookup table implementation.')
+def main(size, num_classes, skip_baseline):
+    colors = ['#{:06x}'.format(c) for c in range(1, num_classes + 1)]
+    class_config = ClassConfig(
+        names=[str(i) for i in range(num_classes)], colors=colors)
+    class_config.ensure_null_class()
+
+    np.random.seed(1234)
+    class_labels = np.random.randint(
+        0, len(class_config), (size, size), dtype=np.uint8)
+
+    transformers = [('lookup table', SegmentationClassTransformer)]
+    if not skip_baseline:
+        transformers.append(('np.vectorize', VectorizedClassTransformer))
+
+    results = {}
+    for name, transformer_class in transformers:
+        transformer = transformer_class(class_config)
+        rgb_labels, rgb_time = time_fn(transformer.class_to_rgb, class_labels)
+        out_labels, class_time = time_fn(transformer.rgb_to_class, rgb_labels)
+        np.testing.assert_array_equal(out_labels, class_labels)
+        results[name] = (rgb_time, class_time)
+        print('{}: class_to_rgb {:.2f}s, rgb_to_class {:.2f}s'.format(
+            name, rgb_time, class_time))
+
+    if not skip_baseline:
+        new, old = results['lookup table'], results['np.vectorize']
+        print('speedup: class_to_rgb {:.1f}x, rgb_to_class {:.1f}x'.format(
+            old[0] / new[0], old[1] / new[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Benchmark StatsTransformer against the previous step-by-step version.
+
+Run with: python -m benchmarks.stats_transformer
+"""
+import time
+
+import click
+import numpy as np
+
+from rastervision.core.data import RasterStats, StatsTransformer
+
+
+def stats_transform(chip, means, stds):
+    """The previous implementation, which makes a new array for each step."""
+    nodata = chip == 0
+    chip = chip - means
+    chip = chip / stds
+    chip += 3
+    chip /= 6
+    chip = np.clip(chip, 0, 1)
+    chip *= 255
+    chip = chip.astype(np.uint8)
+    chip[nodata] = 0
+    return chip
+
+
+def time_fn(fn, chips, *args):
+    outs = []
+    start = time.perf_counter()
+    for chip in chips:
+        outs.append(fn(chip, *args))
+    return outs, time.perf_counter() - start
+
+
+@click.command()
+@click.option('--chip-sz', default=300, help='Height and width of each chip.')
+@click.option('--num-chips', default=200, help='Number of chips.')
+@click.option('--num-channels', default=4, help='Number of channels.')
+def main(chip_sz, num_chips, num_channels):
+    np.random.seed(1234)
+    raster_stats = RasterStats()
+    raster_stats.means = list(np.random.uniform(500, 5000, num_channels))
+    raster_stats.stds = list(np.random.uniform(100, 1000, num_channels))
+    means = np.array(raster_stats.means)
+    stds = np.array(raster_stats.stds)
+    channel_order = list(range(num_channels))
+    shape = (num_chips, chip_sz, chip_sz, num_channels)
+
+    for dtype in [np.uint16, np.float32]:
+        chips = np.random.normal(means, stds * 2, shape)
+        chips = np.clip(chips, 0, 2**16 - 1).astype(dtype)
+        transformer = StatsTransformer(raster_stats)
+        # Build lookup tables before timing.
+        transformer.transform(chips[0], channel_order)
+
+        old_outs, old_time = time_fn(stats_transform, chips, means, stds)
+        new_outs, new_time = time_fn(transformer.transform, chips,
+                                     channel_order)
+        np.testing.assert_array_equal(np.stack(old_outs), np.stack(new_outs))
+        print('{}: previous {:.2f}s, new {:.2f}s, speedup {:.1f}x'.format(
+            np.dtype(dtype).name, old_time, new_time, old_time / new_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from rastervision.core.analyzer import Analyzer
 from rastervision.core.raster_stats import RasterStats
@@ -8,12 +8,27 @@ from rastervision.core.data import Scene
 class StatsAnalyzer(Analyzer):
     """Computes RasterStats against the entire scene set."""
 
-    def __init__(self, stats_uri: str, sample_prob: float = 0.1):
+    def __init__(self,
+                 stats_uri: str,
+                 sample_prob: float = 0.1,
+                 num_workers: int = 0,
+                 histogram: bool = False,
+                 percentiles: Optional[List[float]] = None):
         self.stats_uri = stats_uri
         self.sample_prob = sample_prob
+        self.num_workers = num_workers
+        self.histogram = histogram
+        self.percentiles = percentiles
 
     def process(self, scenes: List[Scene], tmp_dir: str):
         stats = RasterStats()
+        kwargs = {}
+        if self.percentiles is not None:
+            kwargs['percentiles'] = self.percentiles
         stats.compute(
-            [s.raster_source for s in scenes], sample_prob=self.sample_prob)
+            [s.raster_source for s in scenes],
+            sample_prob=self.sample_prob,
+            num_workers=self.num_workers,
+            histogram=self.histogram,
+            **kwargs)
         stats.save(self.stats_uri)
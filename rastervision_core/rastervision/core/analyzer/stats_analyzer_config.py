@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from os.path import join
 
 from rastervision.pipeline.config import register_config, ConfigError, Field
@@ -19,18 +19,46 @@ class StatsAnalyzerConfig(AnalyzerConfig):
         description=(
             'The probability of using a random window for computing statistics. '
             'If None, will use a sliding window.'))
+    num_workers: int = Field(
+        0,
+        description=(
+            'Number of processes used to compute statistics of scenes in '
+            'parallel. If 0, scenes are processed serially.'))
+    histogram: bool = Field(
+        False,
+        description=
+        ('If True, also compute a histogram of each channel and the '
+         'percentiles in the percentiles field. The percentiles are saved in '
+         'the stats file, and the histograms in histograms.json next to it. '
+         'Only supported for integer imagery of at most 16 bits.'))
+    percentiles: Optional[List[float]] = Field(
+        None,
+        description=(
+            'Percentiles to compute if histogram is True. If None, uses '
+            '1, 2, 5, 25, 50, 75, 95, 98 and 99.'))
 
     def update(self, pipeline=None):
         if pipeline is not None and self.output_uri is None:
             self.output_uri = join(pipeline.analyze_uri, 'stats.json')
 
     def validate_config(self):
-        if self.sample_prob > 1 or self.sample_prob <= 0:
+        if self.sample_prob is not None and (self.sample_prob > 1
+                                             or self.sample_prob <= 0):
             raise ConfigError('sample_prob must be <= 1 and > 0')
+        if self.num_workers < 0:
+            raise ConfigError('num_workers must be >= 0')
+        if self.percentiles is not None and any(p < 0 or p > 100
+                                                for p in self.percentiles):
+            raise ConfigError('percentiles must be between 0 and 100')
 
     def build(self):
         from rastervision.core.analyzer import StatsAnalyzer
-        return StatsAnalyzer(self.output_uri, self.sample_prob)
+        return StatsAnalyzer(
+            self.output_uri,
+            self.sample_prob,
+            num_workers=self.num_workers,
+            histogram=self.histogram,
+            percentiles=self.percentiles)
 
     def get_bundle_filenames(self):
         return ['stats.json']
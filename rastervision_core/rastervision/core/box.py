@@ -3,6 +3,8 @@ import random
 
 import numpy as np
 from shapely.geometry import box as ShapelyBox
+from shapely.prepared import prep
+from shapely.strtree import STRtree
 
 
 class BoxSizeError(ValueError):
@@ -11,6 +13,7 @@ class BoxSizeError(ValueError):
 
 class Box():
     """A multi-purpose box (ie. rectangle)."""
+    __slots__ = ['ymin', 'xmin', 'ymax', 'xmax']
 
     def __init__(self, ymin, xmin, ymax, xmax):
         """Construct a bounding box.
@@ -171,6 +174,16 @@ class Box():
         """
         return Box(*npbox)
 
+    @staticmethod
+    def from_npboxes(npboxes):
+        """Return list of Boxes based on an array in npbox format.
+
+        Args:
+            npboxes: Numpy array of shape [N, 4] where each row is of the form
+                [ymin, xmin, ymax, xmax]
+        """
+        return [Box(*npbox) for npbox in np.asarray(npboxes).tolist()]
+
     @staticmethod
     def from_shapely(shape):
         bounds = shape.bounds
@@ -245,11 +258,47 @@ class Box():
             stride: (int) how much each window is offset from the last in pixels
 
         """
-        result = []
-        for row_start in range(self.ymin, self.ymax, stride):
-            for col_start in range(self.xmin, self.xmax, stride):
-                result.append(Box.make_square(row_start, col_start, chip_sz))
-        return result
+        return list(self.iter_windows(chip_sz, stride))
+
+    def get_windows_array(self, chip_sz, stride, padding=0):
+        """Return grid of boxes within this box as an array.
+
+        This is the same grid as get_windows, but doesn't create a Box for each
+        window, which is slow for large boxes.
+
+        Args:
+            chip_sz: (int) the length of each square-shaped window in pixels
+            stride: (int) how much each window is offset from the last in pixels
+            padding: (int) the grid covers this box extended by padding pixels
+                on each side
+
+        Returns:
+            int numpy array of shape [N, 4] where each row is of the form
+            [ymin, xmin, ymax, xmax], in row-major order
+        """
+        row_starts = np.arange(self.ymin - padding, self.ymax + padding,
+                               stride)
+        col_starts = np.arange(self.xmin - padding, self.xmax + padding,
+                               stride)
+        ymins, xmins = np.meshgrid(row_starts, col_starts, indexing='ij')
+        ymins, xmins = ymins.ravel(), xmins.ravel()
+        return np.stack(
+            [ymins, xmins, ymins + chip_sz, xmins + chip_sz], axis=1)
+
+    def iter_windows(self, chip_sz, stride, padding=0):
+        """Yield the boxes of get_windows_array one at a time.
+
+        Args:
+            chip_sz: (int) the length of each square-shaped window in pixels
+            stride: (int) how much each window is offset from the last in pixels
+            padding: (int) the grid covers this box extended by padding pixels
+                on each side
+        """
+        for row_start in range(self.ymin - padding, self.ymax + padding,
+                               stride):
+            for col_start in range(self.xmin - padding, self.xmax + padding,
+                                   stride):
+                yield Box.make_square(row_start, col_start, chip_sz)
 
     def to_dict(self):
         return {
@@ -265,13 +314,45 @@ class Box():
 
     @staticmethod
     def filter_by_aoi(windows, aoi_polygons):
-        """Filters windows by a list of AOI polygons"""
-        result = []
-        for window in windows:
-            w = window.to_shapely()
-            for polygon in aoi_polygons:
-                if w.within(polygon):
-                    result.append(window)
+        """Filters windows by a list of AOI polygons.
+
+        A window is kept if it is within any one of the polygons. The polygons
+        are put in an STRtree so that each window is only tested against the
+        polygons with a bounding box that contains it, and those tests use
+        prepared geometries.
+
+        Args:
+            windows: list of Boxes, or numpy array of shape [N, 4] in npbox
+                format (see get_windows_array)
+            aoi_polygons: list of shapely polygons
+
+        Returns:
+            the windows within the AOIs, of the same type as windows
+        """
+        is_array = isinstance(windows, np.ndarray)
+        if len(windows) == 0 or not aoi_polygons:
+            return windows[0:0] if is_array else []
+
+        if is_array:
+            npboxes = windows.tolist()
+        else:
+            npboxes = [w.tuple_format() for w in windows]
+
+        tree = STRtree(aoi_polygons)
+        polygon_bounds = {id(p): p.bounds for p in aoi_polygons}
+        prepared_polygons = {id(p): prep(p) for p in aoi_polygons}
+        keep_inds = []
+        for ind, (ymin, xmin, ymax, xmax) in enumerate(npboxes):
+            window_geom = ShapelyBox(xmin, ymin, xmax, ymax)
+            for polygon in tree.query(window_geom):
+                p_xmin, p_ymin, p_xmax, p_ymax = polygon_bounds[id(polygon)]
+                if (xmin < p_xmin or ymin < p_ymin or xmax > p_xmax
+                        or ymax > p_ymax):
+                    continue
+                if prepared_polygons[id(polygon)].contains(window_geom):
+                    keep_inds.append(ind)
                     break
 
-        return result
+        if is_array:
+            return windows[keep_inds]
+        return [windows[ind] for ind in keep_inds]
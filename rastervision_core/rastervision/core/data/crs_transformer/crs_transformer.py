@@ -1,5 +1,7 @@
 from typing import Optional
 
+import numpy as np
+
 
 class CRSTransformer():
     """Transforms map points in some CRS into pixel coordinates.
@@ -39,6 +41,36 @@ class CRSTransformer():
         """
         pass
 
+    def map_to_pixel_array(self, xs, ys):
+        """Transform arrays of points from map to pixel-based coordinates.
+
+        Subclasses should override this with a vectorized implementation.
+
+        Args:
+            xs: array-like of x coordinates in map coordinates
+            ys: array-like of y coordinates in map coordinates
+
+        Returns:
+            (xs, ys) tuple of numpy arrays in pixel coordinates
+        """
+        points = [self.map_to_pixel(p) for p in zip(xs, ys)]
+        return _points_to_arrays(points)
+
+    def pixel_to_map_array(self, xs, ys):
+        """Transform arrays of points from pixel to map-based coordinates.
+
+        Subclasses should override this with a vectorized implementation.
+
+        Args:
+            xs: array-like of x coordinates in pixel coordinates
+            ys: array-like of y coordinates in pixel coordinates
+
+        Returns:
+            (xs, ys) tuple of numpy arrays in map coordinates
+        """
+        points = [self.pixel_to_map(p) for p in zip(xs, ys)]
+        return _points_to_arrays(points)
+
     def get_image_crs(self):
         return self.image_crs
 
@@ -47,3 +79,10 @@ class CRSTransformer():
 
     def get_affine_transform(self):
         return self.transform
+
+
+def _points_to_arrays(points):
+    if len(points) == 0:
+        return np.empty((0, )), np.empty((0, ))
+    xs, ys = zip(*points)
+    return np.array(xs), np.array(ys)
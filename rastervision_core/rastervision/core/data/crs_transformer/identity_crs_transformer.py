@@ -1,3 +1,5 @@
+import numpy as np
+
 from rastervision.core.data.crs_transformer import CRSTransformer
 
 
@@ -28,3 +30,27 @@ class IdentityCRSTransformer(CRSTransformer):
             (x, y) tuple in pixel coordinates
         """
         return pixel_point
+
+    def map_to_pixel_array(self, xs, ys):
+        """Identity function.
+
+        Args:
+            xs: array-like of x coordinates
+            ys: array-like of y coordinates
+
+        Returns:
+            (xs, ys) tuple of numpy arrays
+        """
+        return np.asarray(xs), np.asarray(ys)
+
+    def pixel_to_map_array(self, xs, ys):
+        """Identity function.
+
+        Args:
+            xs: array-like of x coordinates
+            ys: array-like of y coordinates
+
+        Returns:
+            (xs, ys) tuple of numpy arrays
+        """
+        return np.asarray(xs), np.asarray(ys)
@@ -1,3 +1,6 @@
+from functools import partial
+
+import numpy as np
 import pyproj
 
 from rasterio.transform import (rowcol, xy)
@@ -6,6 +9,18 @@ from rastervision.core.data.crs_transformer import (CRSTransformer,
                                                     IdentityCRSTransformer)
 
 
+def get_transform_fn(src_proj, dst_proj):
+    """Return a function that transforms x and y arrays from src to dst.
+
+    Uses a pyproj.Transformer if it is available, which avoids setting up the
+    transformation on each call. Older versions of pyproj only have
+    pyproj.transform.
+    """
+    if hasattr(pyproj, 'Transformer'):
+        return pyproj.Transformer.from_proj(src_proj, dst_proj).transform
+    return partial(pyproj.transform, src_proj, dst_proj)
+
+
 class RasterioCRSTransformer(CRSTransformer):
     """Transformer for a RasterioRasterSource."""
 
@@ -18,6 +33,8 @@ class RasterioCRSTransformer(CRSTransformer):
         """
         self.map_proj = pyproj.Proj(init=map_crs)
         self.image_proj = pyproj.Proj(image_crs)
+        self._map_to_image = get_transform_fn(self.map_proj, self.image_proj)
+        self._image_to_map = get_transform_fn(self.image_proj, self.map_proj)
 
         super().__init__(image_crs, map_crs, transform)
 
@@ -30,8 +47,7 @@ class RasterioCRSTransformer(CRSTransformer):
         Returns:
             (x, y) tuple in pixel coordinates
         """
-        image_point = pyproj.transform(self.map_proj, self.image_proj,
-                                       map_point[0], map_point[1])
+        image_point = self._map_to_image(map_point[0], map_point[1])
         pixel_point = rowcol(self.transform, image_point[0], image_point[1])
         pixel_point = (pixel_point[1], pixel_point[0])
         return pixel_point
@@ -47,10 +63,49 @@ class RasterioCRSTransformer(CRSTransformer):
         """
         image_point = xy(self.transform, int(pixel_point[1]),
                          int(pixel_point[0]))
-        map_point = pyproj.transform(self.image_proj, self.map_proj,
-                                     image_point[0], image_point[1])
+        map_point = self._image_to_map(image_point[0], image_point[1])
         return map_point
 
+    def map_to_pixel_array(self, xs, ys):
+        """Transform arrays of points from map to pixel-based coordinates.
+
+        Args:
+            xs: array-like of x coordinates in map coordinates
+            ys: array-like of y coordinates in map coordinates
+
+        Returns:
+            (xs, ys) tuple of int numpy arrays in pixel coordinates
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        if xs.size == 0:
+            return xs.astype(np.int64), ys.astype(np.int64)
+        image_xs, image_ys = self._map_to_image(xs, ys)
+        rows, cols = rowcol(self.transform, image_xs, image_ys)
+        return np.asarray(cols), np.asarray(rows)
+
+    def pixel_to_map_array(self, xs, ys):
+        """Transform arrays of points from pixel to map-based coordinates.
+
+        Like pixel_to_map, points are truncated to ints and the center of each
+        pixel is returned.
+
+        Args:
+            xs: array-like of x coordinates in pixel coordinates
+            ys: array-like of y coordinates in pixel coordinates
+
+        Returns:
+            (xs, ys) tuple of numpy arrays in map coordinates
+        """
+        cols = np.asarray(xs).astype(np.int64)
+        rows = np.asarray(ys).astype(np.int64)
+        if cols.size == 0:
+            return cols.astype(np.float64), rows.astype(np.float64)
+        image_xs, image_ys = xy(self.transform, rows, cols)
+        map_xs, map_ys = self._image_to_map(
+            np.asarray(image_xs), np.asarray(image_ys))
+        return np.asarray(map_xs), np.asarray(map_ys)
+
     @classmethod
     def from_dataset(cls, dataset, map_crs='epsg:4326'):
         if dataset.crs is None:
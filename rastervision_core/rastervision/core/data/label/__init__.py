@@ -3,4 +3,6 @@
 from rastervision.core.data.label.labels import *
 from rastervision.core.data.label.chip_classification_labels import *
 from rastervision.core.data.label.semantic_segmentation_labels import *
+from rastervision.core.data.label.semantic_segmentation_dense_labels import *
+from rastervision.core.data.label.semantic_segmentation_smooth_labels import *
 from rastervision.core.data.label.object_detection_labels import *
@@ -6,7 +6,132 @@ from rastervision.core.data.label.labels import Labels
 from rastervision.core.data.label.tfod_utils.np_box_list import BoxList
 from rastervision.core.data.label.tfod_utils.np_box_list_ops import (
     prune_non_overlapping_boxes, clip_to_window, concatenate,
-    non_max_suppression)
+    filter_scores_greater_than, sort_by_field, gather)
+from rastervision.core.data.label.tfod_utils.np_box_ops import iou
+
+
+def get_overlapping_pairs(boxes, iou_thresh, cell_sz, groups=None):
+    """Return pairs of boxes with an IOU greater than iou_thresh.
+
+    Boxes are bucketed into a grid of square cells, and only boxes that share a
+    cell are compared, one cell at a time. Boxes that overlap always share at
+    least one cell, so no pairs are missed.
+
+    Args:
+        boxes: (np.ndarray) array of shape (n, 4) with ymin, xmin, ymax, xmax
+        iou_thresh: (float) minimum IOU of the returned pairs
+        cell_sz: (float) size of the grid cells in pixels
+        groups: (np.ndarray or None) if set, an int array of shape (n,) and
+            only boxes in the same group are compared
+
+    Returns:
+        (i, j) tuple of int arrays where i < j, possibly with duplicate pairs
+    """
+    num_boxes = boxes.shape[0]
+    cell_mins = np.floor(boxes[:, 0:2] / cell_sz).astype(np.int64)
+    cell_maxs = np.floor(boxes[:, 2:4] / cell_sz).astype(np.int64)
+    origin = cell_mins.min(axis=0)
+    cell_mins -= origin
+    cell_maxs -= origin
+    grid_height, grid_width = cell_maxs.max(axis=0) + 1
+
+    # Make an entry for each cell that each box touches.
+    box_heights, box_widths = (cell_maxs - cell_mins + 1).T
+    num_cells = box_heights * box_widths
+    box_inds = np.repeat(np.arange(num_boxes), num_cells)
+    cell_offsets = np.arange(box_inds.shape[0]) - np.repeat(
+        np.cumsum(num_cells) - num_cells, num_cells)
+    rows = cell_mins[box_inds, 0] + cell_offsets // box_widths[box_inds]
+    cols = cell_mins[box_inds, 1] + cell_offsets % box_widths[box_inds]
+    cell_ids = rows * grid_width + cols
+    if groups is not None:
+        cell_ids += groups[box_inds] * (grid_height * grid_width)
+
+    # Sorting is stable, so box indices within each cell stay sorted.
+    sort_inds = np.argsort(cell_ids, kind='stable')
+    cell_ids = cell_ids[sort_inds]
+    box_inds = box_inds[sort_inds]
+    cell_starts = np.flatnonzero(np.diff(cell_ids)) + 1
+    cell_starts = np.concatenate([[0], cell_starts])
+    cell_ends = np.concatenate([cell_starts[1:], [len(cell_ids)]])
+
+    pairs_i = [np.empty(0, dtype=np.int64)]
+    pairs_j = [np.empty(0, dtype=np.int64)]
+    for start, end in zip(cell_starts, cell_ends):
+        if end - start < 2:
+            continue
+        inds = box_inds[start:end]
+        cell_boxes = boxes[inds]
+        # Use the same comparison as non_max_suppression so that boxes with an
+        # undefined IOU are treated the same.
+        overlaps = np.logical_not(iou(cell_boxes, cell_boxes) <= iou_thresh)
+        i, j = np.nonzero(np.triu(overlaps, k=1))
+        pairs_i.append(inds[i])
+        pairs_j.append(inds[j])
+    return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+
+def grid_non_max_suppression(boxlist,
+                             iou_thresh,
+                             score_thresh,
+                             cell_sz=None,
+                             class_aware=False):
+    """Greedy non-maximum suppression that only compares nearby boxes.
+
+    This returns the same boxes, in the same order, as non_max_suppression
+    with an unlimited max_output_size, but avoids comparing every box to every
+    other box. The pairs of boxes that overlap by more than iou_thresh are found
+    using a grid (see get_overlapping_pairs), and then boxes are visited in
+    order of decreasing score, suppressing the boxes that they overlap.
+
+    Args:
+        boxlist: (BoxList) boxes with a scores field, and a classes field if
+            class_aware
+        iou_thresh: (float) boxes that overlap a box with a higher score by an
+            IOU greater than this are removed
+        score_thresh: (float) boxes with scores less than or equal to this are
+            removed
+        cell_sz: (float or None) size of the grid cells; if None, the size of
+            the largest box is used
+        class_aware: (bool) if True, only boxes of the same class suppress each
+            other
+
+    Returns:
+        BoxList sorted by decreasing score
+    """
+    if iou_thresh < 0. or iou_thresh > 1.0:
+        raise ValueError('IOU threshold must be in [0, 1]')
+
+    boxlist = filter_scores_greater_than(boxlist, score_thresh)
+    if boxlist.num_boxes() == 0:
+        return boxlist
+    boxlist = sort_by_field(boxlist, 'scores')
+    if iou_thresh == 1.0:
+        return boxlist
+
+    boxes = boxlist.get()
+    if cell_sz is None:
+        cell_sz = np.max(boxes[:, 2:4] - boxes[:, 0:2])
+    cell_sz = max(cell_sz, 1)
+    groups = None
+    if class_aware:
+        _, groups = np.unique(
+            boxlist.get_field('classes'), return_inverse=True)
+    pairs_i, pairs_j = get_overlapping_pairs(boxes, iou_thresh, cell_sz,
+                                             groups)
+
+    sort_inds = np.argsort(pairs_i, kind='stable')
+    pairs_i = pairs_i[sort_inds]
+    pairs_j = pairs_j[sort_inds]
+    num_boxes = boxlist.num_boxes()
+    is_suppressed = np.zeros(num_boxes, dtype=bool)
+    pair_bounds = np.searchsorted(pairs_i, np.arange(num_boxes + 1))
+    # Only boxes that overlap a box with a lower score can suppress anything.
+    for i in np.unique(pairs_i):
+        if not is_suppressed[i]:
+            is_suppressed[pairs_j[pair_bounds[i]:pair_bounds[i + 1]]] = True
+
+    return gather(boxlist, np.flatnonzero(~is_suppressed))
 
 
 class ObjectDetectionLabels(Labels):
@@ -243,25 +368,89 @@ class ObjectDetectionLabels(Labels):
         return ObjectDetectionLabels.from_boxlist(new_boxlist)
 
     @staticmethod
-    def prune_duplicates(labels, score_thresh, merge_thresh):
+    def prune_duplicates(labels,
+                         score_thresh,
+                         merge_thresh,
+                         cell_sz=None,
+                         class_aware=False):
         """Remove duplicate boxes.
 
         Runs non-maximum suppression to remove duplicate boxes that result from
-        sliding window prediction algorithm.
+        sliding window prediction algorithm. Only boxes that are near each
+        other are compared (see grid_non_max_suppression).
 
         Args:
             labels: ObjectDetectionLabels
             score_thresh: the minimum allowed score of boxes
             merge_thresh: the minimum IOA allowed when merging two boxes
                 together
+            cell_sz: size of the grid cells used to find nearby boxes, eg. the
+                chip size. If None, the size of the largest box is used.
+            class_aware: if True, only boxes of the same class are merged
 
         Returns:
             ObjectDetectionLabels
         """
-        max_output_size = 1000000
-        pruned_boxlist = non_max_suppression(
+        pruned_boxlist = grid_non_max_suppression(
             labels.boxlist,
-            max_output_size=max_output_size,
-            iou_threshold=merge_thresh,
-            score_threshold=score_thresh)
+            iou_thresh=merge_thresh,
+            score_thresh=score_thresh,
+            cell_sz=cell_sz,
+            class_aware=class_aware)
         return ObjectDetectionLabels.from_boxlist(pruned_boxlist)
+
+
+class ObjectDetectionLabelsAccumulator():
+    """Accumulates ObjectDetectionLabels, eg. from batches of predictions.
+
+    Adding ObjectDetectionLabels together copies all of the boxes each time, so
+    adding many small sets of labels to a growing set is quadratic in the
+    number of boxes. This keeps a list of the arrays of each set of labels, and
+    concatenates them once when finalize is called.
+    """
+
+    def __init__(self):
+        self._npboxes = []
+        self._class_ids = []
+        self._scores = []
+        self._num_boxes = 0
+
+    def add(self, labels):
+        """Add labels.
+
+        Args:
+            labels: (ObjectDetectionLabels or ObjectDetectionLabelsAccumulator)
+
+        Returns:
+            self
+        """
+        if isinstance(labels, ObjectDetectionLabelsAccumulator):
+            labels = labels.finalize()
+        if len(labels) == 0:
+            return self
+        self._npboxes.append(labels.get_npboxes())
+        self._class_ids.append(labels.get_class_ids())
+        self._scores.append(labels.get_scores())
+        self._num_boxes += len(labels)
+        return self
+
+    def __iadd__(self, other):
+        """Add labels to this accumulator in place.
+
+        This makes labels += other_labels work as it does for
+        ObjectDetectionLabels. There is no __add__, since that would have to
+        copy the accumulator rather than modify it.
+        """
+        return self.add(other)
+
+    def __len__(self):
+        return self._num_boxes
+
+    def finalize(self):
+        """Return all of the added labels as one ObjectDetectionLabels."""
+        if self._num_boxes == 0:
+            return ObjectDetectionLabels.make_empty()
+        return ObjectDetectionLabels(
+            np.concatenate(self._npboxes),
+            np.concatenate(self._class_ids),
+            scores=np.concatenate(self._scores))
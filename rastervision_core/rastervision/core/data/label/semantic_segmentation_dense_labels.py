@@ -0,0 +1,151 @@
+from rastervision.core.data.label import Labels
+
+import numpy as np
+from rasterio.features import rasterize
+from rasterio.transform import Affine
+
+DEFAULT_BLOCK_SZ = 1024
+
+
+class SemanticSegmentationDenseLabels(Labels):
+    """Semantic segmentation labels stored in a single scene-sized array.
+
+    Unlike SemanticSegmentationLabels, which keeps a separate array for each
+    window, label arrays set for a window are written into one preallocated
+    array that covers the extent. Getting the labels for a window is a slice of
+    this array, and memory use doesn't grow with the number of windows. The
+    array can be a memory-mapped file on local disk for scenes that don't fit
+    in memory.
+    """
+
+    def __init__(self,
+                 extent,
+                 fill_value=0,
+                 dtype=np.uint8,
+                 path=None,
+                 label_arr=None,
+                 block_sz=DEFAULT_BLOCK_SZ):
+        """Constructor.
+
+        Args:
+            extent: (Box) extent of the scene, with ymin and xmin equal to 0
+            fill_value: (int) value of pixels that haven't been set, and of
+                pixels outside the extent returned by get_label_arr
+            dtype: (np.dtype) dtype of the array
+            path: (str or None) if set, the array is a memory-mapped file
+                created at this local path
+            label_arr: (np.ndarray or None) if set, an existing array of shape
+                (height, width) to use instead of allocating one
+            block_sz: (int) size of the windows returned by get_windows
+        """
+        self.extent = extent
+        self.fill_value = fill_value
+        self.block_sz = block_sz
+
+        shape = (extent.get_height(), extent.get_width())
+        if label_arr is not None:
+            if label_arr.shape != shape:
+                raise ValueError(
+                    'label_arr has shape {} but extent has shape {}'.format(
+                        label_arr.shape, shape))
+            self.label_arr = label_arr
+        elif path is not None:
+            self.label_arr = np.memmap(
+                path, dtype=dtype, mode='w+', shape=shape)
+            self.label_arr[:] = fill_value
+        else:
+            self.label_arr = np.full(shape, fill_value, dtype=dtype)
+
+    def __add__(self, other):
+        """Add labels to these labels.
+
+        The label arrays of the other labels are written into the array of these
+        labels, overwriting any overlapping pixels.
+        """
+        for window in other.get_windows():
+            self.set_label_arr(window, other.get_label_arr(window))
+        return self
+
+    def __eq__(self, other):
+        if not isinstance(other, SemanticSegmentationDenseLabels):
+            return False
+        return (self.extent == other.extent
+                and np.array_equal(self.label_arr, other.label_arr))
+
+    def get_windows(self):
+        """Return windows of at most block_sz that tile the extent."""
+        return [
+            w.intersection(self.extent)
+            for w in self.extent.get_windows(self.block_sz, self.block_sz)
+        ]
+
+    def set_label_arr(self, window, label_arr):
+        """Write label_arr into the part of the scene array under window.
+
+        Parts of the window that fall outside the extent are ignored.
+        """
+        clipped = window.intersection(self.extent)
+        if clipped.get_height() <= 0 or clipped.get_width() <= 0:
+            return
+        src_ymin = clipped.ymin - window.ymin
+        src_xmin = clipped.xmin - window.xmin
+        src_rows = slice(src_ymin, src_ymin + clipped.get_height())
+        src_cols = slice(src_xmin, src_xmin + clipped.get_width())
+        self.label_arr[clipped.ymin:clipped.ymax, clipped.xmin:clipped.xmax] = \
+            label_arr[src_rows, src_cols]
+
+    def get_label_arr(self, window):
+        """Return the labels under window.
+
+        If the window is inside the extent, this is a view into the scene
+        array. Otherwise, a new array is returned with pixels outside the
+        extent set to fill_value.
+        """
+        if (window.ymin >= 0 and window.xmin >= 0
+                and window.ymax <= self.extent.ymax
+                and window.xmax <= self.extent.xmax):
+            return self.label_arr[window.ymin:window.ymax, window.xmin:
+                                  window.xmax]
+
+        label_arr = np.full(
+            (window.get_height(), window.get_width()),
+            self.fill_value,
+            dtype=self.label_arr.dtype)
+        clipped = window.intersection(self.extent)
+        if clipped.get_height() > 0 and clipped.get_width() > 0:
+            dst_ymin = clipped.ymin - window.ymin
+            dst_xmin = clipped.xmin - window.xmin
+            dst_rows = slice(dst_ymin, dst_ymin + clipped.get_height())
+            dst_cols = slice(dst_xmin, dst_xmin + clipped.get_width())
+            label_arr[dst_rows, dst_cols] = self.label_arr[
+                clipped.ymin:clipped.ymax, clipped.xmin:clipped.xmax]
+        return label_arr
+
+    def filter_by_aoi(self, aoi_polygons, null_class_id):
+        """Set pixels outside of the AOI polygons to null_class_id.
+
+        The AOIs are rasterized one block at a time so that no additional
+        scene-sized array is allocated. The array is modified in place.
+        """
+        if not aoi_polygons:
+            return self
+
+        for window in self.get_windows():
+            window_geom = window.to_shapely()
+            window_aois = [
+                aoi for aoi in aoi_polygons if aoi.intersects(window_geom)
+            ]
+            label_arr = self.get_label_arr(window)
+            if not window_aois:
+                label_arr[:] = null_class_id
+                continue
+            transform = Affine.translation(window.xmin, window.ymin)
+            mask = rasterize(
+                [(p, 0) for p in window_aois],
+                out_shape=label_arr.shape,
+                transform=transform,
+                fill=1,
+                dtype=np.uint8)
+            label_arr[mask.astype(bool)] = null_class_id
+
+        return self
@@ -12,6 +12,7 @@ class SemanticSegmentationLabels(Labels):
 
     def __init__(self):
         self.window_to_label_arr = {}
+        self.window_to_score_arr = {}
 
     def __add__(self, other):
         """Add labels to these labels.
@@ -19,6 +20,7 @@ class SemanticSegmentationLabels(Labels):
         Returns a concatenation of this and the other labels.
         """
         self.window_to_label_arr.update(other.window_to_label_arr)
+        self.window_to_score_arr.update(other.window_to_score_arr)
         return self
 
     def __eq__(self, other):
@@ -43,6 +45,18 @@ class SemanticSegmentationLabels(Labels):
     def get_label_arr(self, window):
         return self.window_to_label_arr[window.tuple_format()]
 
+    def set_score_arr(self, window, score_arr):
+        """Set class scores of shape (num_classes, height, width) for window.
+
+        Scores are optional, and are used by SemanticSegmentationSmoothLabels
+        to blend overlapping windows.
+        """
+        self.window_to_score_arr[window.tuple_format()] = score_arr
+
+    def get_score_arr(self, window):
+        """Return the class scores for window, or None if they weren't set."""
+        return self.window_to_score_arr.get(window.tuple_format())
+
     def filter_by_aoi(self, aoi_polygons, null_class_id):
         new_labels = SemanticSegmentationLabels()
 
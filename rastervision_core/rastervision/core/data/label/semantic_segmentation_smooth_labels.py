@@ -0,0 +1,214 @@
+from rastervision.core.data.label import (Labels,
+                                          SemanticSegmentationDenseLabels)
+
+import numpy as np
+
+DEFAULT_BLOCK_SZ = 1024
+
+
+def get_blend_weights(height, width, blend_method='none'):
+    """Return an array of weights for blending a window with its neighbors.
+
+    Args:
+        height: (int) height of the window
+        width: (int) width of the window
+        blend_method: (str) one of 'none' (all pixels have the same weight),
+            'linear' (weights decrease linearly with distance from the center)
+            or 'cosine' (weights follow a Hann window)
+
+    Returns:
+        float32 array of shape (height, width) with positive weights
+    """
+
+    def get_1d_weights(n):
+        if blend_method == 'linear':
+            dists = np.minimum(np.arange(n) + 1, np.arange(n, 0, -1))
+            return dists / np.ceil(n / 2)
+        elif blend_method == 'cosine':
+            return np.sin(np.pi * (np.arange(n) + 0.5) / n)**2
+        elif blend_method == 'none':
+            return np.ones(n)
+        raise ValueError('Unknown blend_method: {}'.format(blend_method))
+
+    weights = np.outer(get_1d_weights(height), get_1d_weights(width))
+    return weights.astype(np.float32)
+
+
+class SemanticSegmentationSmoothLabels(Labels):
+    """Semantic segmentation labels that blend class scores of windows.
+
+    Instead of overwriting the labels of overlapping windows, the class scores
+    (eg. probabilities) of each window are accumulated into a scene-sized buffer
+    as a weighted average, and the class id of a pixel is the argmax of its
+    averaged scores. The argmax is only computed when the labels are read, eg.
+    by the label store or evaluation. Scores can be stored as float32, float16,
+    or as uint8 (quantized to 1/255) to bound memory use.
+    """
+
+    def __init__(self,
+                 extent,
+                 num_classes,
+                 dtype=np.float32,
+                 blend_method='none',
+                 fill_value=0,
+                 block_sz=DEFAULT_BLOCK_SZ):
+        """Constructor.
+
+        Args:
+            extent: (Box) extent of the scene, with ymin and xmin equal to 0
+            num_classes: (int) number of classes, ie. the length of the score
+                vector of each pixel
+            dtype: (np.dtype) dtype of the score buffer; one of np.float32,
+                np.float16 or np.uint8. If uint8, scores must be in [0, 1].
+            blend_method: (str) weighting of pixels within a window; see
+                get_blend_weights
+            fill_value: (int) class id of pixels without any scores
+            block_sz: (int) size of the windows returned by get_windows
+        """
+        self.extent = extent
+        self.num_classes = num_classes
+        self.dtype = np.dtype(dtype)
+        self.blend_method = blend_method
+        self.fill_value = fill_value
+        self.block_sz = block_sz
+
+        height, width = extent.get_height(), extent.get_width()
+        self.score_arr = np.zeros(
+            (num_classes, height, width), dtype=self.dtype)
+        self.pixel_weights = np.zeros((height, width), dtype=np.float32)
+        self._blend_weights = {}
+
+    def _get_blend_weights(self, height, width):
+        key = (height, width)
+        if key not in self._blend_weights:
+            self._blend_weights[key] = get_blend_weights(
+                height, width, self.blend_method)
+        return self._blend_weights[key]
+
+    def _decode(self, scores):
+        if self.dtype == np.uint8:
+            return scores.astype(np.float32) / 255
+        return scores.astype(np.float32)
+
+    def _encode(self, scores):
+        if self.dtype == np.uint8:
+            return np.round(np.clip(scores, 0, 1) * 255).astype(np.uint8)
+        return scores.astype(self.dtype)
+
+    def add_scores(self, window, score_arr):
+        """Blend scores for a window into the scene buffer.
+
+        Args:
+            window: (Box) window of the scores; parts outside the extent are
+                ignored
+            score_arr: (np.ndarray) array of shape (num_classes, height, width)
+        """
+        clipped = window.intersection(self.extent)
+        if clipped.get_height() <= 0 or clipped.get_width() <= 0:
+            return
+        src_ymin = clipped.ymin - window.ymin
+        src_xmin = clipped.xmin - window.xmin
+        src_rows = slice(src_ymin, src_ymin + clipped.get_height())
+        src_cols = slice(src_xmin, src_xmin + clipped.get_width())
+        dst_rows = slice(clipped.ymin, clipped.ymax)
+        dst_cols = slice(clipped.xmin, clipped.xmax)
+
+        weights = self._get_blend_weights(*score_arr.shape[1:])
+        weights = weights[src_rows, src_cols]
+        scores = score_arr[:, src_rows, src_cols]
+
+        old_weights = self.pixel_weights[dst_rows, dst_cols]
+        new_weights = old_weights + weights
+        old_scores = self._decode(self.score_arr[:, dst_rows, dst_cols])
+        new_scores = (
+            old_scores * old_weights + scores * weights) / new_weights
+        self.score_arr[:, dst_rows, dst_cols] = self._encode(new_scores)
+        self.pixel_weights[dst_rows, dst_cols] = new_weights
+
+    def __add__(self, other):
+        """Add labels to these labels.
+
+        Scores of the other labels are blended into these labels. If the other
+        labels have no scores for a window, its class ids are used as one-hot
+        scores.
+        """
+        get_score_arr = getattr(other, 'get_score_arr', None)
+        class_ids = np.arange(self.num_classes)[:, None, None]
+        for window in other.get_windows():
+            score_arr = None
+            if get_score_arr is not None:
+                score_arr = get_score_arr(window)
+            if score_arr is None:
+                label_arr = other.get_label_arr(window)
+                score_arr = np.equal(class_ids, label_arr[None, ...])
+                score_arr = score_arr.astype(np.float32)
+            self.add_scores(window, score_arr)
+        return self
+
+    def __eq__(self, other):
+        if not isinstance(other, SemanticSegmentationSmoothLabels):
+            return False
+        return (self.extent == other.extent
+                and np.array_equal(self.score_arr, other.score_arr)
+                and np.array_equal(self.pixel_weights, other.pixel_weights))
+
+    def get_windows(self):
+        """Return windows of at most block_sz that tile the extent."""
+        return [
+            w.intersection(self.extent)
+            for w in self.extent.get_windows(self.block_sz, self.block_sz)
+        ]
+
+    def get_score_arr(self, window):
+        """Return the averaged scores under window as float32.
+
+        Pixels outside the extent or without scores are 0.
+        """
+        score_arr = np.zeros(
+            (self.num_classes, window.get_height(), window.get_width()),
+            dtype=np.float32)
+        clipped = window.intersection(self.extent)
+        if clipped.get_height() > 0 and clipped.get_width() > 0:
+            dst_ymin = clipped.ymin - window.ymin
+            dst_xmin = clipped.xmin - window.xmin
+            dst_rows = slice(dst_ymin, dst_ymin + clipped.get_height())
+            dst_cols = slice(dst_xmin, dst_xmin + clipped.get_width())
+            score_arr[:, dst_rows, dst_cols] = self._decode(
+                self.score_arr[:, clipped.ymin:clipped.ymax, clipped.xmin:
+                               clipped.xmax])
+        return score_arr
+
+    def get_label_arr(self, window):
+        """Return the class ids under window, ie. the argmax of the scores.
+
+        Pixels outside the extent or without scores are set to fill_value.
+        """
+        label_arr = np.full(
+            (window.get_height(), window.get_width()),
+            self.fill_value,
+            dtype=np.uint8)
+        clipped = window.intersection(self.extent)
+        if clipped.get_height() > 0 and clipped.get_width() > 0:
+            src_rows = slice(clipped.ymin, clipped.ymax)
+            src_cols = slice(clipped.xmin, clipped.xmax)
+            dst_ymin = clipped.ymin - window.ymin
+            dst_xmin = clipped.xmin - window.xmin
+            dst_rows = slice(dst_ymin, dst_ymin + clipped.get_height())
+            dst_cols = slice(dst_xmin, dst_xmin + clipped.get_width())
+            scores = self.score_arr[:, src_rows, src_cols]
+            has_scores = self.pixel_weights[src_rows, src_cols] > 0
+            label_arr[dst_rows, dst_cols] = np.where(has_scores,
+                                                     np.argmax(scores, axis=0),
+                                                     self.fill_value)
+        return label_arr
+
+    def filter_by_aoi(self, aoi_polygons, null_class_id):
+        """Return SemanticSegmentationDenseLabels filtered by the AOIs.
+
+        The scores are reduced to class ids first, since filtering sets pixels
+        outside the AOIs to null_class_id.
+        """
+        labels = SemanticSegmentationDenseLabels(
+            self.extent, fill_value=self.fill_value, block_sz=self.block_sz)
+        labels += self
+        return labels.filter_by_aoi(aoi_polygons, null_class_id)
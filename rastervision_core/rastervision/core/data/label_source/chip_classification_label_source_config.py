@@ -47,7 +47,8 @@ class ChipClassificationLabelSourceConfig(LabelSourceConfig):
          ))
 
     def build(self, class_config, crs_transformer, extent=None, tmp_dir=None):
-        vector_source = self.vector_source.build(class_config, crs_transformer)
+        vector_source = self.vector_source.build(
+            class_config, crs_transformer, extent=extent)
         return ChipClassificationLabelSource(
             self, vector_source, class_config, crs_transformer, extent=extent)
 
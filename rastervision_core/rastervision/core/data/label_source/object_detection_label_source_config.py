@@ -10,5 +10,6 @@ class ObjectDetectionLabelSourceConfig(LabelSourceConfig):
     vector_source: VectorSourceConfig
 
     def build(self, class_config, crs_transformer, extent, tmp_dir):
-        vs = self.vector_source.build(class_config, crs_transformer)
+        vs = self.vector_source.build(
+            class_config, crs_transformer, extent=extent)
         return ObjectDetectionLabelSource(vs, extent)
@@ -10,51 +10,44 @@ class SegmentationClassTransformer():
         color_int_to_class = dict(
             zip([color_to_integer(c) for c in color_to_class.keys()],
                 color_to_class.values()))
-        null_class_id = class_config.get_null_class_id()
-
-        def color_int_to_class_fn(color: int) -> int:
-            # Convert unspecified colors to null class
-            return color_int_to_class.get(color, null_class_id)
-
-        self.transform_color_int_to_class = \
-            np.vectorize(color_int_to_class_fn, otypes=[np.uint8])
-
-        # class to color triple
+        self.null_class_id = class_config.get_null_class_id()
+
+        # Sorted color integers and their class ids, so that colors can be
+        # looked up with a binary search.
+        color_ints = np.array(list(color_int_to_class.keys()), dtype=np.uint32)
+        color_classes = np.array(
+            list(color_int_to_class.values()), dtype=np.uint8)
+        sort_inds = np.argsort(color_ints)
+        self.color_ints = color_ints[sort_inds]
+        self.color_classes = color_classes[sort_inds]
+
+        # Lookup table from class id to color triple. The last row is black,
+        # which is used for class ids without a color.
         class_to_color_triple = dict(
             zip(color_to_class.values(),
                 [color_to_triple(c) for c in color_to_class.keys()]))
-
-        def class_to_channel_color(channel: int, class_id: int) -> int:
-            """Given a channel (red, green, or blue) and a class, return the
-            intensity of that channel.
-
-            Args:
-                 channel: An integer with value 0, 1, or 2
-                      representing the channel.
-                 class_id: The class id represented as an integer.
-            Returns:
-                 The intensity of the channel for the color associated
-                      with the given class.
-            """
-            default_triple = (0x00, 0x00, 0x00)
-            return class_to_color_triple.get(class_id, default_triple)[channel]
-
-        class_to_r = np.vectorize(
-            lambda c: class_to_channel_color(0, c), otypes=[np.uint8])
-        class_to_g = np.vectorize(
-            lambda c: class_to_channel_color(1, c), otypes=[np.uint8])
-        class_to_b = np.vectorize(
-            lambda c: class_to_channel_color(2, c), otypes=[np.uint8])
-        self.transform_class_to_color = [class_to_r, class_to_g, class_to_b]
+        num_rows = max(class_to_color_triple.keys(), default=-1) + 2
+        self.class_to_rgb_lut = np.zeros((num_rows, 3), dtype=np.uint8)
+        for class_id, triple in class_to_color_triple.items():
+            self.class_to_rgb_lut[class_id] = triple
 
     def rgb_to_class(self, rgb_labels):
         color_int_labels = rgb_to_int_array(rgb_labels)
-        class_labels = self.transform_color_int_to_class(color_int_labels)
-        return class_labels.astype(np.uint8)
+        inds = np.searchsorted(self.color_ints, color_int_labels)
+        np.minimum(inds, len(self.color_ints) - 1, out=inds)
+        class_labels = self.color_classes[inds]
+        # Convert unspecified colors to null class
+        class_labels[self.color_ints[inds] != color_int_labels] = \
+            self.null_class_id
+        return class_labels
 
     def class_to_rgb(self, class_labels):
-        rgb_labels = np.empty(class_labels.shape + (3, ))
-        for chan in range(3):
-            class_to_channel_color = self.transform_class_to_color[chan]
-            rgb_labels[:, :, chan] = class_to_channel_color(class_labels)
-        return rgb_labels.astype(np.uint8)
+        class_labels = np.asarray(class_labels)
+        if not np.issubdtype(class_labels.dtype, np.integer):
+            class_labels = class_labels.astype(np.int64)
+        num_rows = len(self.class_to_rgb_lut)
+        if class_labels.size > 0 and (class_labels.min() < 0
+                                      or class_labels.max() >= num_rows):
+            is_valid = (class_labels >= 0) & (class_labels < num_rows)
+            class_labels = np.where(is_valid, class_labels, num_rows - 1)
+        return self.class_to_rgb_lut[class_labels]
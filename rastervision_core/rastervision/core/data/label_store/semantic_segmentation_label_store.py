@@ -1,9 +1,13 @@
+import os
+import tempfile
+
 import numpy as np
 import rasterio
 
 from rastervision.pipeline.file_system import (
     get_local_path, make_dir, upload_or_copy, file_exists, str_to_file)
-from rastervision.core.data.label import SemanticSegmentationLabels
+from rastervision.core.data.label import (SemanticSegmentationLabels,
+                                          SemanticSegmentationDenseLabels)
 from rastervision.core.data.label_store import LabelStore
 from rastervision.core.data.label_source import SegmentationClassTransformer
 from rastervision.core.data.raster_source import RasterioSourceConfig
@@ -22,7 +26,9 @@ class SemanticSegmentationLabelStore(LabelStore):
                  crs_transformer,
                  tmp_dir,
                  vector_output=None,
-                 class_config=None):
+                 class_config=None,
+                 dense=False,
+                 memmap=False):
         """Constructor.
 
         Args:
@@ -34,12 +40,19 @@ class SemanticSegmentationLabelStore(LabelStore):
                 vectorifiction configuration information
             class_config: (ClassConfig) with color values used to convert
                 class ids to RGB value
+            dense: (bool) if True, get_labels and empty_labels return
+                SemanticSegmentationDenseLabels, which store the labels in a
+                single scene-sized array
+            memmap: (bool) if True and dense is True, the array of
+                empty_labels is a memory-mapped file in tmp_dir
         """
         self.uri = uri
         self.vector_output = vector_output
         self.extent = extent
         self.crs_transformer = crs_transformer
         self.tmp_dir = tmp_dir
+        self.dense = dense
+        self.memmap = memmap
         # Note: can't name this class_transformer due to Python using that attribute
         if class_config:
             self.class_trans = SegmentationClassTransformer(class_config)
@@ -59,17 +72,23 @@ class SemanticSegmentationLabelStore(LabelStore):
         """Get all labels.
 
         Returns:
-            SemanticSegmentationLabels
+            SemanticSegmentationLabels, or SemanticSegmentationDenseLabels if
+            dense is True
         """
         if self.source is None:
             raise Exception('Raster source at {} does not exist'.format(
                 self.uri))
 
-        labels = SemanticSegmentationLabels()
         extent = self.source.get_extent()
         raw_labels = self.source.get_raw_chip(extent)
         label_arr = (np.squeeze(raw_labels) if self.class_trans is None else
                      self.class_trans.rgb_to_class(raw_labels))
+        if self.dense:
+            return SemanticSegmentationDenseLabels(
+                extent,
+                label_arr=label_arr.reshape((extent.get_height(),
+                                             extent.get_width())))
+        labels = SemanticSegmentationLabels()
         labels.set_label_arr(extent, label_arr)
         return labels
 
@@ -77,7 +96,8 @@ class SemanticSegmentationLabelStore(LabelStore):
         """Save.
 
         Args:
-            labels - (SemanticSegmentationLabels) labels to be saved
+            labels - (SemanticSegmentationLabels or
+                SemanticSegmentationDenseLabels) labels to be saved
         """
         local_path = get_local_path(self.uri, self.tmp_dir)
         make_dir(local_path, use_dirname=True)
@@ -90,8 +110,14 @@ class SemanticSegmentationLabelStore(LabelStore):
         if self.class_trans:
             band_count = 3
 
-        mask = (np.zeros((self.extent.ymax, self.extent.xmax), dtype=np.uint8)
-                if self.vector_output else None)
+        # Dense labels already hold the whole scene in one array, so it can be
+        # vectorized directly instead of being copied into a mask.
+        is_dense = (isinstance(labels, SemanticSegmentationDenseLabels)
+                    and labels.extent == self.extent)
+        mask = None
+        if self.vector_output:
+            mask = (labels.label_arr if is_dense else np.zeros(
+                (self.extent.ymax, self.extent.xmax), dtype=np.uint8))
 
         # https://github.com/mapbox/rasterio/blob/master/docs/quickstart.rst
         # https://rasterio.readthedocs.io/en/latest/topics/windowed-rw.html
@@ -111,7 +137,7 @@ class SemanticSegmentationLabelStore(LabelStore):
                 label_arr = label_arr[0:window.get_height(), 0:
                                       window.get_width()]
 
-                if mask is not None:
+                if mask is not None and not is_dense:
                     mask[window.ymin:window.ymax, window.xmin:
                          window.xmax] = label_arr
 
@@ -159,5 +185,18 @@ class SemanticSegmentationLabelStore(LabelStore):
                 str_to_file(geojson, uri)
 
     def empty_labels(self):
-        """Returns an empty SemanticSegmentationLabels object."""
+        """Returns an empty SemanticSegmentationLabels object.
+
+        If dense is True, returns SemanticSegmentationDenseLabels covering the
+        extent instead.
+        """
+        if self.dense:
+            path = None
+            if self.memmap:
+                # Each call gets its own file, since earlier labels may still
+                # be mapping theirs.
+                fd, path = tempfile.mkstemp(
+                    suffix='.mmap', prefix='labels-', dir=self.tmp_dir)
+                os.close(fd)
+            return SemanticSegmentationDenseLabels(self.extent, path=path)
         return SemanticSegmentationLabels()
@@ -92,6 +92,17 @@ class SemanticSegmentationLabelStoreConfig(LabelStoreConfig):
         description=
         ('If True, save prediction class_ids in RGB format using the colors in '
          'class_config.'))
+    dense: bool = Field(
+        False,
+        description=
+        ('If True, accumulate predictions for a scene in a single scene-sized '
+         'array instead of storing an array per window. This keeps memory use '
+         'bounded for scenes with many windows.'))
+    memmap: bool = Field(
+        False,
+        description=
+        ('If True and dense is True, the scene-sized array is a memory-mapped '
+         'file in the temporary directory rather than held in memory.'))
 
     def build(self, class_config, crs_transformer, extent, tmp_dir):
         return SemanticSegmentationLabelStore(
@@ -100,7 +111,9 @@ class SemanticSegmentationLabelStoreConfig(LabelStoreConfig):
             crs_transformer,
             tmp_dir,
             vector_output=self.vector_output,
-            class_config=class_config if self.rgb else None)
+            class_config=class_config if self.rgb else None,
+            dense=self.dense,
+            memmap=self.memmap)
 
     def update(self, pipeline=None, scene=None):
         if pipeline is not None and scene is not None:
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def boxes_to_geojson(  # noqa
         boxes,  # noqa
         class_ids,
@@ -19,11 +22,17 @@ def boxes_to_geojson(  # noqa
     Returns:
         dict in GeoJSON format
     """
-    features = []
-    for box_ind, box in enumerate(boxes):
-        polygon = box.geojson_coordinates()
-        polygon = [list(crs_transformer.pixel_to_map(p)) for p in polygon]
+    # Transform the corners of all boxes at once.
+    corners = np.array(
+        [box.geojson_coordinates() for box in boxes],
+        dtype=np.float64).reshape(-1, 2)
+    map_xs, map_ys = crs_transformer.pixel_to_map_array(
+        corners[:, 0], corners[:, 1])
+    polygons = np.stack(
+        [map_xs, map_ys], axis=1).reshape(len(boxes), 5, 2).tolist()
 
+    features = []
+    for box_ind, polygon in enumerate(polygons):
         class_id = int(class_ids[box_ind])
         class_name = class_config.get_name(class_id)
 
@@ -1,6 +1,7 @@
 # flake8: noqa
 
 from rastervision.core.data.raster_source.raster_source import *
+from rastervision.core.data.raster_source.block_cache import *
 from rastervision.core.data.raster_source.raster_source_config import *
 from rastervision.core.data.raster_source.rasterio_source import *
 from rastervision.core.data.raster_source.rasterio_source_config import *
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+import os
+import threading
+
+
+class BlockCache():
+    """An in-memory LRU cache of raster blocks with a budget in bytes.
+
+    Blocks are numpy arrays stored under hashable keys such as
+    (dataset, band, block_row, block_col). When adding a block would exceed the
+    budget, the least recently used blocks are evicted. The cache can be shared
+    between threads, and it empties itself when used from a forked process (eg.
+    a DataLoader worker) so that children never see a copy of the parent's
+    state.
+    """
+
+    def __init__(self, max_bytes):
+        """Constructor.
+
+        Args:
+            max_bytes: (int) maximum total size of the cached blocks in bytes
+        """
+        self.max_bytes = max_bytes
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._blocks = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+    def get(self, key):
+        """Return the block stored under key, or None if it isn't cached."""
+        self._check_pid()
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None:
+                self.misses += 1
+            else:
+                self._blocks.move_to_end(key)
+                self.hits += 1
+            return block
+
+    def put(self, key, block):
+        """Add a block to the cache, evicting old blocks to stay in budget."""
+        self._check_pid()
+        if block.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old_block = self._blocks.pop(key, None)
+            if old_block is not None:
+                self.nbytes -= old_block.nbytes
+            while self._blocks and self.nbytes + block.nbytes > self.max_bytes:
+                _, evicted = self._blocks.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+            self._blocks[key] = block
+            self.nbytes += block.nbytes
+
+    def clear(self):
+        """Remove all blocks and reset the counters."""
+        self._reset()
+
+    def get_stats(self):
+        """Return a dict with the hit and miss counts and current size."""
+        self._check_pid()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'num_blocks': len(self._blocks),
+            'nbytes': self.nbytes,
+            'max_bytes': self.max_bytes
+        }
+
+    def __len__(self):
+        self._check_pid()
+        return len(self._blocks)
+
+    def __getstate__(self):
+        # Don't pickle the blocks or the lock when sending to another process.
+        return {'max_bytes': self.max_bytes}
+
+    def __setstate__(self, state):
+        self.max_bytes = state['max_bytes']
+        self._reset()
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 class ChannelOrderError(Exception):
     def __init__(self, channel_order, num_channels):
@@ -67,6 +69,27 @@ class RasterSource(ABC):
         """
         pass
 
+    def _get_chips(self, windows, out=None):
+        """Return the raw chips located in a list of windows.
+
+        Subclasses can override this to read batches of windows more efficiently
+        than one at a time.
+
+        Args:
+            windows: list of Boxes which all have the same height and width
+            out: optional [len(windows), height, width, channels] array to write
+                the chips into
+
+        Returns:
+            [len(windows), height, width, channels] numpy array
+        """
+        for i, window in enumerate(windows):
+            chip = self._get_chip(window)
+            if out is None:
+                out = np.empty((len(windows), ) + chip.shape, dtype=chip.dtype)
+            out[i] = chip
+        return out
+
     def get_chip(self, window):
         """Return the transformed chip in the window.
 
@@ -89,6 +112,53 @@ class RasterSource(ABC):
 
         return chip
 
+    def get_chips(self, windows, out=None):
+        """Return the transformed chips in a list of windows as a single batch.
+
+        This is equivalent to stacking the output of get_chip for each window, but
+        the raw chips are read using _get_chips, and channel_order and
+        transformations are applied to the whole batch at once.
+
+        Args:
+            windows: list of Boxes which all have the same height and width
+            out: optional [len(windows), height, width, channels] array with the
+                dtype of this RasterSource to write the transformed chips into
+
+        Returns:
+            np.ndarray with shape [len(windows), height, width, channels]
+        """
+        if not self.channel_order and not self.raster_transformers:
+            return self._get_chips(windows, out=out)
+
+        chips = self._get_chips(windows)
+
+        if self.channel_order:
+            chips = chips[..., self.channel_order]
+
+        for transformer in self.raster_transformers:
+            chips = transformer.transform(chips, self.channel_order)
+
+        if out is not None:
+            out[...] = chips
+            return out
+        return chips
+
+    def get_window_validity(self, windows):
+        """Return which windows may contain valid (non-NODATA) imagery.
+
+        This is a fast, approximate check that lets window samplers skip
+        windows without reading their chips. A window is only marked as invalid
+        if it is known to contain nothing but NODATA. This implementation knows
+        nothing about the imagery and marks all windows as valid.
+
+        Args:
+            windows: list of Boxes or [N, 4] array of (ymin, xmin, ymax, xmax)
+
+        Returns:
+            boolean array of shape [len(windows)]
+        """
+        return np.ones(len(windows), dtype=bool)
+
     def get_raw_chip(self, window):
         """Return raw chip without using channel_order or applying transforms.
 
@@ -5,6 +5,7 @@ import pyproj
 import subprocess
 from decimal import Decimal
 import tempfile
+import threading
 
 import numpy as np
 import rasterio
@@ -14,6 +15,7 @@ from rastervision.pipeline.file_system import download_if_needed
 from rastervision.core.box import Box
 from rastervision.core.data.crs_transformer import RasterioCRSTransformer
 from rastervision.core.data.raster_source import RasterSource
+from rastervision.core.data.raster_source.block_cache import BlockCache
 from rastervision.core.data import (ActivateMixin, ActivationError)
 
 log = logging.getLogger(__name__)
@@ -21,6 +23,29 @@ wgs84 = pyproj.Proj({'init': 'epsg:4326'})
 wgs84_proj4 = '+init=epsg:4326'
 meters_per_degree = 111319.5
 
+# GDAL configuration used when streaming remote imagery. Windowed reads become
+# HTTP range requests, so these settings avoid listing the remote directory on
+# open, merge adjacent block requests, and keep recently fetched blocks and
+# file chunks in memory.
+STREAM_GDAL_OPTIONS = {
+    'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',
+    'GDAL_HTTP_MERGE_CONSECUTIVE_RANGES': 'YES',
+    'GDAL_CACHEMAX': 512,
+    'VSI_CACHE': 'TRUE',
+    'VSI_CACHE_SIZE': 64 * 1024 * 1024,
+    'CPL_VSIL_CURL_CHUNK_SIZE': 1024 * 1024,
+    'CPL_VSIL_CURL_CACHE_SIZE': 128 * 1024 * 1024,
+}
+
+# The validity mask is read at 1/DEFAULT_VALIDITY_MASK_SCALE of the resolution
+# of the imagery.
+DEFAULT_VALIDITY_MASK_SCALE = 16
+
+# Blocks in the block cache are made up of whole native blocks, and are at
+# least this many pixels along each side so that striped rasters don't result
+# in one cache entry per row.
+MIN_CACHE_BLOCK_SZ = 256
+
 
 def build_vrt(vrt_path, image_paths):
     """Build a VRT for a set of TIFF files."""
@@ -37,6 +62,24 @@ def download_and_build_vrt(image_uris, tmp_dir):
     return image_path
 
 
+def get_vsi_path(uri):
+    """Return a path that GDAL can use to read a URI without downloading it.
+
+    This requires the rastervision.gdal_vsi plugin.
+    """
+    from rastervision.gdal_vsi.vsi_file_system import VsiFileSystem
+    return VsiFileSystem.uri_to_vsi_path(uri)
+
+
+def stream_and_build_vrt(image_uris, tmp_dir):
+    """Build a VRT that references remote images in place."""
+    log.info('Building VRT...')
+    image_paths = [get_vsi_path(uri) for uri in image_uris]
+    image_path = os.path.join(tmp_dir, 'index.vrt')
+    build_vrt(image_path, image_paths)
+    return image_path
+
+
 def load_window(image_dataset, window=None, is_masked=False):
     """Load a window of an image using Rasterio.
 
@@ -72,7 +115,10 @@ class RasterioSource(ActivateMixin, RasterSource):
                  tmp_dir,
                  channel_order=None,
                  x_shift=0.0,
-                 y_shift=0.0):
+                 y_shift=0.0,
+                 stream=False,
+                 block_cache_mb=0,
+                 validity_mask_scale=DEFAULT_VALIDITY_MASK_SCALE):
         """Constructor.
 
         This RasterSource can read any file that can be opened by Rasterio/GDAL
@@ -84,6 +130,12 @@ class RasterioSource(ActivateMixin, RasterSource):
 
         Args:
             channel_order: list of indices of channels to extract from raw imagery
+            stream: if True, read windows directly from the URIs using GDAL's
+                virtual file systems instead of downloading the imagery
+            block_cache_mb: size in MB of an LRU cache of decoded blocks which is
+                used to assemble overlapping windows. If 0, no cache is used.
+            validity_mask_scale: downsampling factor of the validity mask used
+                by get_window_validity. If 0, no mask is used.
         """
         self.uris = uris
         self.tmp_dir = tmp_dir
@@ -91,6 +143,13 @@ class RasterioSource(ActivateMixin, RasterSource):
         self.image_dataset = None
         self.x_shift = x_shift
         self.y_shift = y_shift
+        self.stream = stream
+        self.validity_mask_scale = validity_mask_scale
+        self.validity_mask = None
+        self._validity_sums = None
+        self.block_cache = None
+        if block_cache_mb > 0:
+            self.block_cache = BlockCache(block_cache_mb * 1024 * 1024)
 
         num_channels = None
 
@@ -114,6 +173,10 @@ class RasterioSource(ActivateMixin, RasterSource):
 
             self.height = self.image_dataset.height
             self.width = self.image_dataset.width
+            self.block_shape = self.image_dataset.block_shapes[0]
+            self.cache_block_shape = tuple(
+                int(math.ceil(MIN_CACHE_BLOCK_SZ / sz)) * sz
+                for sz in self.block_shape)
 
             # Get 1x1 chip and apply raster transformers to test dtype.
             test_chip = self.get_raw_chip(Box.make_square(0, 0, 1))
@@ -136,6 +199,17 @@ class RasterioSource(ActivateMixin, RasterSource):
         else:
             return download_and_build_vrt(self.uris, tmp_dir)
 
+    def _stream_data(self, tmp_dir):
+        """Return a GDAL path for reading the imagery in place.
+
+        Return a single VSI path representing the image or a local VRT that
+        references the remote images.
+        """
+        if len(self.uris) == 1:
+            return get_vsi_path(self.uris[0])
+        else:
+            return stream_and_build_vrt(self.uris, tmp_dir)
+
     def get_crs_transformer(self):
         return self.crs_transformer
 
@@ -150,16 +224,156 @@ class RasterioSource(ActivateMixin, RasterSource):
         if self.image_dataset is None:
             raise ActivationError('RasterSource must be activated before use')
         shifted_window = self._get_shifted_window(window)
+        if self.block_cache is not None and all(
+                float(v).is_integer() for v in shifted_window.tuple_format()):
+            return self._get_cached_chip(shifted_window.to_int())
+        return self._load_window(shifted_window)
+
+    def _get_chips(self, windows, out=None):
+        """Return the raw chips located in a list of windows.
+
+        Windows are read in order of the blocks they start in so that reads of
+        nearby windows hit the same cached blocks. If the windows overlap enough
+        that their bounding box is no larger than their combined area, the
+        bounding box is read once and the chips are sliced out of it.
+        """
+        do_shift = self.x_shift != 0.0 or self.y_shift != 0.0
+        if do_shift or len(windows) <= 1:
+            return self._get_chips_by_window(windows, out)
+
+        ymin = min(w.ymin for w in windows)
+        xmin = min(w.xmin for w in windows)
+        ymax = max(w.ymax for w in windows)
+        xmax = max(w.xmax for w in windows)
+        region = Box(ymin, xmin, ymax, xmax)
+        windows_area = sum(w.get_area() for w in windows)
+        if region.get_area() > windows_area:
+            return self._get_chips_by_window(windows, out)
+
+        region_chip = self._get_chip(region)
+        if out is None:
+            height, width = windows[0].get_height(), windows[0].get_width()
+            out = np.empty(
+                (len(windows), height, width, region_chip.shape[2]),
+                dtype=region_chip.dtype)
+        for i, w in enumerate(windows):
+            ys = slice(w.ymin - ymin, w.ymax - ymin)
+            xs = slice(w.xmin - xmin, w.xmax - xmin)
+            out[i] = region_chip[ys, xs]
+        return out
+
+    def _get_chips_by_window(self, windows, out=None):
+        block_h, block_w = self.block_shape
+
+        def block_ind(i):
+            return (windows[i].ymin // block_h, windows[i].xmin // block_w)
+
+        for i in sorted(range(len(windows)), key=block_ind):
+            chip = self._get_chip(windows[i])
+            if out is None:
+                out = np.empty((len(windows), ) + chip.shape, dtype=chip.dtype)
+            out[i] = chip
+        return out
+
+    def _load_window(self, window):
+        dataset = self._get_dataset()
+        if self.stream:
+            # GDAL config options are only in effect inside an Env.
+            with rasterio.Env(**STREAM_GDAL_OPTIONS):
+                return load_window(
+                    dataset,
+                    window=window.rasterio_format(),
+                    is_masked=self.is_masked)
         return load_window(
-            self.image_dataset,
-            window=shifted_window.rasterio_format(),
-            is_masked=self.is_masked)
+            dataset, window=window.rasterio_format(), is_masked=self.is_masked)
+
+    def _open_dataset(self):
+        if self.stream:
+            with rasterio.Env(**STREAM_GDAL_OPTIONS):
+                return rasterio.open(self.imagery_path)
+        return rasterio.open(self.imagery_path)
+
+    def _get_dataset(self):
+        """Return the dataset to read from in the calling thread.
+
+        Rasterio datasets can't be read from by more than one thread at a time,
+        so threads other than the one that activated this source each open their
+        own dataset, which is closed on deactivation.
+        """
+        if threading.get_ident() == self.activation_thread:
+            return self.image_dataset
+        dataset = getattr(self.thread_local, 'dataset', None)
+        if dataset is None:
+            dataset = self._open_dataset()
+            self.thread_local.dataset = dataset
+            with self.thread_datasets_lock:
+                self.thread_datasets.append(dataset)
+        return dataset
+
+    def _get_cached_block(self, band, block_row, block_col):
+        """Return a single band of a block, reading all bands on a miss."""
+        dataset_key = tuple(self.uris)
+        key = (dataset_key, band, block_row, block_col)
+        block = self.block_cache.get(key)
+        if block is not None:
+            return block
+
+        block_h, block_w = self.cache_block_shape
+        ymin, xmin = block_row * block_h, block_col * block_w
+        window = Box(ymin, xmin, min(ymin + block_h, self.height),
+                     min(xmin + block_w, self.width))
+        bands = self._load_window(window)
+        for b in range(bands.shape[2]):
+            self.block_cache.put((dataset_key, b, block_row, block_col),
+                                 np.ascontiguousarray(bands[:, :, b]))
+        return bands[:, :, band]
+
+    def _get_cached_chip(self, window):
+        """Assemble a window from cached blocks.
+
+        Pixels outside the extent of the imagery are zero, as with boundless
+        reads.
+        """
+        ymin, xmin, ymax, xmax = window.tuple_format()
+        dataset = self._get_dataset()
+        nb_bands = dataset.count
+        dtype = np.dtype(dataset.dtypes[0])
+        chip = np.zeros((ymax - ymin, xmax - xmin, nb_bands), dtype=dtype)
+
+        y0, x0 = max(ymin, 0), max(xmin, 0)
+        y1, x1 = min(ymax, self.height), min(xmax, self.width)
+        if y0 >= y1 or x0 >= x1:
+            return chip
+
+        block_h, block_w = self.cache_block_shape
+        for block_row in range(y0 // block_h, (y1 - 1) // block_h + 1):
+            off_y = block_row * block_h
+            by0, by1 = max(y0, off_y), min(y1, off_y + block_h)
+            for block_col in range(x0 // block_w, (x1 - 1) // block_w + 1):
+                off_x = block_col * block_w
+                bx0, bx1 = max(x0, off_x), min(x1, off_x + block_w)
+                chip_ys = slice(by0 - ymin, by1 - ymin)
+                chip_xs = slice(bx0 - xmin, bx1 - xmin)
+                block_ys = slice(by0 - off_y, by1 - off_y)
+                block_xs = slice(bx0 - off_x, bx1 - off_x)
+                for band in range(nb_bands):
+                    block = self._get_cached_block(band, block_row, block_col)
+                    chip[chip_ys, chip_xs, band] = block[block_ys, block_xs]
+        return chip
 
     def _activate(self):
-        # Download images to temporary directory and delete it when done.
+        # Download images to temporary directory and delete it when done. When
+        # streaming, the directory only holds the VRT (if any).
         self.image_tmp_dir = tempfile.TemporaryDirectory(dir=self.tmp_dir)
-        self.imagery_path = self._download_data(self.image_tmp_dir.name)
-        self.image_dataset = rasterio.open(self.imagery_path)
+        if self.stream:
+            self.imagery_path = self._stream_data(self.image_tmp_dir.name)
+        else:
+            self.imagery_path = self._download_data(self.image_tmp_dir.name)
+        self.image_dataset = self._open_dataset()
+        self.activation_thread = threading.get_ident()
+        self.thread_local = threading.local()
+        self.thread_datasets = []
+        self.thread_datasets_lock = threading.Lock()
         self._set_crs_transformer()
 
     def _set_crs_transformer(self):
@@ -175,9 +389,111 @@ class RasterioSource(ActivateMixin, RasterSource):
     def _deactivate(self):
         self.image_dataset.close()
         self.image_dataset = None
+        for dataset in self.thread_datasets:
+            dataset.close()
+        self.thread_datasets = []
+        self.thread_datasets_lock = None
+        self.thread_local = None
+        self.validity_mask = None
+        self._validity_sums = None
         self.image_tmp_dir.cleanup()
         self.image_tmp_dir = None
 
+    def get_validity_mask(self):
+        """Return a low resolution mask of pixels that may have valid imagery.
+
+        The mask is only made if every channel in channel_order has overviews,
+        in which case it is read with a single decimated read that GDAL serves
+        from the overviews. Without overviews, the decimated read would decode
+        the whole image, so no mask is made. A cell is True if its sampled pixel
+        is not masked and not zero in every channel, which is the same test
+        used to detect blank chips. Since each cell is only sampled at one
+        pixel, the mask is then dilated by one cell so that valid pixels near
+        sampled NODATA are less likely to be missed. The mask is cached until
+        this source is deactivated.
+
+        Returns:
+            boolean array of shape (ceil(height / validity_mask_scale),
+            ceil(width / validity_mask_scale)), or None if validity_mask_scale
+            is 0, the imagery doesn't have overviews, or x_shift or y_shift is
+            set (since windows are then shifted before being read)
+        """
+        if self.image_dataset is None:
+            raise ActivationError('RasterSource must be activated before use')
+        if not self.validity_mask_scale:
+            return None
+        if self.x_shift != 0.0 or self.y_shift != 0.0:
+            return None
+        if self.validity_mask is None:
+            scale = self.validity_mask_scale
+            out_height = int(math.ceil(self.height / scale))
+            out_width = int(math.ceil(self.width / scale))
+            channel_order = self.channel_order or range(self.num_channels)
+            indexes = [c + 1 for c in channel_order]
+            dataset = self._get_dataset()
+            if not all(dataset.overviews(i) for i in indexes):
+                return None
+            im = dataset.read(
+                indexes=indexes,
+                out_shape=(len(indexes), out_height, out_width),
+                masked=self.is_masked)
+            if self.is_masked:
+                im = np.ma.filled(im, fill_value=0)
+            valid = np.zeros((out_height, out_width), dtype=bool)
+            for i, channel in enumerate(channel_order):
+                channel_valid = im[i] != 0
+                nodata = dataset.nodatavals[channel]
+                if nodata is not None:
+                    channel_valid &= im[i] != nodata
+                valid |= channel_valid
+
+            padded = np.pad(valid, 1, mode='constant')
+            for dy in range(3):
+                for dx in range(3):
+                    valid |= padded[dy:dy + out_height, dx:dx + out_width]
+            self.validity_mask = valid
+
+            # Summed-area table of the mask, so the number of valid cells under
+            # a window can be computed in constant time.
+            sums = np.zeros((out_height + 1, out_width + 1), dtype=np.int64)
+            sums[1:, 1:] = np.cumsum(np.cumsum(valid, axis=0), axis=1)
+            self._validity_sums = sums
+        return self.validity_mask
+
+    def get_window_validity(self, windows):
+        """Return which windows may contain valid (non-NODATA) imagery.
+
+        A window is marked as invalid if all cells of the validity mask that it
+        overlaps are invalid. Since the mask is sampled at a lower resolution,
+        windows with a few valid pixels in a NODATA area may still be marked as
+        invalid, so this should only be used where that is acceptable, eg. when
+        sampling random windows. If there is no mask, all windows are valid.
+
+        Args:
+            windows: list of Boxes or [N, 4] array of (ymin, xmin, ymax, xmax)
+
+        Returns:
+            boolean array of shape [len(windows)]
+        """
+        mask = self.get_validity_mask()
+        if mask is None or len(windows) == 0:
+            return np.ones(len(windows), dtype=bool)
+        if not isinstance(windows, np.ndarray):
+            windows = np.array([w.tuple_format() for w in windows])
+
+        mask_height, mask_width = mask.shape
+        ys = windows[:, [0, 2]] * (mask_height / self.height)
+        xs = windows[:, [1, 3]] * (mask_width / self.width)
+        row0 = np.clip(np.floor(ys[:, 0]), 0, mask_height).astype(int)
+        row1 = np.clip(np.ceil(ys[:, 1]), 0, mask_height).astype(int)
+        col0 = np.clip(np.floor(xs[:, 0]), 0, mask_width).astype(int)
+        col1 = np.clip(np.ceil(xs[:, 1]), 0, mask_width).astype(int)
+
+        sums = self._validity_sums
+        nb_valid = sums[row1, col1] - sums[row0, col1]
+        nb_valid -= sums[row1, col0] - sums[row0, col0]
+        return nb_valid > 0
+
     def _get_shifted_window(self, window):
         do_shift = self.x_shift != 0.0 or self.y_shift != 0.0
         if do_shift:
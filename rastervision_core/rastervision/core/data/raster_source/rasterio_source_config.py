@@ -22,6 +22,30 @@ class RasterioSourceConfig(RasterSourceConfig):
         descriptions=
         ('A number of meters to shift along the y-axis. A positive shift moves the '
          '"camera" down.'))
+    stream: bool = Field(
+        False,
+        description=
+        ('If True, read windows directly from the URIs using GDAL\'s virtual file '
+         'systems (eg. /vsis3/, /vsicurl/) instead of downloading the imagery '
+         'before opening it. This makes activation time and disk usage '
+         'independent of the size of the imagery, and works best with tiled '
+         'imagery such as COGs. Requires the rastervision.gdal_vsi plugin.'))
+    block_cache_mb: int = Field(
+        0,
+        description=
+        ('Size in MB of an in-memory LRU cache of decoded blocks of the imagery. '
+         'Windows are assembled from cached blocks, so overlapping windows (eg. '
+         'when using a stride smaller than the chip size) only decode each block '
+         'once. If 0, no cache is used.'))
+    validity_mask_scale: int = Field(
+        16,
+        description=
+        ('Downsampling factor of a low resolution mask of valid (non-NODATA) '
+         'pixels which is read from the overviews of the imagery once per '
+         'activation. The object detection negative window sampler uses it to '
+         'skip windows that only contain NODATA without reading them at full '
+         'resolution. If 0, or if the imagery has no overviews, no mask is '
+         'used.'))
 
     def build(self, tmp_dir, use_transformers=True):
         raster_transformers = ([rt.build() for rt in self.transformers]
@@ -33,4 +57,7 @@ class RasterioSourceConfig(RasterSourceConfig):
             tmp_dir,
             channel_order=self.channel_order,
             x_shift=self.x_shift,
-            y_shift=self.y_shift)
+            y_shift=self.y_shift,
+            stream=self.stream,
+            block_cache_mb=self.block_cache_mb,
+            validity_mask_scale=self.validity_mask_scale)
@@ -1,34 +1,32 @@
 import logging
 
+import tempfile
+
 from rasterio.features import rasterize
+from rasterio.transform import Affine
 import numpy as np
 from shapely.geometry import shape
 from shapely.strtree import STRtree
-from shapely.ops import transform
 
+from rastervision.pipeline import rv_config
+from rastervision.core.box import Box
 from rastervision.core.data import (ActivateMixin, ActivationError)
-from rastervision.core.data.raster_source import RasterSource
+from rastervision.core.data.raster_source import RasterSource, BlockCache
 
 log = logging.getLogger(__name__)
 
 
 def geoms_to_raster(str_tree, rasterizer_config, window, extent):
+    """Rasterize the geometries in str_tree that fall within window.
+
+    Geometries are rasterized with a transform that offsets them into the frame
+    of the window, rather than being cropped and translated one by one.
+    """
     background_class_id = rasterizer_config.background_class_id
     all_touched = rasterizer_config.all_touched
 
-    log.debug('Cropping shapes to window...')
-    # Crop shapes against window, remove empty shapes, and put in window frame of
-    # reference.
-    window_geom = window.to_shapely()
-    shapes = str_tree.query(window_geom)
+    shapes = str_tree.query(window.to_shapely())
     shapes = [(s, s.class_id) for s in shapes]
-    shapes = [(s.intersection(window_geom), c) for s, c in shapes]
-    shapes = [(s, c) for s, c in shapes if not s.is_empty]
-
-    def to_window_frame(x, y, z=None):
-        return (x - window.xmin, y - window.ymin)
-
-    shapes = [(transform(to_window_frame, s), c) for s, c in shapes]
     log.debug('# of shapes in window: {}'.format(len(shapes)))
 
     out_shape = (window.get_height(), window.get_width())
@@ -40,6 +38,7 @@ def geoms_to_raster(str_tree, rasterizer_config, window, extent):
             shapes,
             out_shape=out_shape,
             fill=background_class_id,
+            transform=Affine.translation(window.xmin, window.ymin),
             dtype=np.uint8,
             all_touched=all_touched)
     else:
@@ -49,10 +48,23 @@ def geoms_to_raster(str_tree, rasterizer_config, window, extent):
 
 
 class RasterizedSource(ActivateMixin, RasterSource):
-    """A RasterSource based on the rasterization of a VectorSource."""
-
-    def __init__(self, vector_source, rasterizer_config, extent,
-                 crs_transformer):
+    """A RasterSource based on the rasterization of a VectorSource.
+
+    If the extent fits in rasterize_extent_mb, the whole extent is rasterized
+    once when activated, and chips are slices of the result. Otherwise, tiles of
+    size tile_sz aligned to the extent are rasterized when first needed and kept
+    in an LRU cache of tile_cache_mb.
+    """
+
+    def __init__(self,
+                 vector_source,
+                 rasterizer_config,
+                 extent,
+                 crs_transformer,
+                 rasterize_extent_mb=0,
+                 memmap=False,
+                 tile_sz=1024,
+                 tile_cache_mb=0):
         """Constructor.
 
         Args:
@@ -60,11 +72,26 @@ class RasterizedSource(ActivateMixin, RasterSource):
             rasterizer_config: (RasterizerConfig)
             extent: (Box) extent of corresponding imagery RasterSource
             crs_transformer: (CRSTransformer)
+            rasterize_extent_mb: (int) rasterize the whole extent on activation
+                if it takes at most this many MB
+            memmap: (bool) if True, the rasterized extent is stored in a
+                memory-mapped temporary file rather than in memory
+            tile_sz: (int) size of the tiles cached if the whole extent isn't
+                rasterized
+            tile_cache_mb: (int) size of the tile cache in MB. If 0, each chip
+                is rasterized separately.
         """
         self.vector_source = vector_source
         self.rasterizer_config = rasterizer_config
         self.extent = extent
         self.crs_transformer = crs_transformer
+        self.rasterize_extent_mb = rasterize_extent_mb
+        self.memmap = memmap
+        self.tile_sz = tile_sz
+        self.tile_cache = (BlockCache(tile_cache_mb * 1024 * 1024)
+                           if tile_cache_mb > 0 else None)
+        self.raster = None
+        self.raster_file = None
         self.activated = False
 
         super().__init__(channel_order=[0], num_channels=1)
@@ -89,9 +116,7 @@ class RasterizedSource(ActivateMixin, RasterSource):
         """Return the chip located in the window.
 
         Polygons falling within the window are rasterized using the class_id, and
-        the background is filled with background_class_id. Also, any pixels in the
-        window outside the extent are zero, which is the don't-care class for
-        segmentation.
+        the background is filled with background_class_id.
 
         Args:
             window: Box
@@ -103,11 +128,76 @@ class RasterizedSource(ActivateMixin, RasterSource):
             raise ActivationError('GeoJSONSource must be activated before use')
 
         log.debug('Rasterizing window: {}'.format(window))
-        chip = geoms_to_raster(self.str_tree, self.rasterizer_config, window,
-                               self.get_extent())
+        if self.raster is not None and self._is_in_extent(window):
+            # Callers such as label sources may modify the chip, so it must not
+            # be a view of the raster.
+            chip = self.raster[window.ymin:window.ymax, window.xmin:
+                               window.xmax].copy()
+        elif self.tile_cache is not None:
+            chip = self._get_tiled_chip(window)
+        else:
+            chip = geoms_to_raster(self.str_tree, self.rasterizer_config,
+                                   window, self.get_extent())
         # Add third singleton dim since rasters must have >=1 channel.
         return np.expand_dims(chip, 2)
 
+    def _is_in_extent(self, window):
+        return (window.ymin >= self.extent.ymin
+                and window.xmin >= self.extent.xmin
+                and window.ymax <= self.extent.ymax
+                and window.xmax <= self.extent.xmax)
+
+    def _get_tile(self, tile_row, tile_col):
+        key = (tile_row, tile_col)
+        tile = self.tile_cache.get(key)
+        if tile is None:
+            tile_window = Box.make_square(
+                tile_row * self.tile_sz, tile_col * self.tile_sz, self.tile_sz)
+            tile = geoms_to_raster(self.str_tree, self.rasterizer_config,
+                                   tile_window, self.get_extent())
+            self.tile_cache.put(key, tile)
+        return tile
+
+    def _get_tiled_chip(self, window):
+        """Assemble the chip from the cached tiles that overlap window."""
+        chip = np.empty(
+            (window.get_height(), window.get_width()), dtype=np.uint8)
+        ts = self.tile_sz
+        for tile_row in range(window.ymin // ts, (window.ymax - 1) // ts + 1):
+            for tile_col in range(window.xmin // ts,
+                                  (window.xmax - 1) // ts + 1):
+                tile = self._get_tile(tile_row, tile_col)
+                ymin = max(window.ymin, tile_row * ts)
+                ymax = min(window.ymax, (tile_row + 1) * ts)
+                xmin = max(window.xmin, tile_col * ts)
+                xmax = min(window.xmax, (tile_col + 1) * ts)
+                chip_ys = slice(ymin - window.ymin, ymax - window.ymin)
+                chip_xs = slice(xmin - window.xmin, xmax - window.xmin)
+                tile_ys = slice(ymin - tile_row * ts, ymax - tile_row * ts)
+                tile_xs = slice(xmin - tile_col * ts, xmax - tile_col * ts)
+                chip[chip_ys, chip_xs] = tile[tile_ys, tile_xs]
+        return chip
+
+    def _rasterize_extent(self):
+        """Rasterize the whole extent, one tile at a time."""
+        shape = (self.extent.ymax, self.extent.xmax)
+        if self.memmap:
+            self.raster_file = tempfile.TemporaryFile(
+                dir=rv_config.get_tmp_dir_root())
+            raster = np.memmap(
+                self.raster_file, dtype=np.uint8, mode='w+', shape=shape)
+        else:
+            raster = np.empty(shape, dtype=np.uint8)
+
+        full_extent = Box(0, 0, self.extent.ymax, self.extent.xmax)
+        for tile_window in full_extent.get_windows(self.tile_sz, self.tile_sz):
+            tile_window = tile_window.intersection(full_extent)
+            raster[tile_window.ymin:tile_window.ymax,
+                   tile_window.xmin:tile_window.xmax] = geoms_to_raster(
+                       self.str_tree, self.rasterizer_config, tile_window,
+                       self.get_extent())
+        return raster
+
     def _activate(self):
         geojson = self.vector_source.get_geojson()
         geoms = []
@@ -118,6 +208,16 @@ class RasterizedSource(ActivateMixin, RasterSource):
         self.str_tree = STRtree(geoms)
         self.activated = True
 
+        extent_mb = self.extent.ymax * self.extent.xmax / (1024 * 1024)
+        if extent_mb <= self.rasterize_extent_mb:
+            self.raster = self._rasterize_extent()
+
     def _deactivate(self):
         self.str_tree = None
+        self.raster = None
+        if self.raster_file is not None:
+            self.raster_file.close()
+            self.raster_file = None
+        if self.tile_cache is not None:
+            self.tile_cache.clear()
         self.activated = False
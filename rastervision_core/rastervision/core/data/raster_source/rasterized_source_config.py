@@ -23,15 +23,51 @@ class RasterizerConfig(Config):
 class RasterizedSourceConfig(Config):
     vector_source: VectorSourceConfig
     rasterizer_config: RasterizerConfig
+    rasterize_extent_mb: int = Field(
+        0,
+        description=
+        ('If the extent takes at most this many MB as a uint8 array, the whole '
+         'extent is rasterized once on activation and chips are copied out of '
+         'it. This uses that much memory (or disk, if memmap is True) per '
+         'activated scene, including in each chip worker process. If 0, the '
+         'extent is not rasterized.'))
+    memmap: bool = Field(
+        False,
+        description=(
+            'If True, the rasterized extent is stored in a memory-mapped '
+            'temporary file instead of in memory.'))
+    tile_sz: int = Field(
+        1024,
+        description=(
+            'If the whole extent is not rasterized, tiles of this size are '
+            'rasterized as needed and cached.'))
+    tile_cache_mb: int = Field(
+        128,
+        description=(
+            'Size in MB of the cache of rasterized tiles. If 0, each chip is '
+            'rasterized separately.'))
 
     def build(self, class_config, crs_transformer, extent):
-        vector_source = self.vector_source.build(class_config, crs_transformer)
+        vector_source = self.vector_source.build(
+            class_config, crs_transformer, extent=extent)
 
-        return RasterizedSource(vector_source, self.rasterizer_config, extent,
-                                crs_transformer)
+        return RasterizedSource(
+            vector_source,
+            self.rasterizer_config,
+            extent,
+            crs_transformer,
+            rasterize_extent_mb=self.rasterize_extent_mb,
+            memmap=self.memmap,
+            tile_sz=self.tile_sz,
+            tile_cache_mb=self.tile_cache_mb)
 
     def validate_config(self):
         if self.vector_source.has_null_class_bufs():
             raise ConfigError(
                 'Setting buffer to None for a class in the vector_source is '
                 'not allowed for RasterizedSourceConfig.')
+        if self.tile_sz <= 0:
+            raise ConfigError('tile_sz must be > 0')
+        if self.rasterize_extent_mb < 0 or self.tile_cache_mb < 0:
+            raise ConfigError(
+                'rasterize_extent_mb and tile_cache_mb must be >= 0')
@@ -11,11 +11,13 @@ class RasterTransformer(ABC):
         Args:
             chip: ndarray of shape [height, width, channels] This is assumed to already
                 have the channel_order applied to it if channel_order is set. In other
-                words, channels should be equal to len(channel_order).
+                words, channels should be equal to len(channel_order). When
+                transforming a batch of chips, the shape is
+                [batch_sz, height, width, channels].
             channel_order: list of indices of channels that were extracted from the
                 raw imagery.
 
         Returns:
-            [height, width, channels] numpy array
+            numpy array with the same shape as chip
         """
         pass
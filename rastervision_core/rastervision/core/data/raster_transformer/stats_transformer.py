@@ -6,6 +6,10 @@ from rastervision.core.data.raster_transformer.raster_transformer \
 
 class StatsTransformer(RasterTransformer):
     """Transforms non-uint8 to uint8 values using raster_stats.
+
+    For 16-bit integer imagery, the transformation of every possible value is
+    precomputed into a lookup table per channel, so transforming a chip is a
+    single lookup per pixel.
     """
 
     def __init__(self, raster_stats=None):
@@ -16,6 +20,8 @@ class StatsTransformer(RasterTransformer):
                 desired statistics
         """
         self.raster_stats = raster_stats
+        # Lookup tables for 16-bit imagery, keyed by dtype and channel_order.
+        self._luts = {}
 
     def transform(self, chip, channel_order=None):
         """Transform a chip.
@@ -25,43 +31,81 @@ class StatsTransformer(RasterTransformer):
         Args:
             chip: ndarray of shape [height, width, channels] This is assumed to already
                 have the channel_order applied to it if channel_order is set. In other
-                words, channels should be equal to len(channel_order).
+                words, channels should be equal to len(channel_order). A batch of
+                shape [batch_sz, height, width, channels] can also be passed.
             channel_order: list of indices of channels that were extracted from the
                 raw imagery.
 
         Returns:
-            [height, width, channels] uint8 numpy array
+            uint8 numpy array with the same shape as chip
+
+        """
+        if chip.dtype == np.uint8:
+            return chip
+        if not self.raster_stats:
+            raise ValueError('raster_stats not defined.')
+
+        if channel_order is None:
+            channel_order = np.arange(chip.shape[-1])
+
+        if chip.dtype in (np.uint16, np.int16):
+            return self._transform_with_lut(chip, channel_order)
+        return self._transform_fused(chip, channel_order)
+
+    def _get_means_and_stds(self, channel_order):
+        means = np.array(self.raster_stats.means)
+        means = means[channel_order].astype(np.float64)
+        stds = np.array(self.raster_stats.stds)
+        stds = stds[channel_order].astype(np.float64)
+        return means, stds
+
+    def _transform_fused(self, chip, channel_order):
+        """Transform a chip using a single float64 buffer.
+
+        This does the same arithmetic, in the same order, as building each step
+        as a new array, so the output is identical.
+        """
+        means, stds = self._get_means_and_stds(channel_order)
+
+        # Don't transform NODATA zero values.
+        nodata = chip == 0
+
+        # Subtract mean and divide by std to get zscores.
+        out = np.subtract(chip, means, dtype=np.float64)
+        out /= stds
+
+        # Make zscores that fall between -3 and 3 span 0 to 255.
+        out += 3
+        out /= 6
+
+        np.clip(out, 0, 1, out=out)
+        out *= 255
+        out = out.astype(np.uint8)
+
+        out[nodata] = 0
+        return out
+
+    def _get_luts(self, dtype, channel_order):
+        """Return an array with a uint8 lookup table per channel.
 
+        The tables have 65536 entries, indexed by the values of chip viewed as
+        uint16, and are computed with _transform_fused so that the output is
+        identical.
         """
-        if chip.dtype != np.uint8:
-            if self.raster_stats:
-                if channel_order is None:
-                    channel_order = np.arange(chip.shape[2])
-
-                # Subtract mean and divide by std to get zscores.
-                means = np.array(self.raster_stats.means)
-                means = means[np.newaxis, np.newaxis, channel_order].astype(
-                    np.float)
-                stds = np.array(self.raster_stats.stds)
-                stds = stds[np.newaxis, np.newaxis, channel_order].astype(
-                    np.float)
-
-                # Don't transform NODATA zero values.
-                nodata = chip == 0
-
-                chip = chip - means
-                chip = chip / stds
-
-                # Make zscores that fall between -3 and 3 span 0 to 255.
-                chip += 3
-                chip /= 6
-
-                chip = np.clip(chip, 0, 1)
-                chip *= 255
-                chip = chip.astype(np.uint8)
-
-                chip[nodata] = 0
-            else:
-                raise ValueError('raster_stats not defined.')
-
-        return chip
+        key = (np.dtype(dtype).str, tuple(channel_order))
+        luts = self._luts.get(key)
+        if luts is None:
+            values = np.arange(2**16, dtype=np.uint32).astype(np.uint16)
+            values = values.view(dtype)
+            values = np.repeat(values[:, None], len(channel_order), axis=1)
+            luts = self._transform_fused(values, channel_order).T.copy()
+            self._luts[key] = luts
+        return luts
+
+    def _transform_with_lut(self, chip, channel_order):
+        luts = self._get_luts(chip.dtype, channel_order)
+        inds = chip.view(np.uint16)
+        out = np.empty(chip.shape, dtype=np.uint8)
+        for channel_ind, lut in enumerate(luts):
+            np.take(lut, inds[..., channel_ind], out=out[..., channel_ind])
+        return out
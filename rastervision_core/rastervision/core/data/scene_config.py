@@ -23,6 +23,11 @@ class SceneConfig(Config):
         ('List of URIs of GeoJSON files that define the AOIs for the scene. Each polygon'
          'defines an AOI which is a piece of the scene that is assumed to be fully '
          'labeled and usable for training or validation.'))
+    aoi_cache_dir: Optional[str] = Field(
+        None,
+        description=(
+            'Local directory used to cache the AOIs in pixel coordinates, like '
+            'the cache_dir of a vector source. If None, no cache is used.'))
 
     def build(self, class_config, tmp_dir, use_transformers=True):
         raster_source = self.raster_source.build(
@@ -44,7 +49,10 @@ class SceneConfig(Config):
                 # Set default class id to 0 to avoid deleting features. If it was
                 # set to None, they would all be deleted.
                 aoi_geojson = GeoJSONVectorSourceConfig(
-                    uri=uri, default_class_id=0, ignore_crs_field=True).build(
+                    uri=uri,
+                    default_class_id=0,
+                    ignore_crs_field=True,
+                    cache_dir=self.aoi_cache_dir).build(
                         class_config, crs_transformer).get_geojson()
                 for f in aoi_geojson['features']:
                     aoi_polygons.append(shape(f['geometry']))
@@ -2,6 +2,8 @@
 
 from rastervision.core.data.vector_source.geojson_vector_source import *
 from rastervision.core.data.vector_source.geojson_vector_source_config import *
+from rastervision.core.data.vector_source.vector_source_cache import *
+from rastervision.core.data.vector_source.geojson_stream_reader import *
 from rastervision.core.data.vector_source.vector_source import *
 from rastervision.core.data.vector_source.vector_source_config import *
 from rastervision.core.data.vector_source.class_inference import *
@@ -0,0 +1,122 @@
+import json
+import re
+
+DEFAULT_CHUNK_SZ = 1024 * 1024
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class GeoJSONStreamReader():
+    """Incrementally parses the features of a GeoJSON FeatureCollection.
+
+    The file is read in chunks, and each feature is decoded and yielded on its
+    own, so that memory use is bounded by the size of the largest feature
+    rather than the size of the file. Top-level members other than features
+    (eg. type, crs, bbox) are stored in the members dict as they are read.
+    """
+
+    def __init__(self, file, chunk_sz=DEFAULT_CHUNK_SZ):
+        """Constructor.
+
+        Args:
+            file: file-like object opened in text mode
+            chunk_sz: (int) number of characters to read at a time
+        """
+        self.file = file
+        self.chunk_sz = chunk_sz
+        self.members = {}
+
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Read more of the file into the buffer.
+
+        Returns:
+            False if the end of the file was reached, True otherwise
+        """
+        # Read at least as much as is already buffered so that decoding a
+        # value that is much larger than chunk_sz isn't quadratic.
+        remaining = self._buf[self._pos:]
+        chunk = self.file.read(max(self.chunk_sz, len(remaining)))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = remaining + chunk
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            self._pos = WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or not self._fill():
+                return
+
+    def _peek_char(self):
+        self._skip_whitespace()
+        if self._pos >= len(self._buf):
+            raise ValueError('Unexpected end of GeoJSON.')
+        return self._buf[self._pos]
+
+    def _next_char(self):
+        c = self._peek_char()
+        self._pos += 1
+        return c
+
+    def _expect_char(self, expected):
+        c = self._next_char()
+        if c != expected:
+            raise ValueError('Expected "{}" in GeoJSON but found "{}".'.format(
+                expected, c))
+
+    def _decode_value(self):
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # A value that ends at the end of the buffer (eg. a number)
+                # might continue in the next chunk.
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def _iter_array(self):
+        self._expect_char('[')
+        if self._peek_char() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            c = self._next_char()
+            if c == ']':
+                return
+            if c != ',':
+                raise ValueError(
+                    'Expected "," or "]" in GeoJSON but found "{}".'.format(c))
+
+    def iter_features(self):
+        """Yield each feature of the FeatureCollection as a dict."""
+        self._expect_char('{')
+        if self._peek_char() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            self._expect_char(':')
+            if key == 'features':
+                yield from self._iter_array()
+            else:
+                self.members[key] = self._decode_value()
+            c = self._next_char()
+            if c == '}':
+                return
+            if c != ',':
+                raise ValueError(
+                    'Expected "," or "}}" in GeoJSON but found "{}".'.format(
+                        c))
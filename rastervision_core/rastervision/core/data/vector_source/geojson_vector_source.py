@@ -1,15 +1,29 @@
 import json
 
-from rastervision.core.data.vector_source.vector_source import VectorSource
-from rastervision.pipeline.file_system import file_to_str
+from shapely.geometry import shape
+
+from rastervision.core.data.vector_source.vector_source import (
+    VectorSource, transform_geojson, transform_geometries)
+from rastervision.core.data.vector_source.geojson_stream_reader import (
+    GeoJSONStreamReader)
+from rastervision.pipeline import rv_config
+from rastervision.pipeline.file_system import (file_to_str, FileSystem,
+                                               download_if_needed)
+
+# Number of features to transform to pixel coords at a time when streaming.
+STREAM_BATCH_SZ = 1000
 
 
 class GeoJSONVectorSource(VectorSource):
-    def __init__(self, geojson_vs_config, class_config, crs_transformer):
-        super().__init__(geojson_vs_config, class_config, crs_transformer)
+    def __init__(self,
+                 geojson_vs_config,
+                 class_config,
+                 crs_transformer,
+                 extent=None):
+        super().__init__(
+            geojson_vs_config, class_config, crs_transformer, extent=extent)
 
-    def _get_geojson(self):
-        geojson = json.loads(file_to_str(self.vs_config.uri))
+    def _check_crs_field(self, geojson):
         if not self.vs_config.ignore_crs_field and 'crs' in geojson:
             raise Exception((
                 'The GeoJSON file at {} contains a CRS field which is not '
@@ -19,4 +33,62 @@ class GeoJSONVectorSource(VectorSource):
                 'like to ignore the CRS field, set ignore_crs_field=True in '
                 'GeoJSONVectorSourceConfig.').format(self.vs_config.uri))
 
+    def _get_geojson(self):
+        geojson = json.loads(file_to_str(self.vs_config.uri))
+        self._check_crs_field(geojson)
         return self.class_inference.transform_geojson(geojson)
+
+    def _get_transformed_geojson(self, to_map_coords=False):
+        if not self.vs_config.stream:
+            return super()._get_transformed_geojson(to_map_coords)
+
+        features = []
+        extent_geom = None
+        if self.extent is not None:
+            extent_geom = self.extent.to_shapely()
+
+        def add_batch(batch):
+            geojson = {'type': 'FeatureCollection', 'features': batch}
+            geojson = transform_geojson(geojson, self.crs_transformer,
+                                        self.vs_config.line_bufs,
+                                        self.vs_config.point_bufs)
+            for f in geojson['features']:
+                if (extent_geom is None
+                        or shape(f['geometry']).intersects(extent_geom)):
+                    features.append(f)
+
+        with rv_config.get_tmp_dir() as tmp_dir:
+            path = download_if_needed(self.vs_config.uri, tmp_dir)
+            with open(path, 'r', encoding='utf-8') as file:
+                reader = GeoJSONStreamReader(file)
+                batch = []
+                for feature in reader.iter_features():
+                    self._check_crs_field(reader.members)
+                    class_id = self.class_inference.infer_class_id(feature)
+                    if class_id is None:
+                        continue
+                    properties = feature.get('properties') or {}
+                    properties['class_id'] = class_id
+                    feature['properties'] = properties
+                    batch.append(feature)
+                    if len(batch) == STREAM_BATCH_SZ:
+                        add_batch(batch)
+                        batch = []
+                add_batch(batch)
+                self._check_crs_field(reader.members)
+
+        if to_map_coords:
+            geometries = transform_geometries(
+                [f['geometry'] for f in features],
+                self.crs_transformer.pixel_to_map_array)
+            for f, geometry in zip(features, geometries):
+                f['geometry'] = geometry
+
+        return {'type': 'FeatureCollection', 'features': features}
+
+    def _get_cache_version(self):
+        uri = self.vs_config.uri
+        last_modified = FileSystem.get_file_system(uri).last_modified(uri)
+        if last_modified is None:
+            return None
+        return last_modified.isoformat()
@@ -9,6 +9,15 @@ from rastervision.pipeline.config import register_config, Field
 class GeoJSONVectorSourceConfig(VectorSourceConfig):
     uri: str = Field(..., description='The URI of a GeoJSON file.')
     ignore_crs_field: bool = False
+    stream: bool = Field(
+        False,
+        description=
+        ('If True, the file is parsed incrementally and features are converted '
+         'to pixel coords in batches, instead of loading the whole file into '
+         'memory. Features that don\'t intersect the extent of the scene (if '
+         'known) are dropped, so memory use is proportional to the number of '
+         'features in the scene. Use this for very large files.'))
 
-    def build(self, class_config, crs_transformer):
-        return GeoJSONVectorSource(self, class_config, crs_transformer)
+    def build(self, class_config, crs_transformer, extent=None):
+        return GeoJSONVectorSource(
+            self, class_config, crs_transformer, extent=extent)
@@ -1,16 +1,115 @@
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from numbers import Number
+from typing import TYPE_CHECKING, Optional
 
+import numpy as np
 from shapely.geometry import shape, mapping
-from shapely.ops import transform
 
 from rastervision.core.data.vector_source.class_inference import (
     ClassInference)
+from rastervision.core.data.vector_source.vector_source_cache import (
+    VectorSourceCache, get_vector_cache_key)
 
 if TYPE_CHECKING:
     from rastervision.core.data.vector_source.vector_source_config import VectorSourceConfig  # noqa
     from rastervision.core.data.class_config import ClassConfig  # noqa
     from rastervision.core.data.crs_transformer import CRSTransformer  # noqa
+    from rastervision.core.box import Box  # noqa
+
+
+class _CoordsRef():
+    """Placeholder for coordinates that were moved into a flat array."""
+    __slots__ = ['ind', 'is_position']
+
+    def __init__(self, ind, is_position):
+        self.ind = ind
+        self.is_position = is_position
+
+
+def _is_position(coords):
+    return len(coords) > 0 and isinstance(coords[0], Number)
+
+
+def _collect_coords(coords, arrays):
+    """Replace each list of positions in coords by a _CoordsRef.
+
+    The x and y values of the positions are appended to arrays as an (N, 2)
+    array. Any z values are dropped.
+    """
+    if len(coords) == 0:
+        return coords
+    if _is_position(coords):
+        arrays.append(np.array([coords[0:2]], dtype=np.float64))
+        return _CoordsRef(len(arrays) - 1, True)
+    if _is_position(coords[0]):
+        try:
+            arr = np.array(coords, dtype=np.float64)[:, 0:2]
+        except ValueError:
+            # Positions with and without z values.
+            arr = np.array([c[0:2] for c in coords], dtype=np.float64)
+        arrays.append(arr)
+        return _CoordsRef(len(arrays) - 1, False)
+    return [_collect_coords(c, arrays) for c in coords]
+
+
+def _rebuild_coords(coords, arrays):
+    if isinstance(coords, _CoordsRef):
+        positions = arrays[coords.ind]
+        if coords.is_position:
+            return positions[0]
+        return positions
+    return [_rebuild_coords(c, arrays) for c in coords]
+
+
+def transform_geometries(geometries, transform_fn):
+    """Transform the coordinates of GeoJSON geometries.
+
+    The coordinates of all geometries are gathered into a pair of x and y
+    arrays so that transform_fn is called only once, and then the geometries
+    are rebuilt from the transformed arrays.
+
+    Args:
+        geometries: list of GeoJSON geometry dicts
+        transform_fn: function that maps (xs, ys) arrays to new (xs, ys)
+            arrays, eg. CRSTransformer.map_to_pixel_array
+
+    Returns:
+        list of new GeoJSON geometry dicts with 2D coordinates
+    """
+    arrays = []
+
+    def collect(geometry):
+        new_geometry = dict(geometry)
+        if geometry.get('geometries') is not None:
+            new_geometry['geometries'] = [
+                collect(g) for g in geometry['geometries']
+            ]
+        else:
+            new_geometry['coordinates'] = _collect_coords(
+                geometry['coordinates'], arrays)
+        return new_geometry
+
+    def rebuild(geometry, arrays):
+        if geometry.get('geometries') is not None:
+            geometry['geometries'] = [
+                rebuild(g, arrays) for g in geometry['geometries']
+            ]
+        else:
+            geometry['coordinates'] = _rebuild_coords(geometry['coordinates'],
+                                                      arrays)
+        return geometry
+
+    new_geometries = [collect(g) for g in geometries]
+    if not arrays:
+        return new_geometries
+
+    points = np.concatenate(arrays)
+    xs, ys = transform_fn(points[:, 0], points[:, 1])
+    positions = np.stack([np.asarray(xs), np.asarray(ys)], axis=1).tolist()
+    ends = np.cumsum([len(arr) for arr in arrays]).tolist()
+    starts = [0] + ends[:-1]
+    new_arrays = [positions[i:j] for i, j in zip(starts, ends)]
+    return [rebuild(g, new_arrays) for g in new_geometries]
 
 
 def transform_geojson(geojson,
@@ -25,19 +124,16 @@ def transform_geojson(geojson,
                 or ((not f['geometry'].get('coordinates')) and
                     (not f['geometry'].get('geometries'))))
 
-    new_features = []
-    for f in geojson['features']:
-        if is_empty_feat(f):
-            continue
-
-        geom = shape(f['geometry'])
+    features = [f for f in geojson['features'] if not is_empty_feat(f)]
 
-        # Convert map to pixel coords. We need to convert to pixel coords before applying
-        # buffering because those values are assumed to be in pixel units.
-        def m2p(x, y, z=None):
-            return crs_transformer.map_to_pixel((x, y))
+    # Convert map to pixel coords. We need to convert to pixel coords before applying
+    # buffering because those values are assumed to be in pixel units.
+    geometries = transform_geometries([f['geometry'] for f in features],
+                                      crs_transformer.map_to_pixel_array)
 
-        geom = transform(m2p, geom)
+    feature_geoms = []
+    for f, geometry in zip(features, geometries):
+        geom = shape(geometry)
 
         # Split GeometryCollection into list of geoms.
         geoms = [geom]
@@ -86,27 +182,29 @@ def transform_geojson(geojson,
                     new_geoms.extend(list(poly_buf))
                 else:
                     new_geoms.append(poly_buf)
-        geoms = new_geoms
-
-        # Convert back to map coords if desired. This is here so the QGIS plugin can
-        # take the GeoJSON produced by a VectorSource and display it on a map.
-        if to_map_coords:
 
-            def p2m(x, y, z=None):
-                return crs_transformer.pixel_to_map((x, y))
+        for g in new_geoms:
+            feature_geoms.append((f, mapping(g)))
 
-            geoms = [transform(p2m, g) for g in geoms]
+    # Convert back to map coords if desired. This is here so the QGIS plugin can
+    # take the GeoJSON produced by a VectorSource and display it on a map.
+    if to_map_coords:
+        geometries = transform_geometries([g for _, g in feature_geoms],
+                                          crs_transformer.pixel_to_map_array)
+        feature_geoms = [(f, g)
+                         for (f, _), g in zip(feature_geoms, geometries)]
 
-        for g in geoms:
-            new_f = {
-                'type': 'Feature',
-                'geometry': mapping(g),
-                'properties': f['properties']
-            }
-            # Have to check for empty features again which could have been introduced
-            # when splitting apart multi-geoms.
-            if not is_empty_feat(new_f):
-                new_features.append(new_f)
+    new_features = []
+    for f, geometry in feature_geoms:
+        new_f = {
+            'type': 'Feature',
+            'geometry': geometry,
+            'properties': f['properties']
+        }
+        # Have to check for empty features again which could have been introduced
+        # when splitting apart multi-geoms.
+        if not is_empty_feat(new_f):
+            new_features.append(new_f)
 
     return {'type': 'FeatureCollection', 'features': new_features}
 
@@ -114,12 +212,15 @@ def transform_geojson(geojson,
 class VectorSource(ABC):
     """A source of vector data."""
 
-    def __init__(self, vs_config: 'VectorSourceConfig',
+    def __init__(self,
+                 vs_config: 'VectorSourceConfig',
                  class_config: 'ClassConfig',
-                 crs_transformer: 'CRSTransformer'):
+                 crs_transformer: 'CRSTransformer',
+                 extent: Optional['Box'] = None):
         self.vs_config = vs_config
         self.class_config = class_config
         self.crs_transformer = crs_transformer
+        self.extent = extent
         self.class_inference = ClassInference(
             vs_config.default_class_id,
             class_config=class_config,
@@ -139,17 +240,47 @@ class VectorSource(ABC):
         Returns:
             dict in GeoJSON format
         """
+        cache, cache_key = None, None
+        if not to_map_coords and self.vs_config.cache_dir is not None:
+            version = self._get_cache_version()
+            if version is not None:
+                cache = VectorSourceCache(self.vs_config.cache_dir)
+                cache_key = get_vector_cache_key(
+                    self.vs_config,
+                    self.class_config,
+                    self.crs_transformer,
+                    version,
+                    extent=self.extent)
+                geojson = cache.get(cache_key)
+                if geojson is not None:
+                    return geojson
+
+        geojson = self._get_transformed_geojson(to_map_coords)
+
+        if cache is not None:
+            cache.put(cache_key, geojson)
+
+        return geojson
+
+    def _get_transformed_geojson(self, to_map_coords=False):
+        """Return normalized GeoJSON without using the cache."""
         if self.geojson is None:
             self.geojson = self._get_geojson()
 
-        geojson = transform_geojson(
+        return transform_geojson(
             self.geojson,
             self.crs_transformer,
             self.vs_config.line_bufs,
             self.vs_config.point_bufs,
             to_map_coords=to_map_coords)
 
-        return geojson
+    def _get_cache_version(self):
+        """Return a str that changes when the source data changes.
+
+        This is used to key the cache of normalized GeoJSON. If None, the
+        cache is not used.
+        """
+        return None
 
     @abstractmethod
     def _get_geojson(self):
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+from shapely import wkb
+from shapely.geometry import shape, mapping
+
+# Increment this when the format of the cache files or the normalization done
+# by transform_geojson changes, so that old cache files are ignored.
+VECTOR_CACHE_VERSION = 1
+
+
+def get_vector_cache_key(vs_config,
+                         class_config,
+                         crs_transformer,
+                         version,
+                         extent=None):
+    """Return a key that identifies normalized GeoJSON in a VectorSourceCache.
+
+    Args:
+        vs_config: (VectorSourceConfig) config of the vector source; all fields
+            except cache_dir are part of the key, including the URI and the
+            buffer settings
+        class_config: (ClassConfig) used to infer class ids
+        crs_transformer: (CRSTransformer) used to convert to pixel coords
+        version: (str) identifies the version of the source data, eg. the last
+            modified date of the file
+        extent: (Box or None) extent that features may be filtered to
+
+    Returns:
+        hex digest (str)
+    """
+    transform = crs_transformer.transform
+    if transform is not None:
+        transform = list(transform)[0:6]
+    crs_key = [
+        type(crs_transformer).__name__,
+        str(crs_transformer.image_crs),
+        str(crs_transformer.map_crs), transform
+    ]
+    key = {
+        'cache_version': VECTOR_CACHE_VERSION,
+        'source_version': version,
+        'vs_config': vs_config.dict(exclude={'cache_dir'}),
+        'class_names': class_config.names,
+        'crs_transformer': crs_key,
+        'extent': None if extent is None else list(extent.tuple_format())
+    }
+    key_str = json.dumps(key, sort_keys=True, default=str)
+    return hashlib.sha256(key_str.encode()).hexdigest()
+
+
+class VectorSourceCache():
+    """An on-disk cache of normalized GeoJSON in pixel coordinates.
+
+    Each entry is a .npz file with the geometries as concatenated WKB and the
+    feature properties (including class_id) as JSON. Loading an
+    entry skips parsing the original GeoJSON, class inference, reprojection,
+    and buffering. Entries are written atomically, so a cache directory can be
+    shared by commands running at the same time.
+    """
+
+    def __init__(self, cache_dir):
+        """Constructor.
+
+        Args:
+            cache_dir: (str) local directory to store cache files in
+        """
+        self.cache_dir = cache_dir
+
+    def get_path(self, key):
+        return os.path.join(self.cache_dir, '{}.npz'.format(key))
+
+    def get(self, key):
+        """Return the normalized GeoJSON stored under key or None."""
+        path = self.get_path(key)
+        if not os.path.isfile(path):
+            return None
+
+        with np.load(path) as data:
+            wkb_bytes = data['wkb'].tobytes()
+            offsets = data['offsets']
+            properties = json.loads(data['properties'].tobytes().decode())
+
+        features = []
+        for i, props in enumerate(properties):
+            geom = wkb.loads(wkb_bytes[offsets[i]:offsets[i + 1]])
+            features.append({
+                'type': 'Feature',
+                'geometry': mapping(geom),
+                'properties': props
+            })
+        return {'type': 'FeatureCollection', 'features': features}
+
+    def put(self, key, geojson):
+        """Store normalized GeoJSON under key."""
+        features = geojson['features']
+        geom_wkbs = [shape(f['geometry']).wkb for f in features]
+        offsets = np.cumsum([0] + [len(b) for b in geom_wkbs], dtype=np.int64)
+        properties = json.dumps([f['properties'] for f in features]).encode()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    wkb=np.frombuffer(b''.join(geom_wkbs), dtype=np.uint8),
+                    offsets=offsets,
+                    properties=np.frombuffer(properties, dtype=np.uint8))
+            os.replace(tmp_path, self.get_path(key))
+        except Exception:
+            if os.path.isfile(tmp_path):
+                os.remove(tmp_path)
+            raise
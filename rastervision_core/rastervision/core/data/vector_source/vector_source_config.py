@@ -35,6 +35,16 @@ class VectorSourceConfig(Config):
         None,
         description=
         'Same as above, but used for buffering Points into Polygons.')
+    cache_dir: Optional[str] = Field(
+        None,
+        description=
+        ('Local directory used to cache the normalized GeoJSON in pixel '
+         'coordinates. Entries are keyed by the URI and last modified date of '
+         'the source, the CRS transform, and the other fields of this config, '
+         'so that commands run after the first one can skip parsing, class '
+         'inference, reprojection and buffering. Sources whose file system '
+         'has no last modified date, such as HTTP, are not cached. If None, no '
+         'cache is used.'))
 
     def has_null_class_bufs(self):
         if self.point_bufs is not None:
@@ -49,7 +59,7 @@ class VectorSourceConfig(Config):
 
         return False
 
-    def build(self, class_config, crs_transformer):
+    def build(self, class_config, crs_transformer, extent=None):
         raise NotImplementedError()
 
     def update(self, pipeline=None, scene=None):
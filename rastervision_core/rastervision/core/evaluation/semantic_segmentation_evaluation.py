@@ -5,6 +5,7 @@ import json
 from sklearn.metrics import confusion_matrix
 import numpy as np
 
+from rastervision.core.data.label import SemanticSegmentationDenseLabels
 from rastervision.core.evaluation import ClassEvaluationItem
 from rastervision.core.evaluation import ClassificationEvaluation
 
@@ -69,7 +70,15 @@ class SemanticSegmentationEvaluation(ClassificationEvaluation):
 
         labels = np.arange(len(self.class_config.names))
         conf_mat = np.zeros((len(labels), len(labels)))
-        for window in pred_labels.get_windows():
+        # Dense labels can be sliced by any window, so iterate over the windows
+        # of the other labels.
+        pred_is_dense = isinstance(pred_labels,
+                                   SemanticSegmentationDenseLabels)
+        gt_is_dense = isinstance(gt_labels, SemanticSegmentationDenseLabels)
+        windows = pred_labels.get_windows()
+        if pred_is_dense and not gt_is_dense:
+            windows = gt_labels.get_windows()
+        for window in windows:
             log.debug('Evaluating window: {}'.format(window))
             gt_arr = gt_labels.get_label_arr(window).ravel()
             pred_arr = pred_labels.get_label_arr(window).ravel()
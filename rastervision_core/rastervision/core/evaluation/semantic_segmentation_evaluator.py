@@ -67,14 +67,17 @@ class SemanticSegmentationEvaluator(ClassificationEvaluator):
             if hasattr(label_source, 'raster_source') and hasattr(
                     label_source.raster_source, 'vector_source') and hasattr(
                         label_store, 'vector_output'):
-                gt_geojson = label_source.raster_source.vector_source.get_geojson(
-                )
+                gt_vector_source = label_source.raster_source.vector_source
+                gt_geojson = gt_vector_source.get_geojson()
                 for vo in label_store.vector_output:
                     pred_geojson_uri = vo.uri
                     mode = vo.get_mode()
                     class_id = vo.class_id
+                    # Predictions are cached along with the ground truth.
                     pred_geojson_source = GeoJSONVectorSourceConfig(
-                        uri=pred_geojson_uri, default_class_id=class_id).build(
+                        uri=pred_geojson_uri,
+                        default_class_id=class_id,
+                        cache_dir=gt_vector_source.vs_config.cache_dir).build(
                             self.class_config,
                             scene.raster_source.get_crs_transformer())
                     pred_geojson = pred_geojson_source.get_geojson()
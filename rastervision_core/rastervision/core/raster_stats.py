@@ -1,65 +1,155 @@
+from concurrent.futures import ProcessPoolExecutor
 import json
+import logging
+from os.path import dirname, join
 
 import numpy as np
 
 from rastervision.pipeline.file_system import str_to_file, file_to_str
 
+log = logging.getLogger(__name__)
+
 chip_sz = 300
+DEFAULT_PERCENTILES = [1, 2, 5, 25, 50, 75, 95, 98, 99]
+
 
+def get_histograms_uri(stats_uri):
+    """Return the URI of the histograms saved alongside stats_uri."""
+    return join(dirname(stats_uri), 'histograms.json')
 
-def parallel_variance(mean_a, count_a, var_a, mean_b, count_b, var_b):
-    """Compute the variance based on stats from two partitions of the data.
 
-    See "Parallel Algorithm" in
+def merge_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    """Merge (count, mean, M2) statistics from two partitions of the data.
+
+    M2 is the sum of squared differences from the mean. All arguments are
+    arrays with a value per channel, and channels with a count of zero are
+    handled. See "Parallel Algorithm" in
     https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance
 
-    Args:
-        mean_a: the mean of partition a
-        count_a: the number of elements in partition a
-        var_a: the variance of partition a
-        mean_b: the mean of partition b
-        count_b: the number of elements in partition b
-        var_b: the variance of partition b
-
-    Return:
-        the variance of the two partitions if they were combined
+    Returns:
+        (count, mean, M2) of the two partitions combined
     """
+    count = count_a + count_b
+    safe_count = np.maximum(count, 1)
     delta = mean_b - mean_a
-    m_a = var_a * (count_a - 1)
-    m_b = var_b * (count_b - 1)
-    M2 = m_a + m_b + delta**2 * count_a * count_b / (count_a + count_b)
-    var = M2 / (count_a + count_b - 1)
-    return var
+    mean = mean_a + delta * count_b / safe_count
+    m2 = m2_a + m2_b + delta**2 * count_a * count_b / safe_count
+    return count, mean, m2
 
 
-def parallel_mean(mean_a, count_a, mean_b, count_b):
-    """Compute the mean based on stats from two partitions of the data.
+def get_histogram_offset(dtype):
+    """Return the smallest value of dtype if it can be histogrammed exactly.
 
-    See "Parallel Algorithm" in
-    https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance
+    Exact histograms, with a bin for every possible value, are computed for
+    integer dtypes of at most 16 bits. Returns None for other dtypes.
+    """
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.integer) and dtype.itemsize <= 2:
+        return int(np.iinfo(dtype).min)
+    return None
+
+
+def compute_chip_stats(chip, histogram=False):
+    """Compute statistics of a chip, ignoring NODATA (zero or NaN) values.
 
     Args:
-        mean_a: the mean of partition a
-        count_a: the number of elements in partition a
-        mean_b: the mean of partition b
-        count_b: the number of elements in partition b
+        chip: (np.ndarray) of shape [height, width, channels]
+        histogram: (bool) if True, also compute an exact histogram of each
+            channel if the dtype allows it
 
-    Return:
-        the mean of the two partitions if they were combined
+    Returns:
+        (count, mean, M2, counts) where the first three are float64 arrays with
+        a value per channel and counts is an int64 array of shape [channels,
+        num_values] or None
     """
-    mean = (count_a * mean_a + count_b * mean_b) / (count_a + count_b)
-    return mean
+    nb_channels = chip.shape[-1]
+    chip = np.reshape(chip, (-1, nb_channels)).T
+    valid = chip != 0
+    if np.issubdtype(chip.dtype, np.floating):
+        valid &= ~np.isnan(chip)
+
+    count = valid.sum(axis=1).astype(np.float64)
+    values = np.where(valid, chip, 0).astype(np.float64)
+    mean = values.sum(axis=1) / np.maximum(count, 1)
+    deviations = np.where(valid, values - mean[:, None], 0)
+    m2 = np.sum(deviations**2, axis=1)
+
+    counts = None
+    offset = get_histogram_offset(chip.dtype)
+    if histogram and offset is not None:
+        num_values = 2**(8 * chip.dtype.itemsize)
+        counts = np.stack([
+            np.bincount(c[v].astype(np.int64) - offset, minlength=num_values)
+            for c, v in zip(chip, valid)
+        ])
+    return count, mean, m2, counts
+
+
+def compute_scene_stats(raster_source,
+                        sample_prob=None,
+                        histogram=False,
+                        seed=None):
+    """Compute (count, mean, M2, counts) over the chips of a RasterSource.
+
+    See RasterStats.compute for a description of the arguments.
+    """
+    if seed is not None:
+        np.random.seed(seed)
+
+    nb_channels = raster_source.num_channels
+    count = np.zeros((nb_channels, ))
+    mean = np.zeros((nb_channels, ))
+    m2 = np.zeros((nb_channels, ))
+    counts = None
+    hist_offset = None
+
+    with raster_source.activate():
+        extent = raster_source.get_extent()
+        if sample_prob is None:
+            windows = extent.iter_windows(chip_sz, chip_sz)
+        else:
+            num_pixels = extent.get_width() * extent.get_height()
+            num_chips = round(sample_prob * (num_pixels / (chip_sz**2)))
+            num_chips = max(1, num_chips)
+            windows = (extent.make_random_square(chip_sz)
+                       for _ in range(num_chips))
+
+        for window in windows:
+            chip = raster_source.get_raw_chip(window)
+            chip_count, chip_mean, chip_m2, chip_counts = compute_chip_stats(
+                chip, histogram=histogram)
+            count, mean, m2 = merge_moments(count, mean, m2, chip_count,
+                                            chip_mean, chip_m2)
+            if chip_counts is None:
+                continue
+            if counts is None:
+                counts = chip_counts
+                hist_offset = get_histogram_offset(chip.dtype)
+            else:
+                counts += chip_counts
+
+    return count, mean, m2, counts, hist_offset
 
 
 class RasterStats():
     def __init__(self):
         self.means = None
         self.stds = None
+        # Optional outputs of compute(histogram=True).
+        self.histogram_offset = None
+        self.histograms = None
+        self.percentiles = None
 
-    def compute(self, raster_sources, sample_prob=None):
+    def compute(self,
+                raster_sources,
+                sample_prob=None,
+                num_workers=0,
+                histogram=False,
+                percentiles=DEFAULT_PERCENTILES):
         """Compute the mean and stds over all the raster_sources.
 
-        This ignores NODATA values.
+        This ignores NODATA values, ie. zeros and NaNs. Statistics are computed
+        separately for each channel.
 
         If sample_prob is set, then a subset of each scene is used to compute stats which
         speeds up the computation. Roughly speaking, if sample_prob=0.5, then half the
@@ -68,84 +158,131 @@ class RasterStats():
         uniformly sampled from the scene with replacement. Otherwise, it uses a sliding
         window over the entire scene to compute stats.
 
+        Partial statistics of each scene are reduced exactly, so the result
+        doesn't depend on the number of workers.
+
         Args:
             raster_sources: list of RasterSource
             sample_prob: (float or None) between 0 and 1
+            num_workers: (int) number of processes used to compute statistics of
+                scenes in parallel. If 0, scenes are processed serially in this
+                process. RasterSources must be picklable if > 0.
+            histogram: (bool) if True, also compute a histogram of each channel,
+                with a bin for each value, and the percentiles of each channel.
+                This is only supported for integer imagery of at most 16 bits.
+            percentiles: (list of float) percentiles to compute if histogram is
+                True
         """
-        stride = chip_sz
-        nb_channels = raster_sources[0].num_channels
-
-        def get_chip(raster_source, window):
-            """Return chip or None if all values are NODATA."""
-            chip = raster_source.get_raw_chip(window).astype(np.float32)
-            # Convert shape from [h,w,c] to [c,h*w]
-            chip = np.reshape(np.transpose(chip, [2, 0, 1]), (nb_channels, -1))
-
-            # Ignore NODATA values.
-            chip[chip == 0.0] = np.nan
-            if np.any(~np.isnan(chip)):
-                return chip
-            return None
-
-        def sliding_chip_stream():
-            """Get stream of chips using a sliding window of size 300."""
-            for raster_source in raster_sources:
-                with raster_source.activate():
-                    windows = raster_source.get_extent().get_windows(
-                        chip_sz, stride)
-                    for window in windows:
-                        chip = get_chip(raster_source, window)
-                        if chip is not None:
-                            yield chip
-
-        def random_chip_stream():
-            """Get random stream of chips."""
-            for raster_source in raster_sources:
-                with raster_source.activate():
-                    extent = raster_source.get_extent()
-                    num_pixels = extent.get_width() * extent.get_height()
-                    num_chips = round(
-                        sample_prob * (num_pixels / (chip_sz**2)))
-                    num_chips = max(1, num_chips)
-                    for _ in range(num_chips):
-                        window = raster_source.get_extent().make_random_square(
-                            chip_sz)
-                        chip = get_chip(raster_source, window)
-                        if chip is not None:
-                            yield chip
-
-        # For each chip, compute the mean and var of that chip and then update the
-        # running mean and var.
-        count = 0
-        mean = np.zeros((nb_channels, ))
-        var = np.zeros((nb_channels, ))
-        chip_stream = (sliding_chip_stream()
-                       if sample_prob is None else random_chip_stream())
-
-        for c in chip_stream:
-            chip_means = np.nanmean(c, axis=1)
-            chip_vars = np.nanvar(c, axis=1)
-            chip_count = np.sum(c[0] != np.nan)
+        if num_workers > 0:
+            seeds = np.random.randint(0, 2**31 - 1, len(raster_sources))
+            with ProcessPoolExecutor(num_workers) as executor:
+                futures = [
+                    executor.submit(compute_scene_stats, raster_source,
+                                    sample_prob, histogram, int(seed))
+                    for raster_source, seed in zip(raster_sources, seeds)
+                ]
+                scene_stats = (f.result() for f in futures)
+                self._reduce(scene_stats, raster_sources[0].num_channels,
+                             histogram, percentiles)
+        else:
+            scene_stats = (compute_scene_stats(rs, sample_prob, histogram)
+                           for rs in raster_sources)
+            self._reduce(scene_stats, raster_sources[0].num_channels,
+                         histogram, percentiles)
 
-            var = parallel_variance(chip_means, chip_count, chip_vars, mean,
-                                    count, var)
-            mean = parallel_mean(chip_means, chip_count, mean, count)
-            count += chip_count
+    def _reduce(self, scene_stats, nb_channels, histogram, percentiles):
+        count = np.zeros((nb_channels, ))
+        mean = np.zeros((nb_channels, ))
+        m2 = np.zeros((nb_channels, ))
+        counts = None
+        hist_offset = None
+        for (scene_count, scene_mean, scene_m2, scene_counts,
+             scene_offset) in scene_stats:
+            count, mean, m2 = merge_moments(count, mean, m2, scene_count,
+                                            scene_mean, scene_m2)
+            if scene_counts is None:
+                continue
+            if counts is None:
+                counts, hist_offset = scene_counts, scene_offset
+            elif (scene_counts.shape != counts.shape
+                  or scene_offset != hist_offset):
+                raise ValueError(
+                    'Cannot compute histograms of scenes with different dtypes.'
+                )
+            else:
+                counts = counts + scene_counts
 
         self.means = mean
-        self.stds = np.sqrt(var)
+        self.stds = np.sqrt(m2 / np.maximum(count, 1))
+
+        if histogram:
+            if counts is None:
+                log.warning(
+                    'Histograms are only computed for integer imagery with at '
+                    'most 16 bits.')
+            else:
+                self.histogram_offset = hist_offset
+                self.histograms = counts
+                self.percentiles = get_percentiles(counts, hist_offset,
+                                                   percentiles)
 
     def save(self, stats_uri):
         # Ensure lists
         means = list(self.means)
         stds = list(self.stds)
         stats = {'means': means, 'stds': stds}
+        if self.percentiles is not None:
+            stats['percentiles'] = self.percentiles
         str_to_file(json.dumps(stats), stats_uri)
 
+        if self.histograms is not None:
+            # Only store the values that occur to keep the file small.
+            histograms = []
+            for counts in self.histograms:
+                inds = np.nonzero(counts)[0]
+                histograms.append({
+                    'values': (inds + self.histogram_offset).tolist(),
+                    'counts':
+                    counts[inds].tolist()
+                })
+            str_to_file(json.dumps(histograms), get_histograms_uri(stats_uri))
+
     @staticmethod
     def load(stats_uri):
         stats_json = json.loads(file_to_str(stats_uri))
         stats = RasterStats()
         stats.means = stats_json['means']
         stats.stds = stats_json['stds']
+        stats.percentiles = stats_json.get('percentiles')
         return stats
+
+
+def get_percentiles(counts, offset, percentiles):
+    """Compute percentiles of each channel from histograms.
+
+    Args:
+        counts: (np.ndarray) of shape [channels, num_values] where counts[c, i]
+            is the number of pixels in channel c with value i + offset
+        offset: (int) value of the first bin
+        percentiles: (list of float) percentiles between 0 and 100
+
+    Returns:
+        dict from each percentile (as a str, eg. '99' or '99.5') to a list with a
+        value per channel
+    """
+    result = {}
+    cum_counts = np.cumsum(counts, axis=1)
+    totals = cum_counts[:, -1]
+    for p in percentiles:
+        values = []
+        for channel_cum_counts, total in zip(cum_counts, totals):
+            if total == 0:
+                values.append(None)
+                continue
+            # Same as np.percentile with interpolation='lower': the value at
+            # index floor((n - 1) * p / 100) of the sorted pixel values.
+            rank = np.floor((total - 1) * p / 100)
+            ind = np.searchsorted(channel_cum_counts, rank, side='right')
+            values.append(int(ind + offset))
+        result['{:g}'.format(p)] = values
+    return result
@@ -9,22 +9,27 @@ log = logging.getLogger(__name__)
 
 
 def get_train_windows(scene, chip_size):
-    train_windows = []
-    extent = scene.raster_source.get_extent()
+    """Return windows covering the scene and within the AOIs.
+
+    Windows with empty imagery are removed by ChipClassification.keep_train_chip
+    when the chips are read, so that each chip is only read once.
+    """
+    raster_source = scene.raster_source
+    extent = raster_source.get_extent()
     stride = chip_size
-    windows = extent.get_windows(chip_size, stride)
+    windows = extent.get_windows_array(chip_size, stride)
     if scene.aoi_polygons:
         windows = Box.filter_by_aoi(windows, scene.aoi_polygons)
-    for window in windows:
-        chip = scene.raster_source.get_chip(window)
-        if np.sum(chip.ravel()) > 0:
-            train_windows.append(window)
-    return train_windows
+    return Box.from_npboxes(windows)
 
 
 class ChipClassification(RVPipeline):
     def get_train_windows(self, scene):
         return get_train_windows(scene, self.config.train_chip_sz)
 
+    def keep_train_chip(self, window, chip, scene):
+        # Skip windows with empty imagery.
+        return np.sum(chip.ravel()) > 0
+
     def get_train_labels(self, window, scene):
         return scene.ground_truth_label_source.get_labels(window=window)
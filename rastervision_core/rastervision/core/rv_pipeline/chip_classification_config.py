@@ -12,6 +12,7 @@ class ChipClassificationConfig(RVPipelineConfig):
         return ChipClassification(self, tmp_dir)
 
     def validate_config(self):
+        super().validate_config()
         if self.train_chip_sz != self.predict_chip_sz:
             raise ConfigError(
                 'train_chip_sz must be equal to predict_chip_sz for chip '
@@ -6,7 +6,8 @@ from rastervision.core.rv_pipeline.rv_pipeline import RVPipeline
 from rastervision.core.rv_pipeline.object_detection_config import (
     ObjectDetectionWindowMethod)
 from rastervision.core.box import Box
-from rastervision.core.data.label import ObjectDetectionLabels
+from rastervision.core.data.label import (ObjectDetectionLabels,
+                                          ObjectDetectionLabelsAccumulator)
 
 log = logging.getLogger(__name__)
 
@@ -73,6 +74,9 @@ def make_neg_windows(raster_source, label_store, chip_size, nb_windows,
             window = extent.make_random_square(chip_size)
             if any(filter_windows([window])):
                 break
+        # Skip windows that only contain NODATA without reading them.
+        if not raster_source.get_window_validity([window])[0]:
+            continue
         chip = raster_source.get_chip(window)
         labels = ObjectDetectionLabels.get_overlapping(
             label_store.get_labels(), window, ioa_thresh=0.2)
@@ -99,9 +103,9 @@ def get_train_windows(scene, chip_opts, chip_size):
     window_method = chip_opts.window_method
     if window_method == ObjectDetectionWindowMethod.sliding:
         stride = chip_size
-        return list(
-            filter_windows((raster_source.get_extent().get_windows(
-                chip_size, stride))))
+        windows = raster_source.get_extent().get_windows_array(
+            chip_size, stride)
+        return Box.from_npboxes(filter_windows(windows))
 
     # Make positive windows which contain labels.
     pos_windows = filter_windows(
@@ -146,10 +150,18 @@ class ObjectDetection(RVPipeline):
         # detection :(
         chip_sz = self.config.train_chip_sz
         stride = chip_sz // 2
-        return extent.get_windows(chip_sz, stride)
+        return extent.get_windows_array(chip_sz, stride)
+
+    def get_empty_predict_labels(self, scene):
+        # Predictions are concatenated once, instead of once per batch.
+        return ObjectDetectionLabelsAccumulator()
 
     def post_process_predictions(self, labels, scene):
+        if isinstance(labels, ObjectDetectionLabelsAccumulator):
+            labels = labels.finalize()
         return ObjectDetectionLabels.prune_duplicates(
             labels,
             score_thresh=self.config.predict_options.score_thresh,
-            merge_thresh=self.config.predict_options.merge_thresh)
+            merge_thresh=self.config.predict_options.merge_thresh,
+            cell_sz=self.config.train_chip_sz,
+            class_aware=self.config.predict_options.class_aware_merge)
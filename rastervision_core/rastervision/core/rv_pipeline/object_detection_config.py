@@ -55,6 +55,12 @@ class ObjectDetectionPredictOptions(Config):
         description=
         ('Predicted boxes are only output if their score is above score_thresh.'
          ))
+    class_aware_merge: bool = Field(
+        False,
+        description=
+        ('If True, only boxes of the same class are merged during '
+         'postprocessing. Otherwise, boxes of different classes can be merged.'
+         ))
 
 
 @register_config('object_detection')
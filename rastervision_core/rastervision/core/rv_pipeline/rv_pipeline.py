@@ -1,15 +1,21 @@
 import logging
+import math
+import multiprocessing
 from os.path import join
+import queue
+import random
 import tempfile
 import shutil
-from typing import TYPE_CHECKING, Optional, List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, List, Iterator, Union
 
 import numpy as np
 
 from rastervision.pipeline.pipeline import Pipeline
 from rastervision.core.box import Box
 from rastervision.core.data_sample import DataSample
-from rastervision.core.data import Scene, Labels
+from rastervision.core.data import Scene, Labels, RasterSource
 from rastervision.core.backend import Backend
 from rastervision.core.rv_pipeline import TRAIN, VALIDATION
 from rastervision.pipeline.file_system.utils import (
@@ -21,6 +27,125 @@ if TYPE_CHECKING:
     from rastervision.core.rv_pipeline.rv_pipeline_config import RVPipelineConfig  # noqa
 
 
+def batch_windows_by_size(windows: List[Box],
+                          batch_sz: int) -> Iterator[List[Box]]:
+    """Split windows into consecutive batches of windows of the same size.
+
+    Args:
+        windows: windows to split
+        batch_sz: maximum number of windows in a batch
+    """
+    batch = []
+    for window in windows:
+        if batch and (len(batch) == batch_sz
+                      or window.get_height() != batch[0].get_height()
+                      or window.get_width() != batch[0].get_width()):
+            yield batch
+            batch = []
+        batch.append(window)
+    if batch:
+        yield batch
+
+
+def iter_window_batches(windows: Union[List[Box], np.ndarray],
+                        batch_sz: int) -> Iterator[List[Box]]:
+    """Split windows into consecutive batches of Boxes.
+
+    Args:
+        windows: list of Boxes, or array of shape [N, 4] in npbox format, in
+            which case Boxes are only created for one batch at a time
+        batch_sz: number of windows in a batch
+    """
+    for i in range(0, len(windows), batch_sz):
+        batch_windows = windows[i:i + batch_sz]
+        if isinstance(batch_windows, np.ndarray):
+            batch_windows = Box.from_npboxes(batch_windows)
+        yield batch_windows
+
+
+# State of a chip worker process, which is set by _init_chip_worker.
+_chip_worker = {}
+
+
+def _init_chip_worker(pipeline, split_ind, num_splits, sample_queue,
+                      cancel_event):
+    dataset = pipeline.config.dataset.get_split_config(split_ind, num_splits)
+    _chip_worker.update(
+        pipeline=pipeline,
+        class_cfg=dataset.class_config,
+        scene_splits=pipeline.get_scene_splits(dataset),
+        sample_queue=sample_queue,
+        cancel_event=cancel_event,
+        scene_ind=None,
+        scene=None,
+        scene_context=None,
+        windows=None)
+
+
+def _get_chip_worker_scene(scene_ind, seed):
+    """Return the activated scene and its training windows in a chip worker.
+
+    The windows are computed the first time a worker uses a scene, and the
+    previously used scene is deactivated if it is a different one.
+    """
+    if _chip_worker['scene_ind'] != scene_ind:
+        if _chip_worker['scene_ind'] is not None:
+            _chip_worker['scene_context'].__exit__(None, None, None)
+            _chip_worker.update(
+                scene_ind=None, scene=None, scene_context=None, windows=None)
+        pipeline = _chip_worker['pipeline']
+        scene_cfg, _ = _chip_worker['scene_splits'][scene_ind]
+        scene = scene_cfg.build(_chip_worker['class_cfg'], pipeline.tmp_dir)
+        scene_context = scene.activate()
+        scene_context.__enter__()
+        # Forked workers start with the same random state, so they are seeded
+        # to sample different random windows for each scene, and the same
+        # windows for the same scene.
+        random.seed(seed)
+        np.random.seed(seed)
+        windows = list(pipeline.get_train_windows(scene))
+        _chip_worker.update(
+            scene_ind=scene_ind,
+            scene=scene,
+            scene_context=scene_context,
+            windows=windows)
+    return _chip_worker['scene'], _chip_worker['windows']
+
+
+def _chip_worker_range(scene_ind, seed, range_ind, num_ranges):
+    """Put batches of samples for a range of windows on the sample queue.
+
+    The windows of the scene are split into num_ranges ranges of about the
+    same size, and the samples of range range_ind are made. Nothing more is
+    made once the cancel event is set.
+    """
+    pipeline = _chip_worker['pipeline']
+    sample_queue = _chip_worker['sample_queue']
+    cancel_event = _chip_worker['cancel_event']
+    try:
+        if cancel_event.is_set():
+            return
+        scene, windows = _get_chip_worker_scene(scene_ind, seed)
+        _, split = _chip_worker['scene_splits'][scene_ind]
+        if range_ind == 0:
+            log.info('Making {} chips for scene: {}'.format(split, scene.id))
+        range_sz = int(math.ceil(len(windows) / num_ranges))
+        windows = windows[range_ind * range_sz:(range_ind + 1) * range_sz]
+
+        samples = []
+        for sample in pipeline.iter_train_samples(scene, windows, split):
+            samples.append(sample)
+            if len(samples) == pipeline.config.chip_batch_sz:
+                if cancel_event.is_set():
+                    return
+                sample_queue.put(samples)
+                samples = []
+        if samples and not cancel_event.is_set():
+            sample_queue.put(samples)
+    finally:
+        sample_queue.put(None)
+
+
 class RVPipeline(Pipeline):
     """Base class of all Raster Vision Pipelines.
 
@@ -75,8 +200,33 @@ class RVPipeline(Pipeline):
         """
         raise NotImplementedError()
 
+    def keep_train_chip(self, window: Box, chip: np.ndarray,
+                        scene: Scene) -> bool:
+        """Return True if a chip read for a training window should be written.
+
+        This lets windows be filtered based on their imagery while chipping,
+        so that the imagery doesn't have to be read once by get_train_windows
+        and again to write the chips.
+        """
+        return True
+
+    def get_scene_splits(self, dataset) -> List[tuple]:
+        """Return (scene config, split) pairs of the scenes to chip.
+
+        Args:
+            dataset: DatasetConfig with the training and validation scenes
+        """
+        scene_splits = [(s, TRAIN) for s in dataset.train_scenes]
+        scene_splits.extend((s, VALIDATION) for s in dataset.validation_scenes)
+        return scene_splits
+
     def chip(self, split_ind: int = 0, num_splits: int = 1):
-        """Save training and validation chips."""
+        """Save training and validation chips.
+
+        If chip_workers > 0, scenes and ranges of windows within scenes are
+        chipped by a pool of processes, and the samples are written by the
+        sample writer in this process as they are made.
+        """
         cfg = self.config
         backend = cfg.backend.build(cfg, self.tmp_dir)
         dataset = cfg.dataset.get_split_config(split_ind, num_splits)
@@ -84,29 +234,119 @@ class RVPipeline(Pipeline):
             return
 
         class_cfg = dataset.class_config
+        scene_splits = self.get_scene_splits(dataset)
         with backend.get_sample_writer() as writer:
+            if cfg.chip_workers > 0:
+                self._chip_with_workers(split_ind, num_splits,
+                                        len(scene_splits), writer)
+                return
 
-            def chip_scene(scene, split):
+            for scene_cfg, split in scene_splits:
+                scene = scene_cfg.build(class_cfg, self.tmp_dir)
                 with scene.activate():
                     log.info('Making {} chips for scene: {}'.format(
                         split, scene.id))
                     windows = self.get_train_windows(scene)
-                    for window in windows:
-                        chip = scene.raster_source.get_chip(window)
-                        labels = self.get_train_labels(window, scene)
-                        sample = DataSample(
-                            chip=chip,
-                            window=window,
-                            labels=labels,
-                            scene_id=str(scene.id),
-                            is_train=split == TRAIN)
-                        sample = self.post_process_sample(sample)
+                    for sample in self.iter_train_samples(
+                            scene, windows, split):
                         writer.write_sample(sample)
 
-            for s in dataset.train_scenes:
-                chip_scene(s.build(class_cfg, self.tmp_dir), TRAIN)
-            for s in dataset.validation_scenes:
-                chip_scene(s.build(class_cfg, self.tmp_dir), VALIDATION)
+    def iter_train_samples(self, scene: Scene, windows: List[Box],
+                           split: str) -> Iterator[DataSample]:
+        """Yield the post-processed training samples for windows of a scene.
+
+        Chips are read in batches of chip_batch_sz windows, and windows for
+        which keep_train_chip returns False are skipped. The scene must be
+        activated.
+        """
+        for batch_windows in batch_windows_by_size(windows,
+                                                   self.config.chip_batch_sz):
+            chips = scene.raster_source.get_chips(batch_windows)
+            for window, chip in zip(batch_windows, chips):
+                if not self.keep_train_chip(window, chip, scene):
+                    continue
+                labels = self.get_train_labels(window, scene)
+                sample = DataSample(
+                    chip=chip,
+                    window=window,
+                    labels=labels,
+                    scene_id=str(scene.id),
+                    is_train=split == TRAIN)
+                yield self.post_process_sample(sample)
+
+    def _chip_with_workers(self, split_ind, num_splits, num_scenes, writer):
+        """Chip scenes using a pool of chip_workers processes.
+
+        The windows of each scene are split into ranges so that there are at
+        least as many ranges as workers, even if there are fewer scenes than
+        workers. Each range is a task that refers to its scene by its index,
+        since scene configs can't be pickled; the workers are forked with the
+        pipeline and look up the scene config in its dataset. Workers put
+        batches of samples on a bounded queue, which is drained into the
+        sample writer.
+
+        A worker activates a scene and computes its windows the first time it
+        gets a range of it, and keeps it activated for the following ranges.
+        When there are at least as many scenes as workers, each scene is a
+        single range, and is only activated once. Otherwise, each scene is
+        activated and its windows are computed once by each worker that gets
+        one of its ranges, which costs reading the scene up to num_ranges
+        times in exchange for using all the workers.
+        """
+        num_workers = self.config.chip_workers
+        num_ranges = int(math.ceil(num_workers / num_scenes))
+        seeds = np.random.randint(0, 2**31 - 1, num_scenes)
+        mp_context = multiprocessing.get_context('fork')
+        sample_queue = mp_context.Queue(maxsize=2 * num_workers)
+        cancel_event = mp_context.Event()
+        pool = mp_context.Pool(
+            num_workers,
+            initializer=_init_chip_worker,
+            initargs=(self, split_ind, num_splits, sample_queue, cancel_event))
+        with pool:
+            results = [
+                pool.apply_async(
+                    _chip_worker_range,
+                    (scene_ind, int(seeds[scene_ind]), range_ind, num_ranges))
+                for scene_ind in range(num_scenes)
+                for range_ind in range(num_ranges)
+            ]
+            self._write_worker_samples(sample_queue, cancel_event, results,
+                                       writer)
+
+    def _write_worker_samples(self, sample_queue, cancel_event, results,
+                              writer):
+        """Write batches of samples from chip workers until all are done.
+
+        Each range of windows ends with a None on the queue, even if it fails.
+        If writing a sample fails, the cancel event is set so that ranges stop
+        making samples, and the queue is drained so that workers don't block
+        on it.
+        """
+        num_running = len(results)
+        error = None
+        while num_running > 0:
+            try:
+                samples = sample_queue.get(timeout=1)
+            except queue.Empty:
+                # Raise errors of workers that died without finishing.
+                for r in results:
+                    if r.ready() and not r.successful():
+                        r.get()
+                continue
+            if samples is None:
+                num_running -= 1
+            elif error is None:
+                try:
+                    for sample in samples:
+                        writer.write_sample(sample)
+                except Exception as e:
+                    error = e
+                    cancel_event.set()
+        if error is not None:
+            raise error
+        for r in results:
+            r.get()
 
     def train(self):
         """Train a model and save it."""
@@ -129,14 +369,18 @@ class RVPipeline(Pipeline):
         """Post-process all labels at end of prediction."""
         return labels
 
-    def get_predict_windows(self, extent: Box) -> List[Box]:
+    def get_predict_windows(self, extent: Box) -> Union[List[Box], np.ndarray]:
         """Returns windows to compute predictions for.
 
         Args:
             extent: extent of RasterSource
+
+        Returns:
+            list of Boxes, or array of shape [N, 4] in npbox format (see
+            Box.get_windows_array)
         """
         chip_sz = stride = self.config.predict_chip_sz
-        return extent.get_windows(chip_sz, stride)
+        return extent.get_windows_array(chip_sz, stride)
 
     def predict(self, split_ind=0, num_splits=1):
         """Make predictions over each validation and test scene.
@@ -169,18 +413,25 @@ class RVPipeline(Pipeline):
                 for s in dataset.test_scenes
             ])
 
+    def get_empty_predict_labels(self, scene: Scene) -> Labels:
+        """Returns empty labels that predictions for a scene are added to."""
+        return scene.prediction_label_store.empty_labels()
+
     def predict_scene(self, scene: Scene, backend: Backend) -> Labels:
         """Returns predictions for a single scene."""
         log.info('Making predictions for scene')
         raster_source = scene.raster_source
-        label_store = scene.prediction_label_store
-        labels = label_store.empty_labels()
+        labels = self.get_empty_predict_labels(scene)
 
         windows = self.get_predict_windows(raster_source.get_extent())
 
+        if self.config.predict_num_workers > 0:
+            labels = self._predict_windows_with_prefetch(
+                raster_source, backend, windows, labels)
+            return self.post_process_predictions(labels, scene)
+
         def predict_batch(chips, windows):
             nonlocal labels
-            chips = np.array(chips)
             batch_labels = backend.predict(chips, windows)
             batch_labels = self.post_process_batch(windows, chips,
                                                    batch_labels)
@@ -188,24 +439,77 @@ class RVPipeline(Pipeline):
 
             print('.' * len(chips), end='', flush=True)
 
-        batch_chips, batch_windows = [], []
-        for window in windows:
-            chip = raster_source.get_chip(window)
-            batch_chips.append(chip)
-            batch_windows.append(window)
-
-            # Predict on batch
-            if len(batch_chips) >= self.config.predict_batch_sz:
-                predict_batch(batch_chips, batch_windows)
-                batch_chips, batch_windows = [], []
+        # Read each batch into the same array. The first batch is the largest, so
+        # later batches fit into a slice of it.
+        batch_sz = self.config.predict_batch_sz
+        out = None
+        for batch_windows in iter_window_batches(windows, batch_sz):
+            batch_out = None if out is None else out[:len(batch_windows)]
+            chips = raster_source.get_chips(batch_windows, out=batch_out)
+            if out is None:
+                out = chips
+            predict_batch(chips, batch_windows)
         print()
 
-        # Predict on remaining batch
-        if len(batch_chips) > 0:
-            predict_batch(batch_chips, batch_windows)
-
         return self.post_process_predictions(labels, scene)
 
+    def _predict_windows_with_prefetch(
+            self, raster_source: RasterSource, backend: Backend,
+            windows: Union[List[Box], np.ndarray], labels: Labels) -> Labels:
+        """Make predictions while reading and merging in background threads.
+
+        A pool of predict_num_workers threads reads up to predict_queue_depth
+        batches of chips ahead of the batch the model is running on, and a
+        separate thread post-processes batch predictions and merges them into
+        labels.
+        """
+        batch_sz = self.config.predict_batch_sz
+        queue_depth = self.config.predict_queue_depth
+        batches = iter_window_batches(windows, batch_sz)
+
+        def merge_batch(windows, chips, batch_labels):
+            nonlocal labels
+            batch_labels = self.post_process_batch(windows, chips,
+                                                   batch_labels)
+            labels += batch_labels
+
+            print('.' * len(chips), end='', flush=True)
+
+        read_pool = ThreadPoolExecutor(self.config.predict_num_workers)
+        merge_pool = ThreadPoolExecutor(1)
+        with read_pool, merge_pool:
+            reads = deque()
+            merges = deque()
+
+            def read_next_batch():
+                batch_windows = next(batches, None)
+                if batch_windows is not None:
+                    reads.append((batch_windows,
+                                  read_pool.submit(raster_source.get_chips,
+                                                   batch_windows)))
+
+            for _ in range(queue_depth):
+                read_next_batch()
+
+            while reads:
+                batch_windows, read = reads.popleft()
+                chips = read.result()
+                read_next_batch()
+
+                batch_labels = backend.predict(chips, batch_windows)
+                merges.append(
+                    merge_pool.submit(merge_batch, batch_windows, chips,
+                                      batch_labels))
+                # Don't let unmerged batches pile up in memory.
+                while len(merges) > queue_depth:
+                    merges.popleft().result()
+
+            for merge in merges:
+                merge.result()
+        print()
+
+        return labels
+
     def eval(self):
         """Evaluate predictions against ground truth."""
         class_config = self.config.dataset.class_config
@@ -8,7 +8,7 @@ from rastervision.core.analyzer import StatsAnalyzerConfig
 from rastervision.core.backend import BackendConfig
 from rastervision.core.evaluation import EvaluatorConfig
 from rastervision.core.analyzer import AnalyzerConfig
-from rastervision.pipeline.config import register_config, Field
+from rastervision.pipeline.config import register_config, Field, ConfigError
 
 if TYPE_CHECKING:
     from rastervision.core.backend.backend import Backend  # noqa
@@ -36,10 +36,36 @@ class RVPipelineConfig(PipelineConfig):
 
     train_chip_sz: int = Field(
         300, description='Size of training chips in pixels.')
+    chip_batch_sz: int = Field(
+        16,
+        description=
+        'Number of training windows to read from the imagery at once during chip.'
+    )
+    chip_workers: int = Field(
+        0,
+        description=
+        ('Number of processes used to make chips. Scenes, and ranges of windows '
+         'within scenes, are chipped in parallel, and each process activates '
+         'its own copy of the scenes it works on. Chips are written by the '
+         'sample writer in the main process. If 0, chips are made serially in '
+         'the main process.'))
     predict_chip_sz: int = Field(
         300, description='Size of predictions chips in pixels.')
     predict_batch_sz: int = Field(
         8, description='Batch size to use during prediction.')
+    predict_num_workers: int = Field(
+        0,
+        description=
+        ('Number of background threads that read batches of chips during '
+         'prediction, so that reading imagery overlaps with running the model. '
+         'Predictions are also merged in a separate background thread. If 0, '
+         'reading, predicting and merging are done serially.'))
+    predict_queue_depth: int = Field(
+        2,
+        description=(
+            'Maximum number of batches that are read ahead of, or waiting to be '
+            'merged behind, the batch the model is running on. Only used if '
+            'predict_num_workers > 0.'))
 
     analyze_uri: Optional[str] = Field(
         None,
@@ -91,6 +117,14 @@ class RVPipelineConfig(PipelineConfig):
         for analyzer in self.analyzers:
             analyzer.update(pipeline=self)
 
+    def validate_config(self):
+        if self.chip_workers < 0:
+            raise ConfigError('chip_workers must be >= 0')
+        if self.predict_num_workers < 0:
+            raise ConfigError('predict_num_workers must be >= 0')
+        if self.predict_queue_depth < 1:
+            raise ConfigError('predict_queue_depth must be >= 1')
+
     def get_model_bundle_uri(self):
         return join(self.bundle_uri, 'model-bundle.zip')
 
@@ -5,6 +5,7 @@ import numpy as np
 
 from rastervision.core.rv_pipeline.rv_pipeline import RVPipeline
 from rastervision.core.box import Box
+from rastervision.core.data.label import SemanticSegmentationSmoothLabels
 from rastervision.core.rv_pipeline.semantic_segmentation_config import (
     SemanticSegmentationWindowMethod)
 
@@ -32,6 +33,8 @@ def get_train_windows(scene, class_config, chip_size,
 
             filt_windows = []
             for w in windows:
+                if isinstance(w, np.ndarray):
+                    w = Box.from_npbox(w.tolist())
                 label_arr = label_source.get_labels(w).get_label_arr(w)
                 null_inds = (
                     label_arr.ravel() == class_config.get_null_class_id())
@@ -42,7 +45,9 @@ def get_train_windows(scene, class_config, chip_size,
 
     if co.window_method == SemanticSegmentationWindowMethod.sliding:
         stride = co.stride or int(round(chip_size / 2))
-        windows = list(filter_windows((extent.get_windows(chip_size, stride))))
+        windows = filter_windows(extent.get_windows_array(chip_size, stride))
+        if isinstance(windows, np.ndarray):
+            windows = Box.from_npboxes(windows)
     elif co.window_method == SemanticSegmentationWindowMethod.random_sample:
         target_class_ids = co.target_class_ids or list(
             range(len(class_config)))
@@ -98,12 +103,35 @@ class SemanticSegmentation(RVPipeline):
         sample.chip = fill_no_data(img, label_arr, null_class_id)
         return sample
 
+    def get_predict_windows(self, extent):
+        chip_sz = self.config.predict_chip_sz
+        stride = self.config.predict_options.stride or chip_sz
+        return extent.get_windows_array(chip_sz, stride)
+
+    def get_empty_predict_labels(self, scene):
+        po = self.config.predict_options
+        if not po.smooth:
+            return super().get_empty_predict_labels(scene)
+        class_config = self.config.dataset.class_config
+        return SemanticSegmentationSmoothLabels(
+            scene.raster_source.get_extent(),
+            len(class_config),
+            dtype=po.score_dtype,
+            blend_method=po.blend_method.value,
+            fill_value=class_config.get_null_class_id())
+
     def post_process_batch(self, windows, chips, labels):
         # Fill in null class for any NODATA pixels.
         null_class_id = self.config.dataset.class_config.get_null_class_id()
         for window, chip in zip(windows, chips):
+            nodata_mask = np.sum(chip, axis=2) == 0
             label_arr = labels.get_label_arr(window)
-            label_arr[np.sum(chip, axis=2) == 0] = null_class_id
+            label_arr[nodata_mask] = null_class_id
             labels.set_label_arr(window, label_arr)
 
+            score_arr = labels.get_score_arr(window)
+            if score_arr is not None:
+                score_arr[:, nodata_mask] = 0
+                score_arr[null_class_id, nodata_mask] = 1
+
         return labels
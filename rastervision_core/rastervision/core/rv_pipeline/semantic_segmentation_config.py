@@ -1,7 +1,8 @@
 from typing import (List, Optional)
 from enum import Enum
 
-from rastervision.pipeline.config import register_config, Config, Field
+from rastervision.pipeline.config import (register_config, Config, Field,
+                                          ConfigError)
 from rastervision.core.rv_pipeline import RVPipelineConfig
 from rastervision.core.data import SemanticSegmentationLabelStoreConfig
 from rastervision.core.evaluation import SemanticSegmentationEvaluatorConfig
@@ -19,6 +20,20 @@ class SemanticSegmentationWindowMethod(Enum):
     random_sample = 'random_sample'
 
 
+class SemanticSegmentationBlendMethod(Enum):
+    """Enum for methods of weighting pixels when blending overlapping windows
+
+    Attributes:
+        none: all pixels in a window have the same weight
+        linear: weights decrease linearly towards the edges of a window
+        cosine: weights follow a cosine (Hann) window
+    """
+
+    none = 'none'
+    linear = 'linear'
+    cosine = 'cosine'
+
+
 @register_config('semantic_segmentation_chip_options')
 class SemanticSegmentationChipOptions(Config):
     """Chipping options for semantic segmentation."""
@@ -56,10 +71,48 @@ class SemanticSegmentationChipOptions(Config):
          'the sliding_window method.'))
 
 
+@register_config('semantic_segmentation_predict_options')
+class SemanticSegmentationPredictOptions(Config):
+    """Prediction options for semantic segmentation."""
+    stride: Optional[int] = Field(
+        None,
+        description=
+        ('Stride of windows across image during prediction. Defaults to '
+         'predict_chip_sz, ie. no overlap. Overlapping windows are only useful '
+         'if smooth is True.'))
+    smooth: bool = Field(
+        False,
+        description=
+        ('If True, accumulate class probabilities of overlapping windows into a '
+         'scene-sized buffer and take the argmax at the end. Otherwise, '
+         'predicted class ids of later windows overwrite those of earlier '
+         'ones.'))
+    blend_method: SemanticSegmentationBlendMethod = Field(
+        SemanticSegmentationBlendMethod.none,
+        description=
+        ('How to weight pixels within a window when smooth is True. linear and '
+         'cosine give less weight to pixels near the edges of windows, which '
+         'reduces edge artifacts.'))
+    score_dtype: str = Field(
+        'float32',
+        description=
+        ('dtype of the buffer of class probabilities when smooth is True. One of '
+         'float32, float16 or uint8. float16 and uint8 reduce memory use at the '
+         'cost of precision.'))
+
+    def validate_config(self):
+        self.validate_list('score_dtype', ['float32', 'float16', 'uint8'])
+        if self.stride is not None and self.stride <= 0:
+            raise ConfigError('stride must be > 0')
+
+
 @register_config('semantic_segmentation')
 class SemanticSegmentationConfig(RVPipelineConfig):
     chip_options: SemanticSegmentationChipOptions = SemanticSegmentationChipOptions(
     )
+    predict_options: SemanticSegmentationPredictOptions = Field(
+        SemanticSegmentationPredictOptions(),
+        description='Options for making predictions.')
 
     def build(self, tmp_dir):
         from rastervision.core.rv_pipeline.semantic_segmentation import (
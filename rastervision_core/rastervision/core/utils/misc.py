@@ -12,7 +12,7 @@ def save_img(im_array, output_path):
     imageio.imwrite(output_path, im_array)
 
 
-def numpy_to_png(array: np.ndarray) -> str:
+def numpy_to_png(array: np.ndarray, compress_level: int = 6) -> bytes:
     """Get a PNG string from a Numpy array.
 
     Args:
@@ -20,14 +20,16 @@ def numpy_to_png(array: np.ndarray) -> str:
                former is meant to become a three-channel image and the
                latter a one-channel image.  The dtype of the array
                should be uint8.
+         compress_level: zlib compression level between 0 (no compression,
+               fastest) and 9 (smallest)
 
     Returns:
-         str
+         bytes
 
     """
     im = Image.fromarray(array)
     output = io.BytesIO()
-    im.save(output, 'png')
+    im.save(output, 'png', compress_level=compress_level)
     return output.getvalue()
 
 
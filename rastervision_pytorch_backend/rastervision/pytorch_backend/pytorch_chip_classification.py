@@ -1,9 +1,7 @@
 from os.path import join
 import uuid
 
-from rastervision.pipeline.file_system import (make_dir)
 from rastervision.core.data.label import ChipClassificationLabels
-from rastervision.core.utils.misc import save_img
 from rastervision.core.data_sample import DataSample
 from rastervision.pytorch_backend.pytorch_learner_backend import (
     PyTorchLearnerSampleWriter, PyTorchLearnerBackend)
@@ -13,7 +11,8 @@ class PyTorchChipClassificationSampleWriter(PyTorchLearnerSampleWriter):
     def write_sample(self, sample: DataSample):
         """
         This writes a training or validation sample to
-        (train|valid)/{class_name}/{scene_id}-{ind}.png
+        (train|valid)/{class_name}/{scene_id}-{ind}.png, or to the shards of
+        the split if using shards.
         """
         class_id = sample.labels.get_cell_class_id(sample.window)
         # If a chip is not associated with a class, don't
@@ -22,12 +21,15 @@ class PyTorchChipClassificationSampleWriter(PyTorchLearnerSampleWriter):
             return
 
         split_name = 'train' if sample.is_train else 'valid'
+        if self.shard_writer is not None:
+            self.write_to_shards(split_name, sample.chip, int(class_id))
+            self.sample_ind += 1
+            return
+
         class_name = self.class_config.names[class_id]
-        class_dir = join(self.sample_dir, split_name, class_name)
-        make_dir(class_dir)
-        chip_path = join(class_dir, '{}-{}.png'.format(sample.scene_id,
-                                                       self.sample_ind))
-        save_img(sample.chip, chip_path)
+        chip_path = join(split_name, class_name, '{}-{}.png'.format(
+            sample.scene_id, self.sample_ind))
+        self.write_img(sample.chip, chip_path)
         self.sample_ind += 1
 
 
@@ -36,7 +38,8 @@ class PyTorchChipClassification(PyTorchLearnerBackend):
         output_uri = join(self.pipeline_cfg.chip_uri, '{}.zip'.format(
             str(uuid.uuid4())))
         return PyTorchChipClassificationSampleWriter(
-            output_uri, self.pipeline_cfg.dataset.class_config, self.tmp_dir)
+            output_uri, self.pipeline_cfg.dataset.class_config, self.tmp_dir,
+            **self.get_sample_writer_options())
 
     def predict(self, chips, windows):
         if self.learner is None:
@@ -1,9 +1,9 @@
 from rastervision.pipeline.config import register_config
 from rastervision.pytorch_backend.pytorch_learner_backend_config import (
-    PyTorchLearnerBackendConfig)
+    PyTorchLearnerBackendConfig, ChipFormat)
 from rastervision.pytorch_learner.classification_learner_config import (
     ClassificationModelConfig, ClassificationLearnerConfig,
-    ClassificationDataConfig)
+    ClassificationDataConfig, ClassificationDataFormat)
 
 from rastervision.pytorch_backend.pytorch_chip_classification import (
     PyTorchChipClassification)
@@ -20,6 +20,8 @@ class PyTorchChipClassificationConfig(PyTorchLearnerBackendConfig):
         data.class_colors = pipeline.dataset.class_config.colors
         data.img_sz = pipeline.train_chip_sz
         data.augmentors = self.augmentors
+        if self.chip_format == ChipFormat.shards:
+            data.data_format = ClassificationDataFormat.shards
 
         learner = ClassificationLearnerConfig(
             data=data,
@@ -1,36 +1,79 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from os.path import join
 import tempfile
+import zipfile
 
-from rastervision.pipeline.file_system import (make_dir, upload_or_copy,
-                                               zipdir)
+import numpy as np
+
+from rastervision.pipeline.file_system import upload_or_copy
 from rastervision.core.backend import Backend, SampleWriter
 from rastervision.core.data_sample import DataSample
 from rastervision.core.data import ClassConfig
 from rastervision.core.rv_pipeline import RVPipelineConfig
+from rastervision.core.utils.misc import numpy_to_png
+from rastervision.pytorch_backend.pytorch_learner_backend_config import (
+    ChipFormat)
 from rastervision.pytorch_learner.learner_config import LearnerConfig
 from rastervision.pytorch_learner.learner import Learner
+from rastervision.pytorch_learner.chip_shards import (ChipShardWriter,
+                                                      DEFAULT_SHARD_SZ)
+
+DEFAULT_PNG_COMPRESS_LEVEL = 6
+DEFAULT_ENCODE_WORKERS = 4
 
 
 class PyTorchLearnerSampleWriter(SampleWriter):
-    def __init__(self, output_uri: str, class_config: ClassConfig,
-                 tmp_dir: str):
+    def __init__(self,
+                 output_uri: str,
+                 class_config: ClassConfig,
+                 tmp_dir: str,
+                 png_compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL,
+                 num_encode_workers: int = DEFAULT_ENCODE_WORKERS,
+                 use_shards: bool = False,
+                 shard_sz: int = DEFAULT_SHARD_SZ):
         """Constructor.
 
+        Samples are written directly into an uncompressed zip file, since the
+        PNG files it holds are already compressed.
+
         Args:
             output_uri: URI of directory where zip file of chips should be placed
             class_config: used to convert class ids to names which may be needed for some
                 training data formats
             tmp_dir: local directory which is root of any temporary directories that
                 are created
+            png_compress_level: zlib compression level of PNG files between 0
+                (fastest) and 9 (smallest)
+            num_encode_workers: number of threads used to encode PNG files, so
+                that encoding overlaps with making chips. If 0, images are
+                encoded in the calling thread.
+            use_shards: if True, write chips to shards using ChipShardWriter
+                instead of as PNG files
+            shard_sz: maximum number of chips in a shard
         """
         self.output_uri = output_uri
         self.class_config = class_config
         self.tmp_dir = tmp_dir
+        self.png_compress_level = png_compress_level
+        self.num_encode_workers = num_encode_workers
+        self.use_shards = use_shards
+        self.shard_sz = shard_sz
 
     def __enter__(self):
         self.tmp_dir_obj = tempfile.TemporaryDirectory(dir=self.tmp_dir)
-        self.sample_dir = join(self.tmp_dir_obj.name, 'samples')
-        make_dir(self.sample_dir)
+        self.zip_path = join(self.tmp_dir_obj.name, 'output.zip')
+        self.zip_file = zipfile.ZipFile(self.zip_path, 'w', zipfile.ZIP_STORED)
+        self.encode_pool = None
+        if self.num_encode_workers > 0:
+            self.encode_pool = ThreadPoolExecutor(self.num_encode_workers)
+        # (path, future) of images that are being encoded, in the order they
+        # were written.
+        self.pending_imgs = deque()
+        self.shard_writer = None
+        if self.use_shards:
+            self.shard_writer = ChipShardWriter(
+                self._open_file, self.tmp_dir_obj.name, self.shard_sz)
         self.sample_ind = 0
 
         return self
@@ -44,11 +87,70 @@ class PyTorchLearnerSampleWriter(SampleWriter):
         process chips in parallel. The uuid in the zip path above is what allows
         separate instances to avoid overwriting each others' output.
         """
-        output_path = join(self.tmp_dir_obj.name, 'output.zip')
-        zipdir(self.sample_dir, output_path)
-        upload_or_copy(output_path, self.output_uri)
+        if self.shard_writer is not None:
+            self.shard_writer.close()
+        while self.pending_imgs:
+            self._write_pending_img()
+        if self.encode_pool is not None:
+            self.encode_pool.shutdown()
+        self.zip_file.close()
+        upload_or_copy(self.zip_path, self.output_uri)
         self.tmp_dir_obj.cleanup()
 
+    def write_img(self, im_array: np.ndarray, path: str):
+        """Encode an image as PNG and add it to the zip file.
+
+        When using encode workers, at most 2 * num_encode_workers images are
+        encoded at a time, so that memory use is bounded if encoding is slower
+        than making chips. The image must not be modified after calling this.
+
+        Args:
+            im_array: array of shape (height, width) or (height, width,
+                channels)
+            path: path of the file relative to the root of the zip file
+        """
+        if self.encode_pool is None:
+            self.zip_file.writestr(
+                path, numpy_to_png(im_array, self.png_compress_level))
+            return
+
+        future = self.encode_pool.submit(numpy_to_png, im_array,
+                                         self.png_compress_level)
+        self.pending_imgs.append((path, future))
+        while len(self.pending_imgs) > 2 * self.num_encode_workers:
+            self._write_pending_img()
+
+    def _write_pending_img(self):
+        path, future = self.pending_imgs.popleft()
+        self.zip_file.writestr(path, future.result())
+
+    def write_file(self, data: str, path: str):
+        """Add a file with the given contents to the zip file.
+
+        Args:
+            data: contents of the file
+            path: path of the file relative to the root of the zip file
+        """
+        self.zip_file.writestr(path, data)
+
+    def write_to_shards(self, split: str, chip: np.ndarray, label):
+        """Add a chip and its label to the shards of a split.
+
+        Unlike PNG files, shards hold chips of any dtype and number of
+        channels as they are, and the learners scale them to [0, 1] by the max
+        value of their dtype when loading them.
+
+        Args:
+            split: name of the split, eg. 'train'
+            chip: array of shape (height, width, channels)
+            label: label array or JSON serializable object
+        """
+        self.shard_writer.write(split, chip, label)
+
+    def _open_file(self, path: str):
+        # Shards can be larger than 2 GB.
+        return self.zip_file.open(path, 'w', force_zip64=True)
+
     def write_sample(self, sample: DataSample):
         """Write a single sample to disk."""
         raise NotImplementedError()
@@ -75,5 +177,15 @@ class PyTorchLearnerBackend(Backend):
     def get_sample_writer(self):
         raise NotImplementedError()
 
+    def get_sample_writer_options(self) -> dict:
+        """Return keyword args of the sample writer set in the backend config."""
+        backend_cfg = self.pipeline_cfg.backend
+        return {
+            'png_compress_level': backend_cfg.chip_png_compress_level,
+            'num_encode_workers': backend_cfg.chip_encode_workers,
+            'use_shards': backend_cfg.chip_format == ChipFormat.shards,
+            'shard_sz': backend_cfg.chip_shard_sz
+        }
+
     def predict(self, chips, windows):
         raise NotImplementedError()
@@ -1,10 +1,17 @@
+from enum import Enum
 from typing import List
 
-from rastervision.pipeline.config import register_config, Field
+from rastervision.pipeline.config import register_config, Field, ConfigError
 from rastervision.core.backend import BackendConfig
 from rastervision.pytorch_learner.learner_config import (
     SolverConfig, ModelConfig, default_augmentors, augmentors as
     augmentor_list)
+from rastervision.pytorch_learner.chip_shards import DEFAULT_SHARD_SZ
+
+
+class ChipFormat(Enum):
+    png = 'png'
+    shards = 'shards'
 
 
 @register_config('pytorch_learner_backend')
@@ -27,6 +34,40 @@ class PyTorchLearnerBackendConfig(BackendConfig):
         ('This field is passed along to the LearnerConfig which is returned by '
          'get_learner_config(). For more info, see the docs for'
          'pytorch_learner.learner_config.LearnerConfig.test_mode.'))
+    chip_png_compress_level: int = Field(
+        6,
+        description=
+        ('zlib compression level of the PNG files written by the chip command, '
+         'between 0 (fastest, largest files) and 9 (slowest, smallest files).'
+         ))
+    chip_encode_workers: int = Field(
+        4,
+        description=
+        ('Number of threads used to encode PNG files during the chip command, '
+         'so that encoding overlaps with reading imagery. If 0, files are '
+         'encoded serially.'))
+    chip_format: ChipFormat = Field(
+        ChipFormat.png,
+        description=
+        ('Format of the chips written by the chip command. If png, each chip is '
+         'a PNG file. If shards, chips are stored as raw arrays in shards of '
+         'chip_shard_sz chips that are memory-mapped during training, which '
+         'avoids decoding images. Unlike png, shards hold chips of any dtype, '
+         'such as uint16, and number of channels, and chips are scaled to '
+         '[0, 1] by the max value of their dtype during training.'))
+    chip_shard_sz: int = Field(
+        DEFAULT_SHARD_SZ,
+        description=
+        'Maximum number of chips in a shard if chip_format is shards.')
+
+    def validate_config(self):
+        if not 0 <= self.chip_png_compress_level <= 9:
+            raise ConfigError(
+                'chip_png_compress_level must be between 0 and 9')
+        if self.chip_encode_workers < 0:
+            raise ConfigError('chip_encode_workers must be >= 0')
+        if self.chip_shard_sz < 1:
+            raise ConfigError('chip_shard_sz must be >= 1')
 
     def get_bundle_filenames(self):
         return ['model-bundle.zip']
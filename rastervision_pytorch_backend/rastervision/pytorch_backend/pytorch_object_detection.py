@@ -1,9 +1,9 @@
+import json
 from os.path import join
 import uuid
 
-from rastervision.pipeline.file_system import (make_dir, json_to_file)
-from rastervision.core.data.label import ObjectDetectionLabels
-from rastervision.core.utils.misc import save_img
+from rastervision.core.data.label import (ObjectDetectionLabels,
+                                          ObjectDetectionLabelsAccumulator)
 from rastervision.core.data_sample import DataSample
 from rastervision.pytorch_backend.pytorch_learner_backend import (
     PyTorchLearnerSampleWriter, PyTorchLearnerBackend)
@@ -36,8 +36,7 @@ class PyTorchObjectDetectionSampleWriter(PyTorchLearnerSampleWriter):
         """This writes label files in COCO format to (train|valid)/labels.json"""
         for split in ['train', 'valid']:
             if len(self.splits[split]['images']) > 0:
-                split_dir = join(self.sample_dir, split)
-                labels_path = join(split_dir, 'labels.json')
+                labels_path = join(split, 'labels.json')
 
                 images = self.splits[split]['images']
                 annotations = self.splits[split]['annotations']
@@ -46,7 +45,7 @@ class PyTorchObjectDetectionSampleWriter(PyTorchLearnerSampleWriter):
                     'annotations': annotations,
                     'categories': self.categories
                 }
-                json_to_file(coco_dict, labels_path)
+                self.write_file(json.dumps(coco_dict), labels_path)
 
         super().__exit__(type, value, traceback)
 
@@ -54,15 +53,27 @@ class PyTorchObjectDetectionSampleWriter(PyTorchLearnerSampleWriter):
         """
         This writes a training or validation sample to
         (train|valid)/img/{scene_id}-{ind}.png and updates
-        some COCO data structures.
+        some COCO data structures. If using shards, the sample is written to
+        the shards of the split along with its boxes in COCO format.
         """
         split = 'train' if sample.is_train else 'valid'
-        split_dir = join(self.sample_dir, split)
-        img_dir = join(split_dir, 'img')
-        make_dir(img_dir)
+
+        npboxes = sample.labels.get_npboxes()
+        npboxes = ObjectDetectionLabels.global_to_local(npboxes, sample.window)
+        bboxes = []
+        for box in npboxes:
+            bbox = [box[1], box[0], box[3] - box[1], box[2] - box[0]]
+            bboxes.append([int(i) for i in bbox])
+        class_ids = [int(i) for i in sample.labels.get_class_ids()]
+
+        if self.shard_writer is not None:
+            ann = {'bboxes': bboxes, 'category_id': class_ids}
+            self.write_to_shards(split, sample.chip, ann)
+            self.sample_ind += 1
+            return
+
         img_fn = '{}-{}.png'.format(sample.scene_id, self.sample_ind)
-        img_path = join(img_dir, img_fn)
-        save_img(sample.chip, img_path)
+        self.write_img(sample.chip, join(split, 'img', img_fn))
 
         images = self.splits[split]['images']
         annotations = self.splits[split]['annotations']
@@ -74,17 +85,12 @@ class PyTorchObjectDetectionSampleWriter(PyTorchLearnerSampleWriter):
             'width': sample.chip.shape[1]
         })
 
-        npboxes = sample.labels.get_npboxes()
-        npboxes = ObjectDetectionLabels.global_to_local(npboxes, sample.window)
-        for box_ind, (box, class_id) in enumerate(
-                zip(npboxes, sample.labels.get_class_ids())):
-            bbox = [box[1], box[0], box[3] - box[1], box[2] - box[0]]
-            bbox = [int(i) for i in bbox]
+        for box_ind, (bbox, class_id) in enumerate(zip(bboxes, class_ids)):
             annotations.append({
                 'id': '{}-{}'.format(self.sample_ind, box_ind),
                 'image_id': self.sample_ind,
                 'bbox': bbox,
-                'category_id': int(class_id)
+                'category_id': class_id
             })
 
         self.sample_ind += 1
@@ -95,7 +101,8 @@ class PyTorchObjectDetection(PyTorchLearnerBackend):
         output_uri = join(self.pipeline_cfg.chip_uri, '{}.zip'.format(
             str(uuid.uuid4())))
         return PyTorchObjectDetectionSampleWriter(
-            output_uri, self.pipeline_cfg.dataset.class_config, self.tmp_dir)
+            output_uri, self.pipeline_cfg.dataset.class_config, self.tmp_dir,
+            **self.get_sample_writer_options())
 
     def predict(self, chips, windows):
         """Return predictions for a chip using model.
@@ -111,7 +118,7 @@ class PyTorchObjectDetection(PyTorchLearnerBackend):
             self.load_model()
 
         batch_out = self.learner.numpy_predict(chips, raw_out=False)
-        labels = ObjectDetectionLabels.make_empty()
+        labels = ObjectDetectionLabelsAccumulator()
 
         for chip_ind, out in enumerate(batch_out):
             window = windows[chip_ind]
@@ -119,6 +126,6 @@ class PyTorchObjectDetection(PyTorchLearnerBackend):
             class_ids = out['class_ids']
             scores = out['scores']
             boxes = ObjectDetectionLabels.local_to_global(boxes, window)
-            labels += ObjectDetectionLabels(boxes, class_ids, scores=scores)
+            labels.add(ObjectDetectionLabels(boxes, class_ids, scores=scores))
 
-        return labels
+        return labels.finalize()
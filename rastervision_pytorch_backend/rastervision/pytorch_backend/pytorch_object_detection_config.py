@@ -1,9 +1,9 @@
 from rastervision.pipeline.config import register_config
 from rastervision.pytorch_backend.pytorch_learner_backend_config import (
-    PyTorchLearnerBackendConfig)
+    PyTorchLearnerBackendConfig, ChipFormat)
 from rastervision.pytorch_learner.object_detection_learner_config import (
     ObjectDetectionModelConfig, ObjectDetectionLearnerConfig,
-    ObjectDetectionDataConfig)
+    ObjectDetectionDataConfig, ObjectDetectionDataFormat)
 from rastervision.pytorch_backend.pytorch_object_detection import (
     PyTorchObjectDetection)
 
@@ -19,6 +19,8 @@ class PyTorchObjectDetectionConfig(PyTorchLearnerBackendConfig):
         data.class_colors = pipeline.dataset.class_config.colors
         data.img_sz = pipeline.train_chip_sz
         data.augmentors = self.augmentors
+        if self.chip_format == ChipFormat.shards:
+            data.data_format = ObjectDetectionDataFormat.shards
 
         learner = ObjectDetectionLearnerConfig(
             data=data,
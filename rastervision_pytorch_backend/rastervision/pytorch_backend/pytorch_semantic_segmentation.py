@@ -3,9 +3,7 @@ import uuid
 
 import numpy as np
 
-from rastervision.pipeline.file_system import (make_dir)
 from rastervision.core.data.label import SemanticSegmentationLabels
-from rastervision.core.utils.misc import save_img
 from rastervision.core.data_sample import DataSample
 from rastervision.pytorch_backend.pytorch_learner_backend import (
     PyTorchLearnerSampleWriter, PyTorchLearnerBackend)
@@ -16,22 +14,23 @@ class PyTorchSemanticSegmentationSampleWriter(PyTorchLearnerSampleWriter):
         """
         This writes a training or validation sample to
         (train|valid)/img/{scene_id}-{ind}.png and
-        (train|valid)/labels/{scene_id}-{ind}.png
+        (train|valid)/labels/{scene_id}-{ind}.png, or to the shards of the
+        split if using shards.
         """
         split_name = 'train' if sample.is_train else 'valid'
         label_arr = sample.labels.get_label_arr(sample.window).astype(np.uint8)
+        if self.shard_writer is not None:
+            self.write_to_shards(split_name, sample.chip, label_arr)
+            self.sample_ind += 1
+            return
 
-        img_dir = join(self.sample_dir, split_name, 'img')
-        labels_dir = join(self.sample_dir, split_name, 'labels')
-        make_dir(img_dir)
-        make_dir(labels_dir)
-
-        img_path = join(img_dir, '{}-{}.png'.format(sample.scene_id,
-                                                    self.sample_ind))
+        img_path = join(split_name, 'img', '{}-{}.png'.format(
+            sample.scene_id, self.sample_ind))
         labels_path = join(
-            labels_dir, '{}-{}.png'.format(sample.scene_id, self.sample_ind))
-        save_img(sample.chip, img_path)
-        save_img(label_arr, labels_path)
+            split_name, 'labels', '{}-{}.png'.format(sample.scene_id,
+                                                     self.sample_ind))
+        self.write_img(sample.chip, img_path)
+        self.write_img(label_arr, labels_path)
 
         self.sample_ind += 1
 
@@ -41,14 +40,27 @@ class PyTorchSemanticSegmentation(PyTorchLearnerBackend):
         output_uri = join(self.pipeline_cfg.chip_uri, '{}.zip'.format(
             str(uuid.uuid4())))
         return PyTorchSemanticSegmentationSampleWriter(
-            output_uri, self.pipeline_cfg.dataset.class_config, self.tmp_dir)
+            output_uri, self.pipeline_cfg.dataset.class_config, self.tmp_dir,
+            **self.get_sample_writer_options())
 
     def predict(self, chips, windows):
         if self.learner is None:
             self.load_model()
 
-        batch_out = self.learner.numpy_predict(chips, raw_out=False)
         labels = SemanticSegmentationLabels()
+        if self.pipeline_cfg.predict_options.smooth:
+            # Keep class probabilities so that overlapping windows can be
+            # blended before taking the argmax.
+            batch_out = self.learner.numpy_predict(chips, raw_out=True)
+            batch_max = batch_out.max(axis=1, keepdims=True)
+            batch_out = np.exp(batch_out - batch_max)
+            batch_out /= batch_out.sum(axis=1, keepdims=True)
+            for out, window in zip(batch_out, windows):
+                labels.set_label_arr(window, out.argmax(axis=0))
+                labels.set_score_arr(window, out)
+            return labels
+
+        batch_out = self.learner.numpy_predict(chips, raw_out=False)
         for out, window in zip(batch_out, windows):
             labels.set_label_arr(window, out)
 
@@ -1,9 +1,9 @@
 from rastervision.pipeline.config import register_config
 from rastervision.pytorch_backend.pytorch_learner_backend_config import (
-    PyTorchLearnerBackendConfig)
+    PyTorchLearnerBackendConfig, ChipFormat)
 from rastervision.pytorch_learner.semantic_segmentation_learner_config import (
     SemanticSegmentationModelConfig, SemanticSegmentationLearnerConfig,
-    SemanticSegmentationDataConfig)
+    SemanticSegmentationDataConfig, SemanticSegmentationDataFormat)
 from rastervision.pytorch_backend.pytorch_semantic_segmentation import (
     PyTorchSemanticSegmentation)
 
@@ -19,6 +19,8 @@ class PyTorchSemanticSegmentationConfig(PyTorchLearnerBackendConfig):
         data.class_colors = pipeline.dataset.class_config.colors
         data.img_sz = pipeline.train_chip_sz
         data.augmentors = self.augmentors
+        if self.chip_format == ChipFormat.shards:
+            data.data_format = SemanticSegmentationDataFormat.shards
 
         learner = SemanticSegmentationLearnerConfig(
             data=data,
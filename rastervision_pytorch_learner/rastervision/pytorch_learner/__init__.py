@@ -3,6 +3,7 @@
 import rastervision.pipeline
 from rastervision.pytorch_learner.learner_config import *
 from rastervision.pytorch_learner.learner import *
+from rastervision.pytorch_learner.chip_shards import *
 from rastervision.pytorch_learner.learner_pipeline_config import *
 from rastervision.pytorch_learner.learner_pipeline import *
 from rastervision.pytorch_learner.classification_learner_config import *
@@ -0,0 +1,282 @@
+import io
+import json
+import os
+from os.path import join
+import shutil
+import struct
+import zipfile
+
+import numpy as np
+from torch.utils.data import Dataset
+
+DEFAULT_SHARD_SZ = 1000
+COPY_BUF_SZ = 1024 * 1024
+SHARD_DIR = 'shards'
+SHARD_INDEX_FN = 'index.json'
+SHARD_FORMAT_VERSION = 1
+
+
+def _npy_header(dtype, shape, size=None):
+    """Return a .npy (version 1.0) header for an array.
+
+    Args:
+        dtype: (np.dtype) dtype of the array
+        shape: (tuple) shape of the array
+        size: (int) if set, the header is padded with spaces to this size in
+            bytes, which must be at least its unpadded size
+    """
+    f = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        f, {
+            'descr': np.lib.format.dtype_to_descr(dtype),
+            'fortran_order': False,
+            'shape': shape
+        })
+    header = f.getvalue()
+    if size is None or size == len(header):
+        return header
+    # The header is the magic string and version (8 bytes), the length of the
+    # rest of the header (2 bytes), and the header text ending in a newline.
+    pad = size - len(header)
+    header_len = struct.unpack('<H', header[8:10])[0] + pad
+    text = header[10:-1] + b' ' * pad + b'\n'
+    return header[0:8] + struct.pack('<H', header_len) + text
+
+
+class _ShardArrayFile():
+    """A local .npy file that rows of an array are appended to.
+
+    The header is written with a placeholder number of rows, which is
+    replaced by the number of rows that were appended when the file is
+    closed.
+    """
+
+    def __init__(self, path, row, max_rows):
+        self.path = path
+        self.row_shape = row.shape
+        self.dtype = row.dtype
+        self.num_rows = 0
+        self.file = open(path, 'wb')
+        self.header_sz = self.file.write(
+            _npy_header(self.dtype, (max_rows, ) + self.row_shape))
+
+    def fits(self, row):
+        return (isinstance(row, np.ndarray) and row.shape == self.row_shape
+                and row.dtype == self.dtype)
+
+    def append(self, row):
+        self.file.write(np.ascontiguousarray(row).tobytes())
+        self.num_rows += 1
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(
+            _npy_header(self.dtype, (self.num_rows, ) + self.row_shape,
+                        self.header_sz))
+        self.file.close()
+
+
+class ChipShardWriter():
+    """Writes chips to shards of raw arrays.
+
+    The chips of each split are grouped into shards of up to shard_sz chips,
+    which are stored as .npy files of shape (n, height, width, channels) in
+    {split}/shards/. If the labels of chips are arrays (eg. semantic
+    segmentation masks), they are stored in a parallel .npy file. Otherwise,
+    they are stored in {split}/shards/index.json, which also lists the shards.
+    All chips in a shard have the same shape and dtype, so a new shard is
+    started when these change.
+
+    Chips are appended to local files in tmp_dir as they are written, so only
+    one chip is held in memory, and each shard is copied to its output file
+    when it is full. This is because the output may not support seeking or
+    having several files open at once, like the members of a zip file.
+    """
+
+    def __init__(self, open_file, tmp_dir, shard_sz=DEFAULT_SHARD_SZ):
+        """Constructor.
+
+        Args:
+            open_file: function that takes a path relative to the root of the
+                output and returns a binary file object opened for writing,
+                eg. a member of a zip file
+            tmp_dir: (str) local directory to write shards to before they
+                are full
+            shard_sz: (int) maximum number of chips in a shard
+        """
+        self.open_file = open_file
+        self.tmp_dir = tmp_dir
+        self.shard_sz = shard_sz
+        self.splits = {}
+
+    def write(self, split, img, label=None):
+        """Add a chip to the shards of a split.
+
+        Args:
+            split: (str) name of the split, eg. 'train'
+            img: (np.ndarray) array of shape (height, width, channels)
+            label: np.ndarray or JSON serializable object, eg. a class id
+        """
+        if split not in self.splits:
+            self.splits[split] = {
+                'shards': [],
+                'tmp_prefix':
+                join(self.tmp_dir, 'shard-{}-'.format(len(self.splits))),
+                'img':
+                None,
+                'labels':
+                None,
+                'targets': []
+            }
+        buf = self.splits[split]
+
+        if buf['img'] is not None and not self._fits(buf, img, label):
+            self._flush(split)
+        if buf['img'] is None:
+            self._start_shard(split, img, label)
+        buf['img'].append(img)
+        if buf['labels'] is not None:
+            buf['labels'].append(label)
+        else:
+            buf['targets'].append(label)
+        if buf['img'].num_rows == self.shard_sz:
+            self._flush(split)
+
+    def _fits(self, buf, img, label):
+        """Return True if a chip can be added to the current shard."""
+        if not buf['img'].fits(img):
+            return False
+        if buf['labels'] is not None:
+            return buf['labels'].fits(label)
+        return not isinstance(label, np.ndarray)
+
+    def _start_shard(self, split, img, label):
+        buf = self.splits[split]
+        buf['img'] = _ShardArrayFile(buf['tmp_prefix'] + 'img.npy', img,
+                                     self.shard_sz)
+        if isinstance(label, np.ndarray):
+            buf['labels'] = _ShardArrayFile(buf['tmp_prefix'] + 'labels.npy',
+                                            label, self.shard_sz)
+
+    def _copy_array_file(self, array_file, path):
+        array_file.close()
+        with open(array_file.path, 'rb') as src, self.open_file(path) as dst:
+            shutil.copyfileobj(src, dst, COPY_BUF_SZ)
+        os.remove(array_file.path)
+
+    def _flush(self, split):
+        buf = self.splits[split]
+        shard_ind = len(buf['shards'])
+        shard = {
+            'size': buf['img'].num_rows,
+            'img': '{:05d}-img.npy'.format(shard_ind),
+            'labels': None,
+            'targets': None
+        }
+        self._copy_array_file(buf['img'], join(split, SHARD_DIR, shard['img']))
+        if buf['labels'] is not None:
+            shard['labels'] = '{:05d}-labels.npy'.format(shard_ind)
+            self._copy_array_file(buf['labels'],
+                                  join(split, SHARD_DIR, shard['labels']))
+        else:
+            shard['targets'] = buf['targets']
+        buf['shards'].append(shard)
+        buf['img'], buf['labels'], buf['targets'] = None, None, []
+
+    def close(self):
+        """Write the remaining chips and the index of each split."""
+        for split, buf in self.splits.items():
+            if buf['img'] is not None:
+                self._flush(split)
+            index = {'version': SHARD_FORMAT_VERSION, 'shards': buf['shards']}
+            with self.open_file(join(split, SHARD_DIR, SHARD_INDEX_FN)) as f:
+                f.write(json.dumps(index).encode())
+
+
+class ChipShardDataset(Dataset):
+    """A Dataset of chips stored in shards by ChipShardWriter.
+
+    Shards are memory-mapped when they are first used, so reading a chip is a
+    copy out of the page cache rather than decoding an image file. This works
+    for shards in a zip file too, as long as they were stored without
+    compression. Each item is a tuple (img, label) where img is an array of
+    shape (height, width, channels) and label is an array or the JSON object
+    that was written.
+    """
+
+    def __init__(self, shard_dir, zip_reader=None):
+        """Constructor.
+
+        Args:
+            shard_dir: (str) directory with the index and shards of a split,
+                ie. {split}/shards
+            zip_reader: (ZipReader) if set, shard_dir is a directory in this
+                zip file rather than a local directory
+        """
+        self.shard_dir = shard_dir
+        self.zip_reader = zip_reader
+        if zip_reader is None:
+            with open(join(shard_dir, SHARD_INDEX_FN)) as f:
+                self.shards = json.load(f)['shards']
+        else:
+            index = zip_reader.read(join(shard_dir, SHARD_INDEX_FN))
+            self.shards = json.loads(index.decode())['shards']
+
+        sizes = [shard['size'] for shard in self.shards]
+        starts = np.cumsum([0] + sizes[:-1], dtype=np.int64)
+        self.shard_inds = np.repeat(np.arange(len(sizes)), sizes)
+        self.shard_offsets = np.arange(sum(sizes), dtype=np.int64)
+        self.shard_offsets -= np.repeat(starts, sizes)
+        self._arrays = {}
+
+    def _load_zip_array(self, path):
+        info = self.zip_reader.infos[path]
+        with self.zip_reader.open_member(path) as f:
+            if info.compress_type != zipfile.ZIP_STORED:
+                return np.load(f)
+            if np.lib.format.read_magic(f) == (1, 0):
+                read_header = np.lib.format.read_array_header_1_0
+            else:
+                read_header = np.lib.format.read_array_header_2_0
+            shape, fortran_order, dtype = read_header(f)
+            header_len = f.tell()
+        return np.memmap(
+            self.zip_reader.zip_path,
+            dtype=dtype,
+            mode='r',
+            offset=self.zip_reader.get_data_offset(path) + header_len,
+            shape=shape,
+            order='F' if fortran_order else 'C')
+
+    def _get_array(self, fn):
+        arr = self._arrays.get(fn)
+        if arr is None:
+            path = join(self.shard_dir, fn)
+            if self.zip_reader is None:
+                arr = np.load(path, mmap_mode='r')
+            else:
+                arr = self._load_zip_array(path)
+            self._arrays[fn] = arr
+        return arr
+
+    def __getitem__(self, ind):
+        if ind < 0:
+            ind += len(self)
+        shard = self.shards[self.shard_inds[ind]]
+        offset = self.shard_offsets[ind]
+        img = np.array(self._get_array(shard['img'])[offset])
+        if shard['labels'] is not None:
+            label = np.array(self._get_array(shard['labels'])[offset])
+        else:
+            label = shard['targets'][offset]
+        return img, label
+
+    def __len__(self):
+        return len(self.shard_inds)
+
+    def __getstate__(self):
+        # Memory maps would be pickled as copies of the arrays, so each
+        # process opens its own.
+        state = dict(self.__dict__)
+        state['_arrays'] = {}
+        return state
@@ -12,7 +12,10 @@ from torch.utils.data import ConcatDataset
 from rastervision.pytorch_learner.learner import Learner
 from rastervision.pytorch_learner.utils import (
     compute_conf_mat_metrics, compute_conf_mat, AlbumentationsDataset)
-from rastervision.pytorch_learner.image_folder import (ImageFolder)
+from rastervision.pytorch_learner.image_folder import (ImageFolder,
+                                                       ZipImageFolder)
+from rastervision.pytorch_learner.chip_shards import (ChipShardDataset,
+                                                      SHARD_DIR)
 from rastervision.pytorch_learner.classification_learner_config import (
     ClassificationDataFormat)
 
@@ -33,37 +36,41 @@ class ClassificationLearner(Learner):
         cfg = self.cfg
         class_names = cfg.data.class_names
 
-        if cfg.data.data_format == ClassificationDataFormat.image_folder:
-            data_dirs = self.unzip_data(uri)
-
+        data_dirs = self.get_data_dirs(uri)
         transform, aug_transform = self.get_data_transforms()
 
+        def make_dataset(split_dir, transform, zip_reader):
+            if cfg.data.data_format == ClassificationDataFormat.shards:
+                ds = ChipShardDataset(
+                    join(split_dir, SHARD_DIR), zip_reader=zip_reader)
+                return AlbumentationsDataset(ds, transform=transform)
+            if zip_reader is not None:
+                ds = ZipImageFolder(zip_reader, split_dir, classes=class_names)
+            else:
+                ds = ImageFolder(split_dir, classes=class_names)
+            return AlbumentationsDataset(
+                ds, transform=transform, sample_cache=self.make_sample_cache())
+
         train_ds, valid_ds, test_ds = [], [], []
-        for data_dir in data_dirs:
+        for data_dir, zip_reader in data_dirs:
             train_dir = join(data_dir, 'train')
             valid_dir = join(data_dir, 'valid')
+            dir_exists = isdir if zip_reader is None else zip_reader.isdir
 
-            if isdir(train_dir):
+            if dir_exists(train_dir):
                 if cfg.overfit_mode:
                     train_ds.append(
-                        AlbumentationsDataset(
-                            ImageFolder(train_dir, classes=class_names),
-                            transform=transform))
+                        make_dataset(train_dir, transform, zip_reader))
                 else:
                     train_ds.append(
-                        AlbumentationsDataset(
-                            ImageFolder(train_dir, classes=class_names),
-                            transform=aug_transform))
-
-            if isdir(valid_dir):
-                valid_ds.append(
-                    AlbumentationsDataset(
-                        ImageFolder(valid_dir, classes=class_names),
-                        transform=transform))
-                test_ds.append(
-                    AlbumentationsDataset(
-                        ImageFolder(valid_dir, classes=class_names),
-                        transform=transform))
+                        make_dataset(train_dir, aug_transform, zip_reader))
+
+            if dir_exists(valid_dir):
+                # The validation set is also used as the test set, so they share
+                # a dataset, and its samples are only cached once.
+                ds = make_dataset(valid_dir, transform, zip_reader)
+                valid_ds.append(ds)
+                test_ds.append(ds)
 
         train_ds, valid_ds, test_ds = \
             ConcatDataset(train_ds), ConcatDataset(valid_ds), ConcatDataset(test_ds)
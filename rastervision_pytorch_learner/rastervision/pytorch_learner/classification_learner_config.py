@@ -7,6 +7,7 @@ from rastervision.pytorch_learner.learner_config import (
 
 class ClassificationDataFormat(Enum):
     image_folder = 'image_folder'
+    shards = 'shards'
 
 
 @register_config('classification_data')
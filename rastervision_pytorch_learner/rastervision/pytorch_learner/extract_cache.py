@@ -0,0 +1,196 @@
+import os
+from os.path import join, isdir, isfile
+import fcntl
+import hashlib
+import json
+import shutil
+import time
+import uuid
+import zipfile
+import logging
+
+log = logging.getLogger(__name__)
+
+EXTRACT_CACHE_DIR = 'extracted'
+ENTRY_META_FN = 'meta.json'
+ENTRY_DATA_DIR = 'data'
+TMP_PREFIX = '.tmp-'
+LOCK_PREFIX = '.lock-'
+# Temporary directories older than this were left by jobs that crashed.
+STALE_TMP_SECS = 24 * 60 * 60
+
+
+class ExtractCache():
+    """A persistent cache of the extracted contents of zip files.
+
+    Each zip file is extracted once into its own entry in cache_dir, which is
+    keyed by its URI and the size and modification time of the local copy,
+    and then reused by later runs. An entry is extracted into a temporary
+    directory which is renamed into place when it is complete, so concurrent
+    jobs never see a partial entry; if two jobs extract the same zip, the
+    first rename wins and the other copy is discarded.
+
+    Each entry returned by get() is protected by a shared lock (flock) on a
+    lock file for the entry, which is held until close() is called or this
+    object is garbage collected. When adding an entry would make the cache
+    larger than max_sz bytes, the least recently used entries are evicted,
+    except for those that are locked by any job, including this one.
+    """
+
+    def __init__(self, cache_dir, max_sz):
+        """Constructor.
+
+        Args:
+            cache_dir: (str) local directory to keep the cache in
+            max_sz: (int) maximum total size of the extracted files in bytes
+        """
+        self.cache_dir = cache_dir
+        self.max_sz = max_sz
+        # Open lock files of the entries returned by get(), by key.
+        self.locks = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get_key(self, zip_uri, zip_path):
+        stat = os.stat(zip_path)
+        key = '{}:{}:{}'.format(zip_uri, stat.st_size, stat.st_mtime_ns)
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _get_entries(self):
+        """Return a list of (last used time, size, key) of cache entries."""
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            meta_path = join(self.cache_dir, key, ENTRY_META_FN)
+            if key.startswith(TMP_PREFIX) or not isfile(meta_path):
+                continue
+            with open(meta_path) as f:
+                sz = json.load(f)['size']
+            entries.append((os.stat(meta_path).st_mtime, sz, key))
+        return entries
+
+    def _lock(self, key, exclusive=False):
+        """Lock the lock file of an entry.
+
+        Args:
+            key: (str) key of the entry
+            exclusive: (bool) if True, take an exclusive lock without waiting
+                for it, and otherwise wait for a shared lock
+
+        Returns:
+            the open lock file, or None if exclusive is True and the entry is
+            locked by another job or ExtractCache
+        """
+        lock_path = join(self.cache_dir, LOCK_PREFIX + key)
+        while True:
+            lock_file = open(lock_path, 'a')
+            try:
+                if exclusive:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    fcntl.flock(lock_file, fcntl.LOCK_SH)
+            except BlockingIOError:
+                lock_file.close()
+                return None
+            # The lock file is deleted when its entry is evicted, so the lock
+            # is only valid if the file wasn't deleted while it was locked.
+            try:
+                if os.stat(lock_path).st_ino == os.fstat(
+                        lock_file.fileno()).st_ino:
+                    return lock_file
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+    def _remove(self, key):
+        """Remove an entry unless it is locked.
+
+        Returns:
+            True if the entry was removed
+        """
+        lock_file = self._lock(key, exclusive=True)
+        if lock_file is None:
+            return False
+        with lock_file:
+            # Renaming first means other jobs never see a partly removed
+            # entry.
+            tmp_dir = join(self.cache_dir, TMP_PREFIX + str(uuid.uuid4()))
+            try:
+                os.rename(join(self.cache_dir, key), tmp_dir)
+            except OSError:
+                return False
+            os.remove(join(self.cache_dir, LOCK_PREFIX + key))
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return True
+
+    def _remove_stale_tmp_dirs(self):
+        now = time.time()
+        for fn in os.listdir(self.cache_dir):
+            path = join(self.cache_dir, fn)
+            if fn.startswith(TMP_PREFIX):
+                if now - os.stat(path).st_mtime > STALE_TMP_SECS:
+                    shutil.rmtree(path, ignore_errors=True)
+
+    def _evict(self, sz):
+        """Evict least recently used entries until sz more bytes fit."""
+        self._remove_stale_tmp_dirs()
+        entries = sorted(self._get_entries())
+        total_sz = sum(entry_sz for _, entry_sz, _ in entries)
+        for _, entry_sz, key in entries:
+            if total_sz + sz <= self.max_sz:
+                break
+            if key in self.locks or not self._remove(key):
+                continue
+            log.info('Evicted {} from extracted data cache.'.format(key))
+            total_sz -= entry_sz
+
+    def get(self, zip_uri, zip_path):
+        """Return a directory with the contents of a zip file.
+
+        Args:
+            zip_uri: (str) URI the zip file was downloaded from
+            zip_path: (str) local path of the zip file
+
+        Returns:
+            path to a directory in the cache, or None if the contents of the
+            zip file are larger than max_sz
+        """
+        key = self.get_key(zip_uri, zip_path)
+        entry_dir = join(self.cache_dir, key)
+        meta_path = join(entry_dir, ENTRY_META_FN)
+        if key not in self.locks:
+            self.locks[key] = self._lock(key)
+        if isfile(meta_path):
+            os.utime(meta_path)
+            return join(entry_dir, ENTRY_DATA_DIR)
+
+        with zipfile.ZipFile(zip_path, 'r') as zipf:
+            sz = sum(info.file_size for info in zipf.infolist())
+            if sz > self.max_sz:
+                self.locks.pop(key).close()
+                return None
+            self._evict(sz)
+
+            log.info(
+                'Extracting {} into extracted data cache.'.format(zip_uri))
+            tmp_dir = join(self.cache_dir, TMP_PREFIX + str(uuid.uuid4()))
+            try:
+                zipf.extractall(join(tmp_dir, ENTRY_DATA_DIR))
+                with open(join(tmp_dir, ENTRY_META_FN), 'w') as f:
+                    json.dump({'uri': zip_uri, 'size': sz}, f)
+                os.rename(tmp_dir, entry_dir)
+            except OSError:
+                # Another job added the same entry first.
+                if not isdir(entry_dir):
+                    raise
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        return join(entry_dir, ENTRY_DATA_DIR)
+
+    def close(self):
+        """Release the locks on the entries returned by get().
+
+        After this, the entries may be evicted by other jobs.
+        """
+        for lock_file in self.locks.values():
+            lock_file.close()
+        self.locks = {}
@@ -229,3 +229,69 @@ class ImageFolder(DatasetFolder):
             is_valid_file=is_valid_file,
             classes=classes)
         self.imgs = self.samples
+
+
+class ZipImageFolder(VisionDataset):
+    """Like ImageFolder, but reads the images from a directory in a zip file.
+
+    Args:
+        zip_reader (ZipReader): zip file to read images from
+        root (string): Root directory path in the zip file.
+        transform (callable, optional): A function/transform that  takes in an PIL image
+            and returns a transformed version. E.g, ``transforms.RandomCrop``
+        target_transform (callable, optional): A function/transform that takes in the
+            target and transforms it.
+        classes (list, optional): List of the class names. If not set, the names of
+            the subdirectories of root are used in sorted order.
+     Attributes:
+        classes (list): List of the class names.
+        class_to_idx (dict): Dict with items (class_name, class_index).
+        samples (list): List of (image path, class_index) tuples
+        targets (list): The class_index value for each image in the dataset
+    """
+
+    def __init__(self,
+                 zip_reader,
+                 root,
+                 transform=None,
+                 target_transform=None,
+                 classes=None):
+        super(ZipImageFolder, self).__init__(
+            root, transform=transform, target_transform=target_transform)
+        self.zip_reader = zip_reader
+        prefix = root.rstrip('/') + '/'
+        paths = zip_reader.list_paths(root)
+        if classes is None:
+            classes = sorted(
+                set(p[len(prefix):].split('/')[0] for p in paths
+                    if '/' in p[len(prefix):]))
+        class_to_idx = dict(zip(classes, range(len(classes))))
+
+        samples = []
+        for target in sorted(class_to_idx.keys()):
+            for path in zip_reader.list_paths(os.path.join(root, target)):
+                if is_image_file(path):
+                    samples.append((path, class_to_idx[target]))
+        if len(samples) == 0:
+            raise (RuntimeError(
+                'Found 0 files in subfolders of: ' + root + '\n'
+                'Supported extensions are: ' + ','.join(IMG_EXTENSIONS)))
+
+        self.classes = classes
+        self.class_to_idx = class_to_idx
+        self.samples = samples
+        self.targets = [s[1] for s in samples]
+        self.imgs = self.samples
+
+    def __getitem__(self, index):
+        path, target = self.samples[index]
+        sample = Image.open(self.zip_reader.open(path)).convert('RGB')
+        if self.transform is not None:
+            sample = self.transform(sample)
+        if self.target_transform is not None:
+            target = self.target_transform(target)
+
+        return sample, target
+
+    def __len__(self):
+        return len(self.samples)
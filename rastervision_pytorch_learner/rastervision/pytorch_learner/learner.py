@@ -15,6 +15,7 @@ import zipfile
 from typing import Optional, List, Tuple, Dict, Union
 import random
 import uuid
+import tempfile
 
 import click
 import matplotlib
@@ -43,6 +44,11 @@ from rastervision.pipeline.utils import terminate_at_exit
 from rastervision.pipeline.config import (build_config, ConfigError,
                                           upgrade_config, save_pipeline_config)
 from rastervision.pytorch_learner.learner_config import LearnerConfig
+from rastervision.pytorch_learner.extract_cache import (ExtractCache,
+                                                        EXTRACT_CACHE_DIR)
+from rastervision.pytorch_learner.zip_reader import ZipReader
+from rastervision.pytorch_learner.sample_cache import SampleCache
+from rastervision.pytorch_learner.utils import normalize_chip
 
 log = logging.getLogger(__name__)
 
@@ -83,6 +89,10 @@ class Learner(ABC):
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
         self.data_cache_dir = '/opt/data/data-cache'
         make_dir(self.data_cache_dir)
+        self.sample_cache_dir_obj = None
+        # Holds locks on the extracted data in use by this learner, so that
+        # other jobs don't evict it.
+        self.extract_cache = None
 
         self.model = self.build_model()
         self.model.to(self.device)
@@ -196,28 +206,53 @@ class Learner(ABC):
         """Build a PyTorch model."""
         pass
 
-    def unzip_data(self, uri: Union[str, List[str]]) -> List[str]:
-        """Unzip dataset zip files.
+    def download_data(self,
+                      uri: Union[str, List[str]]) -> List[Tuple[str, str]]:
+        """Download dataset zip files into the data cache dir.
 
         Args:
             uri: a list of URIs of zip files or the URI of a directory containing
                 zip files
 
         Returns:
-            paths to directories that each contain contents of one zip file
+            list of (URI, local path) of each zip file
         """
-        data_dirs = []
-
         if isinstance(uri, list):
             zip_uris = uri
         else:
             zip_uris = ([uri]
                         if uri.endswith('.zip') else list_paths(uri, 'zip'))
 
-        for zip_ind, zip_uri in enumerate(zip_uris):
+        zip_paths = []
+        for zip_uri in zip_uris:
             zip_path = get_local_path(zip_uri, self.data_cache_dir)
             if not isfile(zip_path):
                 zip_path = download_if_needed(zip_uri, self.data_cache_dir)
+            zip_paths.append((zip_uri, zip_path))
+        return zip_paths
+
+    def unzip_data(self, uri: Union[str, List[str]]) -> List[str]:
+        """Unzip dataset zip files.
+
+        Args:
+            uri: a list of URIs of zip files or the URI of a directory containing
+                zip files
+
+        Returns:
+            paths to directories that each contain contents of one zip file
+        """
+        data_dirs = []
+        if (self.cfg.data.extract_cache_gb > 0 and self.extract_cache is None):
+            self.extract_cache = ExtractCache(
+                join(self.data_cache_dir, EXTRACT_CACHE_DIR),
+                int(self.cfg.data.extract_cache_gb * 1e9))
+
+        for zip_ind, (zip_uri, zip_path) in enumerate(self.download_data(uri)):
+            if self.extract_cache is not None:
+                data_dir = self.extract_cache.get(zip_uri, zip_path)
+                if data_dir is not None:
+                    data_dirs.append(data_dir)
+                    continue
             with zipfile.ZipFile(zip_path, 'r') as zipf:
                 data_dir = join(self.tmp_dir, 'data', str(uuid.uuid4()),
                                 str(zip_ind))
@@ -226,6 +261,43 @@ class Learner(ABC):
 
         return data_dirs
 
+    def get_data_dirs(self, uri: Union[str, List[str]]
+                      ) -> List[Tuple[str, Optional[ZipReader]]]:  # noqa
+        """Get the directories that contain the contents of dataset zip files.
+
+        If cfg.data.read_zips is set, the zip files are read directly instead of
+        being unzipped.
+
+        Args:
+            uri: a list of URIs of zip files or the URI of a directory containing
+                zip files
+
+        Returns:
+            list of (data_dir, zip_reader) for each zip file, where zip_reader is
+            None if data_dir is a local directory, and otherwise is the ZipReader
+            that data_dir is a directory in
+        """
+        if self.cfg.data.read_zips:
+            return [('', ZipReader(zip_path))
+                    for _, zip_path in self.download_data(uri)]
+        return [(data_dir, None) for data_dir in self.unzip_data(uri)]
+
+    def make_sample_cache(self) -> Optional[SampleCache]:
+        """Return a new SampleCache for a dataset if cfg.data.cache_samples is set.
+
+        The caches are in a temp dir in cfg.data.sample_cache_dir (or tmp_dir)
+        which is deleted with this Learner.
+        """
+        if not self.cfg.data.cache_samples:
+            return None
+        if self.sample_cache_dir_obj is None:
+            root_dir = self.cfg.data.sample_cache_dir or self.tmp_dir
+            make_dir(root_dir)
+            self.sample_cache_dir_obj = tempfile.TemporaryDirectory(
+                prefix='sample-cache-', dir=root_dir)
+        return SampleCache(
+            join(self.sample_cache_dir_obj.name, str(uuid.uuid4())))
+
     def get_bbox_params(self) -> Optional[BboxParams]:
         """Returns BboxParams used by albumentations for data augmentation."""
         return None
@@ -549,9 +621,9 @@ class Learner(ABC):
             x = self.normalize_input(x)
         x = self.to_device(x, self.device)
         with torch.no_grad():
-            out = self.model(x)
+            out = self.post_forward(self.model(x))
             if not raw_out:
-                out = self.prob_to_pred(self.post_forward(out))
+                out = self.prob_to_pred(out)
         out = self.to_device(out, 'cpu')
         return out
 
@@ -570,16 +642,17 @@ class Learner(ABC):
 
         Args:
             x: (ndarray) of shape [height, width, channels] or
-                [batch_sz, height, width, channels] in uint8 format
+                [batch_sz, height, width, channels], which is scaled by
+                normalize_chip like the chips used for training
             raw_out: if True, return prediction probabilities
 
         Returns:
             predictions using numpy arrays
         """
-        x = torch.tensor(x)
+        x = torch.tensor(normalize_chip(x))
         x = self.to_batch(x)
         x = x.permute((0, 3, 1, 2))
-        out = self.predict(x, normalize=True, raw_out=raw_out)
+        out = self.predict(x, raw_out=raw_out)
         return self.output_to_numpy(out)
 
     def predict_dataloader(self,
@@ -195,6 +195,35 @@ class DataConfig(Config):
     num_workers: int = Field(
         4,
         description='Number of workers to use when DataLoader makes batches.')
+    read_zips: bool = Field(
+        False,
+        description=
+        ('If True, chips are read directly from the zip files instead of being '
+         'extracted first. This avoids the time and disk space used by extracting, '
+         'and works best with zip files that are stored without compression, as '
+         'written by the PyTorch backends. This is supported by the classification, '
+         'semantic segmentation and object detection learners.'))
+    cache_samples: bool = Field(
+        False,
+        description=
+        ('If True, decoded images (and label arrays) are cached in memory-mapped '
+         'files the first time they are read, so that later epochs skip decoding. '
+         'Augmentation is still applied to each sample after it is read from the '
+         'cache. The cache takes as much space as the decoded chips.'))
+    sample_cache_dir: Optional[str] = Field(
+        None,
+        description=
+        ('Local directory to put the sample cache in, if cache_samples is True. '
+         'Defaults to the tmp dir. Set this to /dev/shm to keep the cache in shared '
+         'memory.'))
+    extract_cache_gb: float = Field(
+        0.0,
+        description=
+        ('If > 0, zip files of chips are extracted into a cache in the data cache '
+         'dir which is reused by later runs on the same zip files, instead of being '
+         'extracted into the tmp dir on every run. This is the disk budget of the '
+         'cache in GB; the least recently used zip files are evicted to stay within '
+         'it.'))
     # TODO support setting parameters of augmentors?
     augmentors: List[str] = Field(
         default_augmentors,
@@ -211,6 +240,8 @@ class DataConfig(Config):
 
     def validate_config(self):
         self.validate_augmentors()
+        if self.extract_cache_gb < 0:
+            raise ConfigError('extract_cache_gb must be >= 0.')
 
 
 @register_config('learner')
@@ -10,7 +10,9 @@ from albumentations import BboxParams
 
 from rastervision.pytorch_learner.learner import Learner
 from rastervision.pytorch_learner.object_detection_utils import (
-    MyFasterRCNN, CocoDataset, compute_coco_eval, collate_fn, plot_xyz)
+    MyFasterRCNN, CocoDataset, CocoShardDataset, compute_coco_eval, collate_fn,
+    plot_xyz)
+from rastervision.pytorch_learner.chip_shards import SHARD_DIR
 from rastervision.pytorch_learner.object_detection_learner_config import (
     ObjectDetectionDataFormat)
 
@@ -43,35 +45,44 @@ class ObjectDetectionLearner(Learner):
     def _get_datasets(self, uri):
         cfg = self.cfg
 
-        if cfg.data.data_format == ObjectDetectionDataFormat.coco:
-            data_dirs = self.unzip_data(uri)
-
+        data_dirs = self.get_data_dirs(uri)
         transform, aug_transform = self.get_data_transforms()
 
+        def make_dataset(split_dir, transform, zip_reader):
+            if cfg.data.data_format == ObjectDetectionDataFormat.shards:
+                return CocoShardDataset(
+                    join(split_dir, SHARD_DIR),
+                    transform=transform,
+                    zip_reader=zip_reader)
+            img_dir = join(split_dir, 'img')
+            annotation_uri = join(split_dir, 'labels.json')
+            return CocoDataset(
+                img_dir,
+                annotation_uri,
+                transform=transform,
+                zip_reader=zip_reader,
+                sample_cache=self.make_sample_cache())
+
         train_ds, valid_ds, test_ds = [], [], []
-        for data_dir in data_dirs:
+        for data_dir, zip_reader in data_dirs:
             train_dir = join(data_dir, 'train')
             valid_dir = join(data_dir, 'valid')
+            dir_exists = isdir if zip_reader is None else zip_reader.isdir
 
-            if isdir(train_dir):
-                img_dir = join(train_dir, 'img')
-                annotation_uri = join(train_dir, 'labels.json')
+            if dir_exists(train_dir):
                 if cfg.overfit_mode:
                     train_ds.append(
-                        CocoDataset(
-                            img_dir, annotation_uri, transform=transform))
+                        make_dataset(train_dir, transform, zip_reader))
                 else:
                     train_ds.append(
-                        CocoDataset(
-                            img_dir, annotation_uri, transform=aug_transform))
-
-            if isdir(valid_dir):
-                img_dir = join(valid_dir, 'img')
-                annotation_uri = join(valid_dir, 'labels.json')
-                valid_ds.append(
-                    CocoDataset(img_dir, annotation_uri, transform=transform))
-                test_ds.append(
-                    CocoDataset(img_dir, annotation_uri, transform=transform))
+                        make_dataset(train_dir, aug_transform, zip_reader))
+
+            if dir_exists(valid_dir):
+                # The validation set is also used as the test set, so they share
+                # a dataset, and its samples are only cached once.
+                ds = make_dataset(valid_dir, transform, zip_reader)
+                valid_ds.append(ds)
+                test_ds.append(ds)
 
         train_ds, valid_ds, test_ds = \
             ConcatDataset(train_ds), ConcatDataset(valid_ds), ConcatDataset(test_ds)
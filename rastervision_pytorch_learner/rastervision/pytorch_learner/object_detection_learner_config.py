@@ -7,6 +7,7 @@ from rastervision.pytorch_learner.learner_config import (
 
 class ObjectDetectionDataFormat(Enum):
     coco = 'coco'
+    shards = 'shards'
 
 
 @register_config('object_detection_data')
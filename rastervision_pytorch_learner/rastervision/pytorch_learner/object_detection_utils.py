@@ -1,5 +1,6 @@
 from collections import defaultdict
 from os.path import join
+import json
 import tempfile
 
 import torch
@@ -18,6 +19,8 @@ from PIL import Image
 import matplotlib.patches as patches
 
 from rastervision.pipeline.file_system import file_to_json, json_to_file
+from rastervision.pytorch_learner.chip_shards import ChipShardDataset
+from rastervision.pytorch_learner.utils import normalize_chip
 
 
 def get_coco_gt(targets, num_class_ids):
@@ -260,44 +263,37 @@ def collate_fn(data):
     return (torch.cat(x), y)
 
 
-class CocoDataset(Dataset):
-    def __init__(self, img_dir, annotation_uri, transform=None):
-        self.img_dir = img_dir
-        self.annotation_uri = annotation_uri
+class CocoSampleDataset(Dataset):
+    """Base class of datasets of images and COCO format annotations.
+
+    Subclasses implement load_sample and __len__.
+    """
+
+    def __init__(self, transform=None):
+        """Constructor.
+
+        Args:
+            transform: albumentations transform
+        """
         self.transform = transform
 
-        self.img_ids = []
-        self.id2ann = {}
-        ann_json = file_to_json(annotation_uri)
+    def load_sample(self, ind):
+        """Return the image array and annotation of a sample.
 
-        for img in ann_json['images']:
-            img_id = img['id']
-            self.img_ids.append(img_id)
-            self.id2ann[img_id] = {
-                'image': img['file_name'],
-                'bboxes': [],
-                'category_id': []
-            }
-        for ann in ann_json['annotations']:
-            img_id = ann['image_id']
-            bboxes = self.id2ann[img_id]['bboxes']
-            category_ids = self.id2ann[img_id]['category_id']
-            bboxes.append(ann['bbox'])
-            category_ids.append(ann['category_id'])
+        The annotation is a dict with the bboxes (in COCO format) and the
+        category_id of each box.
+        """
+        raise NotImplementedError()
 
     def __getitem__(self, ind):
-        img_id = self.img_ids[ind]
-        ann = dict(self.id2ann[img_id])
-
-        img_fn = ann['image']
-        img = Image.open(join(self.img_dir, img_fn))
+        img, ann = self.load_sample(ind)
 
         if self.transform:
-            ann['image'] = np.array(img)
+            ann['image'] = img
             out = self.transform(**ann)
 
             x = out['image']
-            x = torch.tensor(x).permute(2, 0, 1).float() / 255.0
+            x = torch.tensor(normalize_chip(x)).permute(2, 0, 1)
 
             b = torch.tensor(out['bboxes'])
             if b.shape[0] == 0:
@@ -318,10 +314,105 @@ class CocoDataset(Dataset):
 
         return (x, y)
 
+    def __len__(self):
+        raise NotImplementedError()
+
+
+class CocoDataset(CocoSampleDataset):
+    def __init__(self,
+                 img_dir,
+                 annotation_uri,
+                 transform=None,
+                 zip_reader=None,
+                 sample_cache=None):
+        """Constructor.
+
+        Args:
+            img_dir: (str) directory with the images
+            annotation_uri: (str) URI of the COCO format annotations
+            transform: albumentations transform
+            zip_reader: (ZipReader) if set, img_dir and annotation_uri are paths
+                in this zip file
+            sample_cache: (SampleCache) if set, decoded images are cached in
+                this
+        """
+        super().__init__(transform=transform)
+        self.img_dir = img_dir
+        self.annotation_uri = annotation_uri
+        self.zip_reader = zip_reader
+
+        self.img_ids = []
+        self.id2ann = {}
+        if zip_reader is None:
+            ann_json = file_to_json(annotation_uri)
+        else:
+            ann_json = json.loads(zip_reader.read(annotation_uri).decode())
+
+        for img in ann_json['images']:
+            img_id = img['id']
+            self.img_ids.append(img_id)
+            self.id2ann[img_id] = {
+                'image': img['file_name'],
+                'bboxes': [],
+                'category_id': []
+            }
+        for ann in ann_json['annotations']:
+            img_id = ann['image_id']
+            bboxes = self.id2ann[img_id]['bboxes']
+            category_ids = self.id2ann[img_id]['category_id']
+            bboxes.append(ann['bbox'])
+            category_ids.append(ann['category_id'])
+
+        self.sample_cache = sample_cache
+        if sample_cache is not None:
+            sample_cache.setup(len(self), self._load_img)
+
+    def _load_img(self, ind):
+        img_path = join(self.img_dir, self.id2ann[self.img_ids[ind]]['image'])
+        if self.zip_reader is not None:
+            img_path = self.zip_reader.open(img_path)
+        return (np.array(Image.open(img_path)), )
+
+    def load_sample(self, ind):
+        if self.sample_cache is None:
+            img, = self._load_img(ind)
+        else:
+            img, = self.sample_cache.get(ind, self._load_img)
+        ann = dict(self.id2ann[self.img_ids[ind]])
+        del ann['image']
+        return img, ann
+
     def __len__(self):
         return len(self.id2ann)
 
 
+class CocoShardDataset(CocoSampleDataset):
+    """Reads samples from shards written by ChipShardWriter.
+
+    The target of each sample in the shards is its annotation, as returned by
+    CocoSampleDataset.load_sample.
+    """
+
+    def __init__(self, shard_dir, transform=None, zip_reader=None):
+        """Constructor.
+
+        Args:
+            shard_dir: (str) directory with the index and shards of a split
+            transform: albumentations transform
+            zip_reader: (ZipReader) if set, shard_dir is a directory in this
+                zip file rather than a local directory
+        """
+        super().__init__(transform=transform)
+        self.shards = ChipShardDataset(shard_dir, zip_reader=zip_reader)
+
+    def load_sample(self, ind):
+        img, ann = self.shards[ind]
+        return img, dict(ann)
+
+    def __len__(self):
+        return len(self.shards)
+
+
 def get_out_channels(model):
     out = {}
 
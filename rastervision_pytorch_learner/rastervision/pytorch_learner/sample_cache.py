@@ -0,0 +1,110 @@
+import os
+from os.path import join
+
+import numpy as np
+
+
+class SampleCache():
+    """A cache of decoded samples in memory-mapped files.
+
+    The arrays that make up each sample (eg. an image and a label array) are
+    stored in .npy files in cache_dir with one row per sample, along with a
+    flag for each sample saying if it has been filled. Samples are filled on
+    first use, so the first epoch decodes each sample and later epochs read the
+    arrays back. Since the files are memory-mapped, all DataLoader workers share
+    the cache through the page cache, and if cache_dir is in /dev/shm the cache
+    is in shared memory.
+
+    The shapes and dtypes of the arrays are taken from the first sample, which
+    is loaded by setup(); samples that don't match are not cached.
+    """
+
+    def __init__(self, cache_dir):
+        """Constructor.
+
+        Args:
+            cache_dir: (str) local directory to store the cache in
+        """
+        self.cache_dir = cache_dir
+        self.specs = None
+        self._filled = None
+        self._arrays = None
+
+    def setup(self, num_samples, load_fn):
+        """Create the cache files.
+
+        This should be called before the cache is used by DataLoader workers,
+        so that they all share the same files.
+
+        Args:
+            num_samples: (int) number of samples in the dataset
+            load_fn: function that takes the index of a sample and returns a
+                tuple of arrays
+        """
+        if num_samples == 0:
+            return
+        sample = load_fn(0)
+        self.specs = [(arr.shape, arr.dtype.str) for arr in sample]
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._filled = np.lib.format.open_memmap(
+            join(self.cache_dir, 'filled.npy'),
+            mode='w+',
+            dtype=bool,
+            shape=(num_samples, ))
+        self._arrays = []
+        for arr_ind, (shape, dtype) in enumerate(self.specs):
+            self._arrays.append(
+                np.lib.format.open_memmap(
+                    join(self.cache_dir, '{}.npy'.format(arr_ind)),
+                    mode='w+',
+                    dtype=np.dtype(dtype),
+                    shape=(num_samples, ) + shape))
+        self._put(0, sample)
+
+    def _open(self):
+        self._filled = np.load(
+            join(self.cache_dir, 'filled.npy'), mmap_mode='r+')
+        self._arrays = [
+            np.load(
+                join(self.cache_dir, '{}.npy'.format(arr_ind)), mmap_mode='r+')
+            for arr_ind in range(len(self.specs))
+        ]
+
+    def _put(self, ind, sample):
+        for arr, (shape, dtype) in zip(sample, self.specs):
+            if arr.shape != shape or arr.dtype.str != dtype:
+                return
+        for cache_arr, arr in zip(self._arrays, sample):
+            cache_arr[ind] = arr
+        # Set the flag last so that other workers never read a partly
+        # written sample.
+        self._filled[ind] = True
+
+    def get(self, ind, load_fn):
+        """Return a sample, loading it with load_fn if it isn't cached.
+
+        Args:
+            ind: (int) index of the sample
+            load_fn: function that takes the index of a sample and returns a
+                tuple of arrays
+
+        Returns:
+            tuple of arrays, which are copies that can be modified
+        """
+        if self.specs is None:
+            return load_fn(ind)
+        if self._arrays is None:
+            self._open()
+        if self._filled[ind]:
+            return tuple(np.array(arr[ind]) for arr in self._arrays)
+        sample = load_fn(ind)
+        self._put(ind, sample)
+        return sample
+
+    def __getstate__(self):
+        # Each process opens its own memory maps of the same files.
+        state = dict(self.__dict__)
+        state['_filled'] = None
+        state['_arrays'] = None
+        return state
@@ -14,40 +14,120 @@ from torchvision import models
 from PIL import Image
 
 from rastervision.pytorch_learner.learner import Learner
+from rastervision.pytorch_learner.chip_shards import (ChipShardDataset,
+                                                      SHARD_DIR)
+from rastervision.pytorch_learner.semantic_segmentation_learner_config import (
+    SemanticSegmentationDataFormat)
 from rastervision.pytorch_learner.utils import (
-    compute_conf_mat_metrics, compute_conf_mat, color_to_triple)
+    compute_conf_mat_metrics, compute_conf_mat, color_to_triple,
+    normalize_chip)
 
 log = logging.getLogger(__name__)
 
 
-class SemanticSegmentationDataset(Dataset):
-    def __init__(self, data_dir, transform=None):
-        self.data_dir = data_dir
-        self.img_paths = glob.glob(join(data_dir, 'img', '*.png'))
+class SemanticSegmentationSampleDataset(Dataset):
+    """Base class of datasets of image and label arrays.
+
+    Subclasses implement load_sample and __len__.
+    """
+
+    def __init__(self, transform=None):
+        """Constructor.
+
+        Args:
+            transform: albumentations transform
+        """
         self.transform = transform
 
-    def __getitem__(self, ind):
-        img_path = self.img_paths[ind]
-        label_path = join(self.data_dir, 'labels', basename(img_path))
-        x = Image.open(img_path)
-        y = Image.open(label_path)
+    def load_sample(self, ind):
+        """Return the image and label arrays of a sample."""
+        raise NotImplementedError()
 
-        x = np.array(x)
-        y = np.array(y)
+    def __getitem__(self, ind):
+        x, y = self.load_sample(ind)
         if self.transform is not None:
             out = self.transform(image=x, mask=y)
             x = out['image']
             y = out['mask']
 
-        x = torch.tensor(x).permute(2, 0, 1).float() / 255.0
+        x = torch.tensor(normalize_chip(x)).permute(2, 0, 1)
         y = torch.tensor(y).long()
 
         return (x, y)
 
+    def __len__(self):
+        raise NotImplementedError()
+
+
+class SemanticSegmentationDataset(SemanticSegmentationSampleDataset):
+    def __init__(self,
+                 data_dir,
+                 transform=None,
+                 zip_reader=None,
+                 sample_cache=None):
+        """Constructor.
+
+        Args:
+            data_dir: (str) directory with img and labels subdirectories
+            transform: albumentations transform
+            zip_reader: (ZipReader) if set, data_dir is a directory in this zip
+                file rather than a local directory
+            sample_cache: (SampleCache) if set, decoded image and label arrays
+                are cached in this
+        """
+        super().__init__(transform=transform)
+        self.data_dir = data_dir
+        self.zip_reader = zip_reader
+        if zip_reader is None:
+            self.img_paths = glob.glob(join(data_dir, 'img', '*.png'))
+        else:
+            self.img_paths = zip_reader.list_paths(
+                join(data_dir, 'img'), '.png')
+        self.sample_cache = sample_cache
+        if sample_cache is not None:
+            sample_cache.setup(len(self), self._load_pngs)
+
+    def _load_pngs(self, ind):
+        img_path = self.img_paths[ind]
+        label_path = join(self.data_dir, 'labels', basename(img_path))
+        if self.zip_reader is not None:
+            img_path = self.zip_reader.open(img_path)
+            label_path = self.zip_reader.open(label_path)
+        x = Image.open(img_path)
+        y = Image.open(label_path)
+        return np.array(x), np.array(y)
+
+    def load_sample(self, ind):
+        if self.sample_cache is None:
+            return self._load_pngs(ind)
+        return self.sample_cache.get(ind, self._load_pngs)
+
     def __len__(self):
         return len(self.img_paths)
 
 
+class SemanticSegmentationShardDataset(SemanticSegmentationSampleDataset):
+    """Reads samples from shards written by ChipShardWriter."""
+
+    def __init__(self, shard_dir, transform=None, zip_reader=None):
+        """Constructor.
+
+        Args:
+            shard_dir: (str) directory with the index and shards of a split
+            transform: albumentations transform
+            zip_reader: (ZipReader) if set, shard_dir is a directory in this
+                zip file rather than a local directory
+        """
+        super().__init__(transform=transform)
+        self.shards = ChipShardDataset(shard_dir, zip_reader=zip_reader)
+
+    def load_sample(self, ind):
+        return self.shards[ind]
+
+    def __len__(self):
+        return len(self.shards)
+
+
 class SemanticSegmentationLearner(Learner):
     def build_model(self):
         # TODO support FCN option
@@ -63,31 +143,41 @@ class SemanticSegmentationLearner(Learner):
     def _get_datasets(self, uri):
         cfg = self.cfg
 
-        data_dirs = self.unzip_data(uri)
+        data_dirs = self.get_data_dirs(uri)
         transform, aug_transform = self.get_data_transforms()
 
+        def make_dataset(split_dir, transform, zip_reader):
+            if cfg.data.data_format == SemanticSegmentationDataFormat.shards:
+                return SemanticSegmentationShardDataset(
+                    join(split_dir, SHARD_DIR),
+                    transform=transform,
+                    zip_reader=zip_reader)
+            return SemanticSegmentationDataset(
+                split_dir,
+                transform=transform,
+                zip_reader=zip_reader,
+                sample_cache=self.make_sample_cache())
+
         train_ds, valid_ds, test_ds = [], [], []
-        for data_dir in data_dirs:
+        for data_dir, zip_reader in data_dirs:
             train_dir = join(data_dir, 'train')
             valid_dir = join(data_dir, 'valid')
+            dir_exists = isdir if zip_reader is None else zip_reader.isdir
 
-            if isdir(train_dir):
+            if dir_exists(train_dir):
                 if cfg.overfit_mode:
                     train_ds.append(
-                        SemanticSegmentationDataset(
-                            train_dir, transform=transform))
+                        make_dataset(train_dir, transform, zip_reader))
                 else:
                     train_ds.append(
-                        SemanticSegmentationDataset(
-                            train_dir, transform=aug_transform))
-
-            if isdir(valid_dir):
-                valid_ds.append(
-                    SemanticSegmentationDataset(
-                        valid_dir, transform=transform))
-                test_ds.append(
-                    SemanticSegmentationDataset(
-                        valid_dir, transform=transform))
+                        make_dataset(train_dir, aug_transform, zip_reader))
+
+            if dir_exists(valid_dir):
+                # The validation set is also used as the test set, so they share
+                # a dataset, and its samples are only cached once.
+                ds = make_dataset(valid_dir, transform, zip_reader)
+                valid_ds.append(ds)
+                test_ds.append(ds)
 
         train_ds, valid_ds, test_ds = \
             ConcatDataset(train_ds), ConcatDataset(valid_ds), ConcatDataset(test_ds)
@@ -8,6 +8,7 @@ from rastervision.pytorch_learner.learner_config import Backbone
 
 class SemanticSegmentationDataFormat(Enum):
     default = 'default'
+    shards = 'shards'
 
 
 @register_config('semantic_segmentation_data')
@@ -28,6 +28,25 @@ def color_to_triple(color: Optional[str] = None) -> Tuple[int, int, int]:
         return ImageColor.getrgb(color)
 
 
+def normalize_chip(x: np.ndarray) -> np.ndarray:
+    """Scale the values of a chip or batch of chips to [0, 1].
+
+    Integer chips are divided by the max value of their dtype, eg. 255 for uint8
+    and 65535 for uint16. Other chips are divided by 255.
+
+    Args:
+        x: chip or batch of chips of any integer or float dtype
+
+    Returns:
+        the scaled chip as a float32 array
+    """
+    if np.issubdtype(x.dtype, np.integer):
+        max_val = np.iinfo(x.dtype).max
+    else:
+        max_val = 255
+    return x.astype(np.float32) / max_val
+
+
 def compute_conf_mat(out, y, num_labels):
     labels = torch.arange(0, num_labels).to(out.device)
     return ((out == labels[:, None]) & (y == labels[:, None, None])).sum(
@@ -69,23 +88,36 @@ def compute_conf_mat_metrics(conf_mat, label_names, eps=1e-6):
 class AlbumentationsDataset(Dataset):
     """An adapter to use arbitrary datasets with albumentations transforms."""
 
-    def __init__(self, orig_dataset, transform=None):
+    def __init__(self, orig_dataset, transform=None, sample_cache=None):
         """Constructor.
 
         Args:
             orig_dataset: (Dataset) which is assumed to return PIL Image objects
                 and not perform any transforms of its own
             transform: (albumentations.core.transforms_interface.ImageOnlyTransform)
+            sample_cache: (SampleCache) if set, decoded images are cached in this.
+                This requires orig_dataset to have a targets attribute with the
+                target of each sample, like ImageFolder.
         """
         self.orig_dataset = orig_dataset
         self.transform = transform
+        self.sample_cache = sample_cache
+        if sample_cache is not None:
+            sample_cache.setup(len(self), self._load_img)
+
+    def _load_img(self, ind):
+        return (np.array(self.orig_dataset[ind][0]), )
 
     def __getitem__(self, ind):
-        x, y = self.orig_dataset[ind]
-        x = np.array(x)
+        if self.sample_cache is None:
+            x, y = self.orig_dataset[ind]
+            x = np.array(x)
+        else:
+            x, = self.sample_cache.get(ind, self._load_img)
+            y = self.orig_dataset.targets[ind]
         if self.transform:
             x = self.transform(image=x)['image']
-        x = torch.tensor(x).permute(2, 0, 1).float() / 255.0
+        x = torch.tensor(normalize_chip(x)).permute(2, 0, 1)
         return x, y
 
     def __len__(self):
@@ -0,0 +1,101 @@
+import os
+from os.path import dirname
+import io
+import struct
+import zipfile
+
+
+class ZipReader():
+    """Reads the members of a zip file without extracting it.
+
+    The members of the zip file are indexed once when this is constructed, so
+    looking up a member doesn't scan the central directory. Each process opens
+    its own handle to the zip file when it first reads a member, so a ZipReader
+    can be shared by the workers of a DataLoader, which would otherwise race
+    to seek the same file descriptor.
+    """
+
+    def __init__(self, zip_path):
+        """Constructor.
+
+        Args:
+            zip_path: (str) local path of the zip file
+        """
+        self.zip_path = zip_path
+        with zipfile.ZipFile(zip_path, 'r') as zipf:
+            infos = [info for info in zipf.infolist() if not info.is_dir()]
+        self.infos = dict((info.filename, info) for info in infos)
+
+        self.dirs = set()
+        for name in self.infos:
+            name = dirname(name)
+            while name and name not in self.dirs:
+                self.dirs.add(name)
+                name = dirname(name)
+
+        self._zipf = None
+        self._pid = None
+
+    def _get_zip_file(self):
+        pid = os.getpid()
+        if self._zipf is None or self._pid != pid:
+            self._zipf = zipfile.ZipFile(self.zip_path, 'r')
+            self._pid = pid
+        return self._zipf
+
+    def isdir(self, path):
+        """Return True if any members are in a directory."""
+        return path.rstrip('/') in self.dirs
+
+    def list_paths(self, dir, ext=''):
+        """Return the sorted paths of the members in a directory tree.
+
+        Args:
+            dir: (str) directory in the zip file
+            ext: (str) only return members with this extension
+        """
+        prefix = dir.rstrip('/') + '/'
+        return sorted(
+            name for name in self.infos
+            if name.startswith(prefix) and name.endswith(ext))
+
+    def read(self, path):
+        """Return the bytes of a member."""
+        return self._get_zip_file().read(self.infos[path])
+
+    def open(self, path):
+        """Return a file object with the contents of a member.
+
+        The contents are read into memory, so the file object stays valid
+        even if it is used in another process.
+        """
+        return io.BytesIO(self.read(path))
+
+    def open_member(self, path):
+        """Return a file object that reads a member from the zip file."""
+        return self._get_zip_file().open(self.infos[path])
+
+    def get_data_offset(self, path):
+        """Return the offset of a member's data in the zip file.
+
+        This is only useful for members which are stored without compression,
+        whose data can be read (or memory-mapped) directly from the zip file.
+        """
+        info = self.infos[path]
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError('{} is compressed.'.format(path))
+
+        # The local file header has a fixed size of 30 bytes followed by the
+        # file name and an extra field whose lengths may differ from the
+        # central directory.
+        zipf = self._get_zip_file()
+        zipf.fp.seek(info.header_offset)
+        header = zipf.fp.read(30)
+        name_len, extra_len = struct.unpack('<HH', header[26:30])
+        return info.header_offset + 30 + name_len + extra_len
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_zipf'] = None
+        state['_pid'] = None
+        return state
@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+from rasterio.transform import from_origin
+
+from rastervision.core.data import (RasterioCRSTransformer,
+                                    IdentityCRSTransformer)
+
+
+class TestRasterioCRSTransformer(unittest.TestCase):
+    def setUp(self):
+        transform = from_origin(-8240000, 4980000, 0.5, 0.5)
+        self.crs_transformer = RasterioCRSTransformer(transform, 'epsg:3857')
+
+    def test_array_matches_scalar(self):
+        pixel_xs = np.array([0, 10, 250, 999])
+        pixel_ys = np.array([0, 20, 125, 5])
+
+        map_xs, map_ys = self.crs_transformer.pixel_to_map_array(
+            pixel_xs, pixel_ys)
+        for px, py, mx, my in zip(pixel_xs, pixel_ys, map_xs, map_ys):
+            exp_mx, exp_my = self.crs_transformer.pixel_to_map((px, py))
+            self.assertAlmostEqual(mx, exp_mx)
+            self.assertAlmostEqual(my, exp_my)
+
+        out_xs, out_ys = self.crs_transformer.map_to_pixel_array(
+            map_xs, map_ys)
+        np.testing.assert_equal(out_xs, pixel_xs)
+        np.testing.assert_equal(out_ys, pixel_ys)
+        for mx, my, px, py in zip(map_xs, map_ys, out_xs, out_ys):
+            self.assertEqual(
+                tuple(self.crs_transformer.map_to_pixel((mx, my))), (px, py))
+
+    def test_empty_arrays(self):
+        xs, ys = self.crs_transformer.map_to_pixel_array([], [])
+        self.assertEqual(len(xs), 0)
+        self.assertEqual(len(ys), 0)
+        xs, ys = self.crs_transformer.pixel_to_map_array([], [])
+        self.assertEqual(len(xs), 0)
+        self.assertEqual(len(ys), 0)
+
+    def test_identity(self):
+        crs_transformer = IdentityCRSTransformer()
+        xs, ys = crs_transformer.map_to_pixel_array([1.5, 2], [3, 4])
+        np.testing.assert_equal(xs, [1.5, 2])
+        np.testing.assert_equal(ys, [3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
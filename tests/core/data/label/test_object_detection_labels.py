@@ -5,8 +5,10 @@ import numpy as np
 from rastervision.core.box import Box
 from rastervision.core.data.class_config import ClassConfig
 from rastervision.core.data.label.object_detection_labels import (
-    ObjectDetectionLabels)
+    ObjectDetectionLabels, ObjectDetectionLabelsAccumulator)
 from rastervision.core.data.label.tfod_utils.np_box_list import BoxList
+from rastervision.core.data.label.tfod_utils.np_box_list_ops import (
+    non_max_suppression)
 
 
 class ObjectDetectionLabelsTest(unittest.TestCase):
@@ -180,6 +182,65 @@ class ObjectDetectionLabelsTest(unittest.TestCase):
             scores=expected_scores[pruned_inds])
         pruned_labels.assert_equal(expected_labels)
 
+    def test_prune_duplicates_matches_nms(self):
+        np.random.seed(1)
+        num_boxes = 500
+        mins = np.random.uniform(0, 200, (num_boxes, 2))
+        npboxes = np.concatenate(
+            [mins, mins + np.random.uniform(1, 30, (num_boxes, 2))], axis=1)
+        class_ids = np.random.randint(0, 3, num_boxes)
+        scores = np.random.uniform(0, 1, num_boxes)
+        labels = ObjectDetectionLabels(npboxes, class_ids, scores=scores)
+
+        exp_boxlist = non_max_suppression(
+            labels.boxlist,
+            max_output_size=1000000,
+            iou_threshold=0.3,
+            score_threshold=0.2)
+        exp_labels = ObjectDetectionLabels.from_boxlist(exp_boxlist)
+        # Small cells mean that boxes span many cells.
+        for cell_sz in [None, 5, 50, 1000]:
+            pruned_labels = ObjectDetectionLabels.prune_duplicates(
+                labels, 0.2, 0.3, cell_sz=cell_sz)
+            pruned_labels.assert_equal(exp_labels)
+
+    def test_prune_duplicates_class_aware(self):
+        npboxes = np.array([[0., 0., 2., 2.], [0., 0., 2., 2.1],
+                            [0., 0., 2.1, 2.]])
+        class_ids = np.array([0, 1, 0])
+        scores = np.array([0.9, 0.8, 0.7])
+        labels = ObjectDetectionLabels(npboxes, class_ids, scores=scores)
+
+        pruned_labels = ObjectDetectionLabels.prune_duplicates(
+            labels, 0.5, 0.5)
+        self.assertEqual(len(pruned_labels), 1)
+
+        pruned_labels = ObjectDetectionLabels.prune_duplicates(
+            labels, 0.5, 0.5, class_aware=True)
+        expected_labels = ObjectDetectionLabels(
+            npboxes[0:2], class_ids[0:2], scores=scores[0:2])
+        pruned_labels.assert_equal(expected_labels)
+
+    def test_accumulator(self):
+        accumulator = ObjectDetectionLabelsAccumulator()
+        accumulator.finalize().assert_equal(ObjectDetectionLabels.make_empty())
+
+        labels = ObjectDetectionLabels.make_empty()
+        accumulator += ObjectDetectionLabels.make_empty()
+        for i in range(1, 5):
+            npboxes = np.array([[i, i, i + 2., i + 2.]] * i)
+            class_ids = np.full(i, i % 2)
+            scores = np.full(i, i / 10)
+            batch_labels = ObjectDetectionLabels(
+                npboxes, class_ids, scores=scores)
+            labels += batch_labels
+            accumulator += batch_labels
+        self.assertEqual(len(accumulator), len(labels))
+        accumulator.finalize().assert_equal(labels)
+
+        with self.assertRaises(TypeError):
+            accumulator + labels
+
     def test_filter_by_aoi(self):
         aois = [Box.make_square(0, 0, 2).to_shapely()]
         filt_labels = self.labels.filter_by_aoi(aois)
@@ -0,0 +1,85 @@
+import unittest
+from os.path import join
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.data.label import (SemanticSegmentationLabels,
+                                          SemanticSegmentationDenseLabels)
+from rastervision.pipeline import rv_config
+
+
+class TestSemanticSegmentationDenseLabels(unittest.TestCase):
+    def setUp(self):
+        self.extent = Box(0, 0, 15, 20)
+        self.windows = [Box.make_square(0, 0, 10), Box.make_square(0, 10, 10)]
+        self.label_arr0 = np.random.choice([0, 1], (10, 10))
+        self.label_arr1 = np.random.choice([0, 1], (10, 10))
+        self.labels = SemanticSegmentationDenseLabels(self.extent, block_sz=8)
+        self.labels.set_label_arr(self.windows[0], self.label_arr0)
+        self.labels.set_label_arr(self.windows[1], self.label_arr1)
+
+    def test_get(self):
+        np.testing.assert_array_equal(
+            self.labels.get_label_arr(self.windows[0]), self.label_arr0)
+        np.testing.assert_array_equal(
+            self.labels.get_label_arr(Box(2, 5, 8, 15)),
+            np.hstack([self.label_arr0, self.label_arr1])[2:8, 5:15])
+
+    def test_get_outside_extent(self):
+        window = Box(10, 15, 20, 25)
+        label_arr = self.labels.get_label_arr(window)
+        exp_label_arr = np.zeros((10, 10))
+        self.assertEqual(label_arr.shape, (10, 10))
+        np.testing.assert_array_equal(label_arr, exp_label_arr)
+
+    def test_set_outside_extent(self):
+        window = Box.make_square(10, 15, 10)
+        self.labels.set_label_arr(window, np.full((10, 10), 1))
+        np.testing.assert_array_equal(
+            self.labels.get_label_arr(Box(10, 15, 15, 20)), np.ones((5, 5)))
+
+    def test_get_windows(self):
+        windows = self.labels.get_windows()
+        self.assertEqual(len(windows), 6)
+        self.assertEqual(
+            sum([w.get_area() for w in windows]), self.extent.get_area())
+
+    def test_add(self):
+        other = SemanticSegmentationLabels()
+        label_arr = np.full((10, 10), 1)
+        other.set_label_arr(Box.make_square(5, 5, 10), label_arr)
+        self.labels += other
+        np.testing.assert_array_equal(
+            self.labels.get_label_arr(Box.make_square(5, 5, 10)), label_arr)
+        np.testing.assert_array_equal(
+            self.labels.get_label_arr(Box.make_square(0, 0, 5)),
+            self.label_arr0[0:5, 0:5])
+
+    def test_get_with_aoi(self):
+        null_class_id = 2
+
+        aoi_polygons = [Box.make_square(5, 15, 2).to_shapely()]
+        exp_label_arr = np.full(self.label_arr1.shape, null_class_id)
+        exp_label_arr[5:7, 5:7] = self.label_arr1[5:7, 5:7]
+
+        labels = self.labels.filter_by_aoi(aoi_polygons, null_class_id)
+        label_arr = labels.get_label_arr(self.windows[1])
+        np.testing.assert_array_equal(label_arr, exp_label_arr)
+
+    def test_memmap(self):
+        with rv_config.get_tmp_dir() as tmp_dir:
+            path = join(tmp_dir, 'labels.mmap')
+            labels = SemanticSegmentationDenseLabels(
+                self.extent, fill_value=3, path=path)
+            self.assertIsInstance(labels.label_arr, np.memmap)
+            labels.set_label_arr(self.windows[0], self.label_arr0)
+            np.testing.assert_array_equal(
+                labels.get_label_arr(self.windows[0]), self.label_arr0)
+            np.testing.assert_array_equal(
+                labels.get_label_arr(Box(10, 10, 15, 20)), np.full((5, 10), 3))
+            del labels
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.data.label import (SemanticSegmentationLabels,
+                                          SemanticSegmentationSmoothLabels)
+from rastervision.core.data.label.semantic_segmentation_smooth_labels import (
+    get_blend_weights)
+
+
+class TestSemanticSegmentationSmoothLabels(unittest.TestCase):
+    def setUp(self):
+        self.extent = Box(0, 0, 10, 15)
+        self.num_classes = 3
+
+    def make_batch_labels(self, window, score_arr):
+        labels = SemanticSegmentationLabels()
+        labels.set_label_arr(window, score_arr.argmax(axis=0))
+        labels.set_score_arr(window, score_arr)
+        return labels
+
+    def test_blend_overlap(self):
+        labels = SemanticSegmentationSmoothLabels(self.extent,
+                                                  self.num_classes)
+        window0 = Box(0, 0, 10, 10)
+        window1 = Box(0, 5, 10, 15)
+        score_arr0 = np.zeros((3, 10, 10), dtype=np.float32)
+        score_arr0[0] = 0.6
+        score_arr0[1] = 0.4
+        score_arr1 = np.zeros((3, 10, 10), dtype=np.float32)
+        score_arr1[0] = 0.3
+        score_arr1[1] = 0.7
+        labels += self.make_batch_labels(window0, score_arr0)
+        labels += self.make_batch_labels(window1, score_arr1)
+
+        label_arr = labels.get_label_arr(self.extent)
+        # Average of the overlap is 0.45 for class 0 and 0.55 for class 1.
+        np.testing.assert_array_equal(label_arr[:, 0:5], 0)
+        np.testing.assert_array_equal(label_arr[:, 5:15], 1)
+        score_arr = labels.get_score_arr(Box(0, 5, 10, 10))
+        np.testing.assert_allclose(score_arr[0], 0.45)
+        np.testing.assert_allclose(score_arr[1], 0.55)
+
+    def test_add_label_arrs(self):
+        labels = SemanticSegmentationSmoothLabels(
+            self.extent, self.num_classes, fill_value=2)
+        other = SemanticSegmentationLabels()
+        window = Box(0, 0, 5, 5)
+        label_arr = np.random.choice([0, 1], (5, 5))
+        other.set_label_arr(window, label_arr)
+        labels += other
+
+        np.testing.assert_array_equal(labels.get_label_arr(window), label_arr)
+        # Pixels without scores get the fill value.
+        np.testing.assert_array_equal(
+            labels.get_label_arr(Box(5, 5, 10, 10)), 2)
+
+    def test_outside_extent(self):
+        labels = SemanticSegmentationSmoothLabels(
+            self.extent, self.num_classes, fill_value=2)
+        window = Box(5, 10, 15, 20)
+        score_arr = np.zeros((3, 10, 10), dtype=np.float32)
+        score_arr[1] = 1
+        labels.add_scores(window, score_arr)
+        label_arr = labels.get_label_arr(window)
+        np.testing.assert_array_equal(label_arr[0:5, 0:5], 1)
+        np.testing.assert_array_equal(label_arr[5:, :], 2)
+        np.testing.assert_array_equal(label_arr[:, 5:], 2)
+
+    def test_uint8(self):
+        labels = SemanticSegmentationSmoothLabels(
+            self.extent, self.num_classes, dtype=np.uint8)
+        window = Box(0, 0, 10, 10)
+        score_arr = np.random.dirichlet(np.ones(3), (10, 10))
+        score_arr = score_arr.transpose((2, 0, 1)).astype(np.float32)
+        labels.add_scores(window, score_arr)
+        labels.add_scores(window, score_arr)
+        self.assertEqual(labels.score_arr.dtype, np.uint8)
+        np.testing.assert_allclose(
+            labels.get_score_arr(window), score_arr, atol=1 / 255)
+
+    def test_blend_weights(self):
+        for blend_method in ['none', 'linear', 'cosine']:
+            weights = get_blend_weights(6, 7, blend_method)
+            self.assertEqual(weights.shape, (6, 7))
+            self.assertTrue(np.all(weights > 0))
+        weights = get_blend_weights(6, 7, 'cosine')
+        self.assertGreater(weights[3, 3], weights[0, 0])
+        with self.assertRaises(ValueError):
+            get_blend_weights(6, 7, 'foo')
+
+    def test_filter_by_aoi(self):
+        labels = SemanticSegmentationSmoothLabels(self.extent,
+                                                  self.num_classes)
+        score_arr = np.zeros((3, 10, 15), dtype=np.float32)
+        score_arr[1] = 1
+        labels.add_scores(self.extent, score_arr)
+        aoi_polygons = [Box(0, 0, 5, 5).to_shapely()]
+        filtered = labels.filter_by_aoi(aoi_polygons, 2)
+        label_arr = filtered.get_label_arr(self.extent)
+        np.testing.assert_array_equal(label_arr[0:5, 0:5], 1)
+        np.testing.assert_array_equal(label_arr[5:, :], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,6 +31,32 @@ class TestSegmentationClassTransformer(unittest.TestCase):
         expected_rgb_image = self.rgb_image
         np.testing.assert_array_equal(rgb_image, expected_rgb_image)
 
+    def test_rgb_to_class_unknown_color(self):
+        rgb_image = np.zeros((2, 2, 3), dtype=np.uint8)
+        rgb_image[0, 0, :] = color_to_triple('blue')
+        rgb_image[0, 1, :] = color_to_triple('yellow')
+        rgb_image[1, 0, :] = (255, 255, 255)
+        class_image = self.transformer.rgb_to_class(rgb_image)
+        null_class_id = self.class_config.get_null_class_id()
+        expected_class_image = np.array([[2, null_class_id],
+                                         [null_class_id, null_class_id]])
+        np.testing.assert_array_equal(class_image, expected_class_image)
+        self.assertEqual(class_image.dtype, np.uint8)
+
+    def test_class_to_rgb_unknown_class(self):
+        class_image = np.array([[2, 10]])
+        rgb_image = self.transformer.class_to_rgb(class_image)
+        expected_rgb_image = np.zeros((1, 2, 3))
+        expected_rgb_image[0, 0, :] = color_to_triple('blue')
+        np.testing.assert_array_equal(rgb_image, expected_rgb_image)
+        self.assertEqual(rgb_image.dtype, np.uint8)
+
+    def test_round_trip(self):
+        class_image = np.random.randint(0, 4, (20, 30))
+        rgb_image = self.transformer.class_to_rgb(class_image)
+        np.testing.assert_array_equal(
+            self.transformer.rgb_to_class(rgb_image), class_image)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from os.path import join
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.data.label_store import SemanticSegmentationLabelStore
+from rastervision.pipeline import rv_config
+
+from tests.core.data.mock_crs_transformer import DoubleCRSTransformer
+
+
+class TestSemanticSegmentationLabelStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir_obj = rv_config.get_tmp_dir()
+        self.tmp_dir = self.tmp_dir_obj.name
+
+    def tearDown(self):
+        self.tmp_dir_obj.cleanup()
+
+    def test_empty_labels_memmap(self):
+        extent = Box(0, 0, 10, 10)
+        store = SemanticSegmentationLabelStore(
+            join(self.tmp_dir, 'labels.tif'),
+            extent,
+            DoubleCRSTransformer(),
+            self.tmp_dir,
+            dense=True,
+            memmap=True)
+        labels1 = store.empty_labels()
+        labels1.set_label_arr(extent, np.ones((10, 10), dtype=np.uint8))
+        # Each call has its own file, so earlier labels aren't overwritten.
+        labels2 = store.empty_labels()
+        self.assertIsInstance(labels2.label_arr, np.memmap)
+        self.assertNotEqual(labels1.label_arr.filename,
+                            labels2.label_arr.filename)
+        np.testing.assert_equal(labels1.get_label_arr(extent), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+from rastervision.core.data import BlockCache
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = BlockCache(1000)
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', np.zeros((10, 10), dtype=np.uint8))
+        self.assertIsNotNone(cache.get('a'))
+        stats = cache.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['nbytes'], 100)
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(250)
+        cache.put('a', np.zeros((10, 10), dtype=np.uint8))
+        cache.put('b', np.zeros((10, 10), dtype=np.uint8))
+        # Touch a so that b is the least recently used.
+        cache.get('a')
+        cache.put('c', np.zeros((10, 10), dtype=np.uint8))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.nbytes, 200)
+
+    def test_skips_blocks_over_budget(self):
+        cache = BlockCache(50)
+        cache.put('a', np.zeros((10, 10), dtype=np.uint8))
+        self.assertEqual(len(cache), 0)
+
+    def test_resets_in_forked_process(self):
+        cache = BlockCache(1000)
+        cache.put('a', np.zeros((10, 10), dtype=np.uint8))
+        cache.get('a')
+        # Simulate being used from a child process.
+        cache._pid = -1
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get_stats()['hits'], 0)
+        self.assertEqual(cache.get_stats()['misses'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
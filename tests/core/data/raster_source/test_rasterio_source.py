@@ -1,11 +1,16 @@
 import unittest
+import os
 from os.path import join
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, SimpleHTTPRequestHandler
 
 import numpy as np
 import rasterio
-from rasterio.enums import ColorInterp
+from rasterio.enums import ColorInterp, Resampling
 
-from rastervision.core import (RasterStats)
+from rastervision.core import (Box, RasterStats)
 from rastervision.core.utils.misc import save_img
 from rastervision.core.data import (ChannelOrderError, RasterioSourceConfig,
                                     StatsTransformerConfig)
@@ -14,6 +19,51 @@ from rastervision.pipeline import rv_config
 from tests import data_file_path
 
 
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Serves files from serve_dir and honors single byte-range requests."""
+    serve_dir = None
+
+    def translate_path(self, path):
+        # The directory argument of SimpleHTTPRequestHandler needs Python 3.7,
+        # so paths are made relative to serve_dir instead of the working
+        # directory here.
+        path = super().translate_path(path)
+        return join(self.serve_dir, os.path.relpath(path, os.getcwd()))
+
+    def send_head(self):
+        range_header = self.headers.get('Range')
+        path = self.translate_path(self.path)
+        if range_header is None or not os.path.isfile(path):
+            return super().send_head()
+
+        match = re.match(r'bytes=(\d+)-(\d*)', range_header)
+        size = os.path.getsize(path)
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else size - 1
+        end = min(end, size - 1)
+
+        f = open(path, 'rb')
+        f.seek(start)
+        self.send_response(206)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Range', 'bytes {}-{}/{}'.format(
+            start, end, size))
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        self.range_remaining = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, 'range_remaining', None)
+        if remaining is None:
+            return super().copyfile(source, outputfile)
+        outputfile.write(source.read(remaining))
+
+    def log_message(self, format, *args):
+        pass
+
+
 class TestRasterioSource(unittest.TestCase):
     def setUp(self):
         self.tmp_dir_obj = rv_config.get_tmp_dir()
@@ -225,6 +275,215 @@ class TestRasterioSource(unittest.TestCase):
             out_p = source.get_crs_transformer().pixel_to_map(p)
             np.testing.assert_equal(out_p, p)
 
+    def test_stream(self):
+        img_dir = join(self.tmp_dir, 'served')
+        os.makedirs(img_dir)
+        img_path = join(img_dir, 'img.tif')
+        height = 256
+        width = 256
+        nb_channels = 3
+        im = np.random.randint(0, 256,
+                               (height, width, nb_channels)).astype(np.uint8)
+        with rasterio.open(
+                img_path,
+                'w',
+                driver='GTiff',
+                height=height,
+                width=width,
+                count=nb_channels,
+                dtype=np.uint8,
+                tiled=True,
+                blockxsize=64,
+                blockysize=64) as img_dataset:
+            for channel in range(nb_channels):
+                img_dataset.write(im[:, :, channel], channel + 1)
+
+        handler = type('Handler', (RangeRequestHandler, ),
+                       {'serve_dir': img_dir})
+        server = HTTPServer(('127.0.0.1', 0), handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            uri = 'http://127.0.0.1:{}/img.tif'.format(server.server_port)
+            config = RasterioSourceConfig(uris=[uri], stream=True)
+            source = config.build(tmp_dir=self.tmp_dir)
+            with source.activate():
+                self.assertTrue(source.imagery_path.startswith('/vsicurl/'))
+                self.assertEqual(os.listdir(source.image_tmp_dir.name), [])
+                window = Box(10, 20, 110, 70)
+                out_chip = source.get_chip(window)
+                np.testing.assert_equal(out_chip, im[10:110, 20:70, :])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_block_cache(self):
+        img_path = join(self.tmp_dir, 'tmp.tif')
+        height = 200
+        width = 150
+        nb_channels = 3
+        im = np.random.randint(0, 256,
+                               (height, width, nb_channels)).astype(np.uint8)
+        with rasterio.open(
+                img_path,
+                'w',
+                driver='GTiff',
+                height=height,
+                width=width,
+                count=nb_channels,
+                dtype=np.uint8,
+                nodata=7,
+                tiled=True,
+                blockxsize=32,
+                blockysize=32) as img_dataset:
+            for channel in range(nb_channels):
+                img_dataset.write(im[:, :, channel], channel + 1)
+
+        config = RasterioSourceConfig(uris=[img_path])
+        source = config.build(tmp_dir=self.tmp_dir)
+        cached_config = RasterioSourceConfig(uris=[img_path], block_cache_mb=1)
+        cached_source = cached_config.build(tmp_dir=self.tmp_dir)
+
+        windows = [
+            Box(0, 0, 100, 100),
+            Box(50, 50, 150, 150),
+            Box(-20, -30, 80, 70),
+            Box(120, 100, 220, 200),
+            Box(300, 300, 310, 310)
+        ]
+        with source.activate(), cached_source.activate():
+            for window in windows:
+                np.testing.assert_equal(
+                    cached_source.get_chip(window), source.get_chip(window))
+            stats = cached_source.block_cache.get_stats()
+            self.assertGreater(stats['hits'], 0)
+            self.assertGreater(stats['misses'], 0)
+
+            misses = stats['misses']
+            cached_source.get_chip(Box(10, 10, 90, 90))
+            self.assertEqual(cached_source.block_cache.misses, misses)
+
+    def test_get_window_validity(self):
+        # make geotiffs with valid pixels in the left half, and NODATA or zeros
+        # in the right half, with and without overviews
+        height = 256
+        width = 256
+        nb_channels = 3
+        im = np.random.randint(1, 256,
+                               (height, width, nb_channels)).astype(np.uint8)
+        im[:, 128:192, :] = 7
+        im[:, 192:, :] = 0
+        img_paths = []
+        for overviews in [True, False]:
+            img_path = join(self.tmp_dir, 'tmp-{}.tif'.format(overviews))
+            img_paths.append(img_path)
+            with rasterio.open(
+                    img_path,
+                    'w',
+                    driver='GTiff',
+                    height=height,
+                    width=width,
+                    count=nb_channels,
+                    dtype=np.uint8,
+                    nodata=7) as img_dataset:
+                for channel in range(nb_channels):
+                    img_dataset.write(im[:, :, channel], channel + 1)
+                if overviews:
+                    img_dataset.build_overviews([2, 4, 8, 16],
+                                                Resampling.nearest)
+
+        config = RasterioSourceConfig(
+            uris=[img_paths[0]], validity_mask_scale=16)
+        source = config.build(tmp_dir=self.tmp_dir)
+        windows = [
+            Box(0, 0, 64, 64),
+            Box(0, 100, 64, 164),
+            Box(0, 128, 64, 192),
+            Box(0, 144, 64, 208),
+            Box(64, 192, 128, 256),
+            Box(300, 300, 364, 364)
+        ]
+        with source.activate():
+            mask = source.get_validity_mask()
+            self.assertEqual(mask.shape, (16, 16))
+            # The mask is dilated by one cell.
+            self.assertTrue(np.all(mask[:, 0:9]))
+            self.assertFalse(np.any(mask[:, 9:]))
+
+            validity = source.get_window_validity(windows)
+            np.testing.assert_equal(validity,
+                                    [True, True, True, False, False, False])
+            np.testing.assert_equal(
+                source.get_window_validity(
+                    np.array([w.tuple_format() for w in windows])), validity)
+
+        configs = [
+            RasterioSourceConfig(uris=[img_paths[0]], validity_mask_scale=0),
+            RasterioSourceConfig(uris=[img_paths[0]], x_shift=1.0),
+            RasterioSourceConfig(uris=[img_paths[1]], validity_mask_scale=16)
+        ]
+        for config in configs:
+            source = config.build(tmp_dir=self.tmp_dir)
+            with source.activate():
+                self.assertIsNone(source.get_validity_mask())
+                self.assertTrue(np.all(source.get_window_validity(windows)))
+
+    def test_get_chips(self):
+        img_path = data_file_path('small-uint16-tile.tif')
+        config = RasterioSourceConfig(uris=[img_path])
+        raw_rs = config.build(tmp_dir=self.tmp_dir)
+        stats_uri = join(self.tmp_dir, 'stats.json')
+        stats = RasterStats()
+        stats.compute([raw_rs])
+        stats.save(stats_uri)
+
+        config = RasterioSourceConfig(
+            uris=[img_path],
+            channel_order=[2, 0],
+            transformers=[StatsTransformerConfig(stats_uri=stats_uri)])
+        source = config.build(tmp_dir=self.tmp_dir)
+
+        # Heavily overlapping windows are read as one region, and the others are
+        # read one at a time.
+        overlapping_windows = [
+            Box.make_square(0, 0, 50),
+            Box.make_square(0, 25, 50),
+            Box.make_square(25, 0, 50),
+            Box.make_square(25, 25, 50)
+        ]
+        sparse_windows = [
+            Box.make_square(200, 200, 50),
+            Box.make_square(0, 0, 50),
+            Box.make_square(-10, 100, 50)
+        ]
+        with source.activate():
+            for windows in [overlapping_windows, sparse_windows]:
+                expected_chips = np.stack(
+                    [source.get_chip(w) for w in windows])
+                chips = source.get_chips(windows)
+                np.testing.assert_equal(chips, expected_chips)
+
+                out = np.empty_like(expected_chips)
+                chips = source.get_chips(windows, out=out)
+                self.assertIs(chips, out)
+                np.testing.assert_equal(out, expected_chips)
+
+    def test_get_chips_from_threads(self):
+        img_path = data_file_path('small-rgb-tile.tif')
+        config = RasterioSourceConfig(uris=[img_path])
+        source = config.build(tmp_dir=self.tmp_dir)
+        windows = source.get_extent().get_windows(50, 50)
+
+        with source.activate():
+            expected_chips = [source.get_chip(w) for w in windows]
+            with ThreadPoolExecutor(4) as pool:
+                chips = list(pool.map(source.get_chip, windows))
+            self.assertGreater(len(source.thread_datasets), 0)
+        self.assertEqual(source.thread_datasets, [])
+
+        for chip, expected_chip in zip(chips, expected_chips):
+            np.testing.assert_equal(chip, expected_chip)
+
     def test_no_epsg(self):
         crs = rasterio.crs.CRS()
         img_path = join(self.tmp_dir, 'tmp.tif')
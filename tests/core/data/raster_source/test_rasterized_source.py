@@ -27,7 +27,7 @@ class TestRasterizedSource(unittest.TestCase):
     def tearDown(self):
         self.tmp_dir_obj.cleanup()
 
-    def build_source(self, geojson, all_touched=False):
+    def build_source(self, geojson, all_touched=False, **kwargs):
         json_to_file(geojson, self.uri)
 
         config = RasterizedSourceConfig(
@@ -35,7 +35,8 @@ class TestRasterizedSource(unittest.TestCase):
                 uri=self.uri, default_class_id=None),
             rasterizer_config=RasterizerConfig(
                 background_class_id=self.background_class_id,
-                all_touched=all_touched))
+                all_touched=all_touched),
+            **kwargs)
         source = config.build(self.class_config, self.crs_transformer,
                               self.extent)
         return source
@@ -123,6 +124,66 @@ class TestRasterizedSource(unittest.TestCase):
             expected_chip[0:1, 0:1, 0] = self.class_id
             np.testing.assert_array_equal(chip, expected_chip)
 
+    def test_rasterize_modes(self):
+        np.random.seed(1)
+        features = []
+        for _ in range(20):
+            x, y = np.random.uniform(-5, 45, 2)
+            w, h = np.random.uniform(1, 10, 2)
+            features.append({
+                'type': 'Feature',
+                'geometry': {
+                    'type':
+                    'Polygon',
+                    'coordinates': [[[x, y], [x + w, y + h / 2],
+                                     [x + w / 2, y + h], [x, y]]]
+                },
+                'properties': {
+                    'class_id': self.class_id
+                }
+            })
+        geojson = {'type': 'FeatureCollection', 'features': features}
+        self.extent = Box(0, 0, 40, 35)
+        windows = [
+            Box(0, 0, 40, 35),
+            Box.make_square(3, 7, 13),
+            Box.make_square(30, 25, 13),
+            Box.make_square(-5, -5, 10)
+        ]
+
+        for all_touched in [False, True]:
+            source = self.build_source(
+                geojson,
+                all_touched=all_touched,
+                rasterize_extent_mb=0,
+                tile_cache_mb=0)
+            with source.activate():
+                exp_chips = [source.get_chip(w) for w in windows]
+
+            # Whole extent in memory and in a memmap, and tiled.
+            for kwargs in [{
+                    'rasterize_extent_mb': 1
+            }, {
+                    'rasterize_extent_mb': 1,
+                    'memmap': True,
+                    'tile_sz': 16
+            }, {
+                    'rasterize_extent_mb': 0,
+                    'tile_sz': 16,
+                    'tile_cache_mb': 1
+            }]:
+                source = self.build_source(
+                    geojson, all_touched=all_touched, **kwargs)
+                with source.activate():
+                    for window, exp_chip in zip(windows, exp_chips):
+                        np.testing.assert_array_equal(
+                            source.get_chip(window), exp_chip)
+                        # Modifying a raw chip doesn't change later chips.
+                        source._get_chip(window)[:] = 255
+                    for window, exp_chip in zip(windows, exp_chips):
+                        np.testing.assert_array_equal(
+                            source.get_chip(window), exp_chip)
+
     def test_using_null_class_bufs(self):
         vs = GeoJSONVectorSourceConfig(
             uri=self.uri, default_class_id=None, line_bufs={0: None})
@@ -3,10 +3,25 @@ import os
 
 import numpy as np
 
-from rastervision.core.data import RasterStats, StatsTransformerConfig
+from rastervision.core.data import (RasterStats, StatsTransformerConfig,
+                                    StatsTransformer)
 from rastervision.pipeline import rv_config
 
 
+def stats_transform(chip, means, stds):
+    # Reference implementation that creates a new array for each step.
+    nodata = chip == 0
+    chip = chip - np.array(means)
+    chip = chip / np.array(stds)
+    chip += 3
+    chip /= 6
+    chip = np.clip(chip, 0, 1)
+    chip *= 255
+    chip = chip.astype(np.uint8)
+    chip[nodata] = 0
+    return chip
+
+
 class TestRasterTransformer(unittest.TestCase):
     def test_stats_transformer(self):
         raster_stats = RasterStats()
@@ -25,6 +40,35 @@ class TestRasterTransformer(unittest.TestCase):
             expected_out_chip = np.ones((2, 2, 4)) * 170
             np.testing.assert_equal(out_chip, expected_out_chip)
 
+    def test_stats_transformer_identical(self):
+        np.random.seed(1)
+        raster_stats = RasterStats()
+        raster_stats.means = [1000.3, 20.5, -150., 7000.]
+        raster_stats.stds = [300.7, 10.1, 400., 2500.]
+        transformer = StatsTransformer(raster_stats)
+        channel_order = [3, 0, 1]
+        means = np.array(raster_stats.means)[channel_order]
+        stds = np.array(raster_stats.stds)[channel_order]
+
+        chips = [
+            np.random.randint(0, 2**16, (2, 10, 10, 3)).astype(np.uint16),
+            np.random.randint(-2**15, 2**15, (10, 10, 3)).astype(np.int16),
+            (np.random.randn(10, 10, 3) * 3000).astype(np.float32),
+            np.random.randint(0, 2**20, (10, 10, 3)).astype(np.int32)
+        ]
+        for chip in chips:
+            chip[0, 0] = 0
+            out_chip = transformer.transform(chip, channel_order)
+            exp_out_chip = stats_transform(chip, means, stds)
+            self.assertEqual(out_chip.dtype, np.uint8)
+            np.testing.assert_array_equal(out_chip, exp_out_chip)
+
+        # Non-contiguous chips, eg. with channel_order applied by indexing.
+        chip = chips[0][..., ::-1]
+        np.testing.assert_array_equal(
+            transformer.transform(chip, channel_order),
+            stats_transform(chip, means, stds))
+
 
 if __name__ == '__main__':
     unittest.main()
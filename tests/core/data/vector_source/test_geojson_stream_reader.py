@@ -0,0 +1,68 @@
+import io
+import json
+import unittest
+
+from rastervision.core.data.vector_source.geojson_stream_reader import (
+    GeoJSONStreamReader)
+
+
+class TestGeoJSONStreamReader(unittest.TestCase):
+    def setUp(self):
+        self.geojson = {
+            'type':
+            'FeatureCollection',
+            'name':
+            'labels',
+            'features': [{
+                'type': 'Feature',
+                'properties': {
+                    'class_id': i,
+                    'label': 'a "quoted" {label}'
+                },
+                'geometry': {
+                    'type': 'Point',
+                    'coordinates': [i * 1.25, -i * 123456.789]
+                }
+            } for i in range(20)],
+            'bbox': [0, 1, 2, 3]
+        }
+
+    def read(self, geojson_str, chunk_sz):
+        reader = GeoJSONStreamReader(
+            io.StringIO(geojson_str), chunk_sz=chunk_sz)
+        features = list(reader.iter_features())
+        return features, reader.members
+
+    def test_iter_features(self):
+        for indent in [None, 2]:
+            geojson_str = json.dumps(self.geojson, indent=indent)
+            for chunk_sz in [1, 7, 64, 1024 * 1024]:
+                features, members = self.read(geojson_str, chunk_sz)
+                self.assertEqual(features, self.geojson['features'])
+                self.assertEqual(
+                    members, {
+                        'type': 'FeatureCollection',
+                        'name': 'labels',
+                        'bbox': [0, 1, 2, 3]
+                    })
+
+    def test_empty(self):
+        features, members = self.read('{}', 1)
+        self.assertEqual(features, [])
+        self.assertEqual(members, {})
+
+        features, members = self.read(
+            ' { "type": "FeatureCollection", "features": [ ] } ', 3)
+        self.assertEqual(features, [])
+        self.assertEqual(members, {'type': 'FeatureCollection'})
+
+    def test_invalid(self):
+        geojson_str = json.dumps(self.geojson)
+        with self.assertRaises(ValueError):
+            self.read(geojson_str[:len(geojson_str) // 2], 16)
+        with self.assertRaises(ValueError):
+            self.read('[]', 16)
+
+
+if __name__ == '__main__':
+    unittest.main()
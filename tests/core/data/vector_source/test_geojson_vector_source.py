@@ -1,10 +1,14 @@
 import unittest
+from unittest.mock import patch
 import os
 
 from shapely.geometry import shape
 
+from rastervision.core.box import Box
 from rastervision.core.data import (GeoJSONVectorSourceConfig, ClassConfig,
                                     IdentityCRSTransformer)
+from rastervision.core.data.vector_source.vector_source import (
+    transform_geometries)
 from rastervision.pipeline.file_system import json_to_file
 from rastervision.pipeline import rv_config
 
@@ -180,6 +184,148 @@ class TestGeoJSONVectorSource(unittest.TestCase):
         trans_geom = trans_geojson['features'][0]['geometry']
         self.assertTrue(shape(geom).equals(shape(trans_geom)))
 
+    def test_transform_geometries(self):
+        geoms = [{
+            'type': 'Point',
+            'coordinates': [1, 2, 3]
+        }, {
+            'type':
+            'Polygon',
+            'coordinates': [[[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]],
+                            [[2, 2], [2, 4, 1], [4, 4], [2, 2]]]
+        }, {
+            'type':
+            'GeometryCollection',
+            'geometries': [{
+                'type': 'MultiLineString',
+                'coordinates': [[[0, 0], [1, 1]], [[2, 2], [3, 3]]]
+            }]
+        }]
+        calls = []
+
+        def double(xs, ys):
+            calls.append(len(xs))
+            return xs * 2, ys * 2
+
+        trans_geoms = transform_geometries(geoms, double)
+        self.assertEqual(calls, [14])
+        self.assertEqual(trans_geoms[0]['coordinates'], [2, 4])
+        exp_poly = {
+            'type':
+            'Polygon',
+            'coordinates': [[[0, 0], [0, 20], [20, 20], [20, 0], [0, 0]],
+                            [[4, 4], [4, 8], [8, 8], [4, 4]]]
+        }
+        self.assertTrue(shape(exp_poly).equals(shape(trans_geoms[1])))
+        self.assertEqual(trans_geoms[2]['geometries'][0]['coordinates'],
+                         [[[0, 0], [2, 2]], [[4, 4], [6, 6]]])
+        # The input geometries are not modified.
+        self.assertEqual(geoms[0]['coordinates'], [1, 2, 3])
+
+    def test_cache(self):
+        geojson = {
+            'type':
+            'FeatureCollection',
+            'features': [{
+                'properties': {
+                    'class_id': 0,
+                    'score': 0.5
+                },
+                'geometry': {
+                    'type': 'LineString',
+                    'coordinates': [[10, 10], [10, 20]]
+                }
+            }, {
+                'properties': {
+                    'class_id': 1
+                },
+                'geometry': {
+                    'type': 'Point',
+                    'coordinates': [5, 5]
+                }
+            }]
+        }
+        json_to_file(geojson, self.uri)
+        class_config = ClassConfig(names=['building', 'car'])
+        cache_dir = os.path.join(self.tmp_dir.name, 'cache')
+        cfg = GeoJSONVectorSourceConfig(
+            uri=self.uri, default_class_id=0, cache_dir=cache_dir)
+        exp_geojson = cfg.build(class_config,
+                                IdentityCRSTransformer()).get_geojson()
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        source = cfg.build(class_config, IdentityCRSTransformer())
+        with patch.object(source, '_get_geojson') as mock_get_geojson:
+            cached_geojson = source.get_geojson()
+            mock_get_geojson.assert_not_called()
+        self.assertEqual(cached_geojson, exp_geojson)
+
+        # Changing a buffer or the CRS transform uses a new cache entry.
+        cfg.line_bufs = {0: 2}
+        cfg.build(class_config, IdentityCRSTransformer()).get_geojson()
+        cfg.build(class_config, DoubleCRSTransformer()).get_geojson()
+        self.assertEqual(len(os.listdir(cache_dir)), 3)
+
+    def test_stream(self):
+        features = []
+        for i in range(25):
+            features.append({
+                'type': 'Feature',
+                'properties': {
+                    'type': 'car' if i % 2 else 'building'
+                },
+                'geometry': {
+                    'type': 'LineString',
+                    'coordinates': [[i * 10, i * 10], [i * 10 + 5, i * 10]]
+                }
+            })
+        geojson = {'type': 'FeatureCollection', 'features': features}
+        json_to_file(geojson, self.uri)
+        class_config = ClassConfig(names=['building', 'car'])
+        class_id_to_filter = {0: ['==', 'type', 'building']}
+
+        def get_geojson(stream, extent=None, to_map_coords=False):
+            cfg = GeoJSONVectorSourceConfig(
+                uri=self.uri,
+                class_id_to_filter=class_id_to_filter,
+                default_class_id=None,
+                stream=stream)
+            source = cfg.build(
+                class_config, DoubleCRSTransformer(), extent=extent)
+            return source.get_geojson(to_map_coords=to_map_coords)
+
+        for to_map_coords in [False, True]:
+            exp_geojson = get_geojson(False, to_map_coords=to_map_coords)
+            self.assertEqual(len(exp_geojson['features']), 13)
+            stream_geojson = get_geojson(True, to_map_coords=to_map_coords)
+            self.assertEqual(len(stream_geojson['features']), 13)
+            for f, exp_f in zip(stream_geojson['features'],
+                                exp_geojson['features']):
+                self.assertEqual(f['properties'], exp_f['properties'])
+                self.assertTrue(
+                    shape(f['geometry']).equals(shape(exp_f['geometry'])))
+
+        # Only features that intersect the extent are kept.
+        extent = Box(0, 0, 100, 100)
+        stream_geojson = get_geojson(True, extent=extent)
+        self.assertEqual(len(stream_geojson['features']), 3)
+        for f in stream_geojson['features']:
+            self.assertTrue(
+                shape(f['geometry']).intersects(extent.to_shapely()))
+
+    def test_stream_crs_field(self):
+        geojson = {
+            'type': 'FeatureCollection',
+            'features': [],
+            'crs': 'epsg:3857'
+        }
+        json_to_file(geojson, self.uri)
+        cfg = GeoJSONVectorSourceConfig(
+            uri=self.uri, default_class_id=0, stream=True)
+        source = cfg.build(ClassConfig(names=['a']), IdentityCRSTransformer())
+        with self.assertRaises(Exception):
+            source.get_geojson()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -48,6 +48,29 @@ class TestChipClassificationEvaluator(unittest.TestCase):
             for item in overall:
                 self.assertEqual(item['f1'], 1.0)
 
+    def test_aoi_cache(self):
+        class_config = ClassConfig(names=['car', 'building', 'background'])
+        raster_source_uri = data_file_path('evaluator/cc-label-img-blank.tif')
+        aoi_uri = data_file_path('evaluator/cc-label-aoi.json')
+
+        with rv_config.get_tmp_dir() as tmp_dir:
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            s = SceneConfig.construct(
+                id='test',
+                raster_source=RasterioSourceConfig(uris=[raster_source_uri]),
+                label_source=None,
+                label_store=None,
+                aoi_uris=[aoi_uri],
+                aoi_cache_dir=cache_dir)
+            exp_polygons = s.build(class_config, tmp_dir).aoi_polygons
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            polygons = s.build(class_config, tmp_dir).aoi_polygons
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            self.assertEqual(len(polygons), len(exp_polygons))
+            for p, exp_p in zip(polygons, exp_polygons):
+                self.assertTrue(p.equals(exp_p))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,7 +4,8 @@ import numpy as np
 
 from rastervision.core.data import ClassConfig
 from rastervision.core.evaluation import SemanticSegmentationEvaluation
-from rastervision.core.data import SemanticSegmentationLabelSource
+from rastervision.core.data import (SemanticSegmentationLabelSource,
+                                    SemanticSegmentationDenseLabels)
 from tests.core.data.mock_raster_source import MockRasterSource
 from tests import data_file_path
 
@@ -87,6 +88,48 @@ class TestSemanticSegmentationEvaluation(unittest.TestCase):
         self.assertAlmostEqual(1.0, eval.class_to_eval_item[0].f1)
         self.assertAlmostEqual(1.0, eval.avg_item.f1)
 
+    def test_compute_dense(self):
+        class_config = ClassConfig(names=['one', 'two'])
+        class_config.update()
+        class_config.ensure_null_class()
+        null_class_id = class_config.get_null_class_id()
+
+        gt_array = np.zeros((4, 4, 1), dtype=np.uint8)
+        gt_array[2, 2, 0] = 1
+        gt_array[0, 0, 0] = 2
+        gt_raster = MockRasterSource([0], 1)
+        gt_raster.set_raster(gt_array)
+        gt_label_source = SemanticSegmentationLabelSource(
+            gt_raster, null_class_id)
+        gt_labels = gt_label_source.get_labels()
+
+        p_array = np.zeros((4, 4, 1), dtype=np.uint8)
+        p_array[1, 1, 0] = 1
+        p_raster = MockRasterSource([0], 1)
+        p_raster.set_raster(p_array)
+        p_label_source = SemanticSegmentationLabelSource(
+            p_raster, null_class_id)
+        p_labels = p_label_source.get_labels()
+
+        eval = SemanticSegmentationEvaluation(class_config)
+        eval.compute(gt_labels, p_labels)
+
+        extent = p_raster.get_extent()
+        dense_gt_labels = SemanticSegmentationDenseLabels(extent, block_sz=3)
+        dense_gt_labels += gt_labels
+        dense_p_labels = SemanticSegmentationDenseLabels(extent, block_sz=3)
+        dense_p_labels += p_labels
+
+        for gt, pred in [(gt_labels, dense_p_labels),
+                         (dense_gt_labels, p_labels), (dense_gt_labels,
+                                                       dense_p_labels)]:
+            dense_eval = SemanticSegmentationEvaluation(class_config)
+            dense_eval.compute(gt, pred)
+            self.assertTrue(
+                np.array_equal(eval.avg_item.conf_mat,
+                               dense_eval.avg_item.conf_mat))
+            self.assertEqual(eval.avg_item.f1, dense_eval.avg_item.f1)
+
     def test_vector_compute(self):
         class_config = ClassConfig(names=['one', 'two'])
         class_config.update()
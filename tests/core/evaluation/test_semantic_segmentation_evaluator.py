@@ -1,4 +1,5 @@
 import unittest
+import os
 from os.path import join
 
 import numpy as np
@@ -60,7 +61,7 @@ class TestSemanticSegmentationEvaluator(unittest.TestCase):
         exp_eval_json = file_to_json(data_file_path('expected-eval.json'))
         self.assertDictEqual(eval_json, exp_eval_json)
 
-    def get_vector_scene(self, class_id, use_aoi=False):
+    def get_vector_scene(self, class_id, use_aoi=False, cache_dir=None):
         gt_uri = data_file_path('{}-gt-polygons.geojson'.format(class_id))
         pred_uri = data_file_path('{}-pred-polygons.geojson'.format(class_id))
 
@@ -73,7 +74,7 @@ class TestSemanticSegmentationEvaluator(unittest.TestCase):
 
         config = RasterizedSourceConfig(
             vector_source=GeoJSONVectorSourceConfig(
-                uri=gt_uri, default_class_id=0),
+                uri=gt_uri, default_class_id=0, cache_dir=cache_dir),
             rasterizer_config=RasterizerConfig(background_class_id=1))
         gt_rs = config.build(self.class_config, crs_transformer, extent)
         gt_ls = SemanticSegmentationLabelSource(gt_rs, self.null_class_id)
@@ -114,6 +115,27 @@ class TestSemanticSegmentationEvaluator(unittest.TestCase):
         # been manually verified to be) correct.
         self.assertDictEqual(vector_eval_json, exp_vector_eval_json)
 
+    def test_vector_evaluator_cache(self):
+        output_uri = join(self.tmp_dir.name, 'raster-out.json')
+        vector_output_uri = join(self.tmp_dir.name, 'vector-out.json')
+        cache_dir = join(self.tmp_dir.name, 'cache')
+        scenes = [
+            self.get_vector_scene(0, cache_dir=cache_dir),
+            self.get_vector_scene(1, cache_dir=cache_dir)
+        ]
+        evaluator = SemanticSegmentationEvaluator(
+            self.class_config, output_uri, vector_output_uri)
+        evaluator.process(scenes, self.tmp_dir.name)
+        # The ground truth and predictions of both scenes are cached.
+        self.assertEqual(len(os.listdir(cache_dir)), 4)
+
+        evaluator.process(scenes, self.tmp_dir.name)
+        self.assertEqual(len(os.listdir(cache_dir)), 4)
+        vector_eval_json = file_to_json(vector_output_uri)
+        exp_vector_eval_json = file_to_json(
+            data_file_path('expected-vector-eval.json'))
+        self.assertDictEqual(vector_eval_json, exp_vector_eval_json)
+
     def test_vector_evaluator_with_aoi(self):
         output_uri = join(self.tmp_dir.name, 'raster-out.json')
         vector_output_uri = join(self.tmp_dir.name, 'vector-out.json')
@@ -0,0 +1,23 @@
+import unittest
+
+from rastervision.pipeline.config import ConfigError
+from rastervision.core.rv_pipeline import ChipClassificationConfig
+
+
+class TestChipClassificationConfig(unittest.TestCase):
+    def test_validate_config(self):
+        ChipClassificationConfig.construct().validate_config()
+        invalid_values = [
+            ('predict_chip_sz', 100),
+            ('predict_num_workers', -1),
+            ('predict_queue_depth', 0),
+            ('chip_workers', -1),
+        ]
+        for field, value in invalid_values:
+            config = ChipClassificationConfig.construct(**{field: value})
+            with self.assertRaises(ConfigError):
+                config.validate_config()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.data import SemanticSegmentationLabels
+from rastervision.core.rv_pipeline.rv_pipeline import RVPipeline
+
+from tests.core.data.mock_raster_source import MockRasterSource
+
+
+class StubBackend():
+    """Predicts labels that are a function of the chip."""
+
+    def predict(self, chips, windows):
+        labels = SemanticSegmentationLabels()
+        for chip, window in zip(chips, windows):
+            labels.set_label_arr(window, chip.argmax(axis=2))
+        return labels
+
+
+class TestPredictScene(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(1234)
+        raster = np.random.randint(0, 256, (40, 50, 3), dtype=np.uint8)
+        raster_source = MockRasterSource([0, 1, 2], 3)
+        raster_source.set_raster(raster)
+        raster_source.mock.get_extent.return_value = Box(0, 0, 40, 50)
+        self.scene = SimpleNamespace(
+            raster_source=raster_source,
+            prediction_label_store=SimpleNamespace(
+                empty_labels=SemanticSegmentationLabels))
+        self.raster = raster
+
+    def predict_scene(self, predict_num_workers):
+        config = SimpleNamespace(
+            predict_chip_sz=10,
+            predict_batch_sz=3,
+            predict_num_workers=predict_num_workers,
+            predict_queue_depth=2)
+        pipeline = RVPipeline(config, '/tmp')
+        return pipeline.predict_scene(self.scene, StubBackend())
+
+    def test_prefetch(self):
+        labels = self.predict_scene(0)
+        windows = labels.get_windows()
+        self.assertEqual(len(windows), 20)
+        for window in windows:
+            np.testing.assert_equal(
+                labels.get_label_arr(window),
+                self.raster[window.ymin:window.ymax, window.xmin:window.xmax]
+                .argmax(axis=2))
+        for predict_num_workers in [1, 3]:
+            self.assertEqual(self.predict_scene(predict_num_workers), labels)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.data import ClassConfig, SemanticSegmentationLabels
+from rastervision.core.rv_pipeline.semantic_segmentation import (
+    SemanticSegmentation)
+from rastervision.core.rv_pipeline.semantic_segmentation_config import (
+    SemanticSegmentationPredictOptions)
+
+from tests.core.data.mock_raster_source import MockRasterSource
+
+
+class StubBackend():
+    """Predicts class scores that are a function of the chip."""
+
+    def predict(self, chips, windows):
+        labels = SemanticSegmentationLabels()
+        for chip, window in zip(chips, windows):
+            scores = chip[..., 0:2].transpose(2, 0, 1).astype(np.float32)
+            scores /= scores.sum(axis=0, keepdims=True) + 1
+            labels.set_label_arr(window, scores.argmax(axis=0))
+            labels.set_score_arr(window, scores)
+        return labels
+
+
+class TestPredictScene(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(1234)
+        # Windows at the edge of the extent read the zero padding.
+        raster = np.zeros((60, 60, 3), dtype=np.uint8)
+        raster[0:45, 0:37] = np.random.randint(1, 256, (45, 37, 3))
+        raster[0:10, 0:10] = 0
+        raster_source = MockRasterSource([0, 1, 2], 3)
+        raster_source.set_raster(raster)
+        raster_source.mock.get_extent.return_value = Box(0, 0, 45, 37)
+        self.scene = SimpleNamespace(
+            raster_source=raster_source,
+            prediction_label_store=SimpleNamespace(
+                empty_labels=SemanticSegmentationLabels))
+
+    def predict_scene(self, smooth, predict_num_workers):
+        class_config = ClassConfig(names=['a', 'b'], null_class='a')
+        config = SimpleNamespace(
+            dataset=SimpleNamespace(class_config=class_config),
+            predict_options=SemanticSegmentationPredictOptions(
+                stride=5, smooth=smooth),
+            predict_chip_sz=10,
+            predict_batch_sz=3,
+            predict_num_workers=predict_num_workers,
+            predict_queue_depth=2)
+        pipeline = SemanticSegmentation(config, '/tmp')
+        return pipeline.predict_scene(self.scene, StubBackend())
+
+    def test_prefetch(self):
+        for smooth in [False, True]:
+            labels = self.predict_scene(smooth, 0)
+            for predict_num_workers in [1, 3]:
+                prefetch_labels = self.predict_scene(smooth,
+                                                     predict_num_workers)
+                self.assertEqual(labels, prefetch_labels)
+            extent = Box(0, 0, 45, 37)
+            if smooth:
+                label_arr = labels.get_label_arr(extent)
+                np.testing.assert_equal(label_arr[0:10, 0:10], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
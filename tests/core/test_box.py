@@ -1,7 +1,7 @@
 import unittest
 
 import numpy as np
-from shapely.geometry import box as ShapelyBox
+from shapely.geometry import box as ShapelyBox, Polygon
 
 from rastervision.core.box import Box, BoxSizeError
 
@@ -195,6 +195,47 @@ class TestBox(unittest.TestCase):
             [window.tuple_format() for window in expected_windows])
         self.assertSetEqual(windows, expected_windows)
 
+    def test_filter_by_aoi(self):
+        windows = Box(0, 0, 100, 100).get_windows(10, 5)
+        aoi_polygons = [
+            Box(0, 0, 30, 30).to_shapely(),
+            Box(20, 20, 60, 50).to_shapely(),
+            Polygon([(50, 50), (100, 50), (100, 100)]),
+            Box(0, 0, 30, 30).to_shapely().buffer(-1)
+        ]
+        filtered_windows = Box.filter_by_aoi(windows, aoi_polygons)
+
+        expected_windows = []
+        for window in windows:
+            w = window.to_shapely()
+            if any(w.within(p) for p in aoi_polygons):
+                expected_windows.append(window)
+        self.assertTrue(len(expected_windows) > 0)
+        self.assertListEqual(filtered_windows, expected_windows)
+
+        self.assertListEqual(Box.filter_by_aoi(windows, []), [])
+
+        windows_arr = Box(0, 0, 100, 100).get_windows_array(10, 5)
+        filtered_arr = Box.filter_by_aoi(windows_arr, aoi_polygons)
+        self.assertListEqual(Box.from_npboxes(filtered_arr), expected_windows)
+        self.assertEqual(Box.filter_by_aoi(windows_arr, []).shape, (0, 4))
+
+    def test_get_windows_array(self):
+        extent = Box(0, 0, 25, 35)
+        windows_arr = extent.get_windows_array(10, 8)
+        self.assertEqual(windows_arr.shape, (4 * 5, 4))
+        self.assertListEqual(
+            Box.from_npboxes(windows_arr), extent.get_windows(10, 8))
+        self.assertListEqual(
+            list(extent.iter_windows(10, 8)), extent.get_windows(10, 8))
+
+        windows_arr = extent.get_windows_array(10, 10, padding=5)
+        np.testing.assert_array_equal(windows_arr[0], [-5, -5, 5, 5])
+        np.testing.assert_array_equal(windows_arr[-1], [25, 35, 35, 45])
+        self.assertListEqual(
+            list(extent.iter_windows(10, 10, padding=5)),
+            Box.from_npboxes(windows_arr))
+
 
 if __name__ == '__main__':
     unittest.main()
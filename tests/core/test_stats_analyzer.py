@@ -2,10 +2,13 @@ import unittest
 import os
 
 import numpy as np
+import rasterio
 
 from rastervision.pipeline import rv_config
-from rastervision.core.raster_stats import RasterStats, chip_sz
-from rastervision.core.data import Scene
+from rastervision.pipeline.file_system import file_to_json
+from rastervision.core.raster_stats import (RasterStats, chip_sz,
+                                            get_histograms_uri)
+from rastervision.core.data import Scene, RasterioSourceConfig
 from rastervision.core.analyzer import StatsAnalyzerConfig
 from tests.core.data.mock_raster_source import MockRasterSource
 
@@ -69,6 +72,68 @@ class TestStatsAnalyzer(unittest.TestCase):
     def test_sliding(self):
         self._test(is_random=False)
 
+    def test_nodata_count(self):
+        # Each chip has a different fraction of NODATA pixels, so NODATA must
+        # not be counted for the weighting of chips to be right.
+        rs = MockRasterSource([0], 1)
+        img = np.full((600, 600, 1), 10.)
+        img[0:300, 0:300, :] = 2.
+        img[0:300, 0:200, :] = np.nan
+        img[300:600, 0:300, :] = 0
+        img[300:600, 0:100, :] = 4.
+        rs.set_raster(img)
+
+        stats = RasterStats()
+        stats.compute([rs])
+        vals = img[~np.isnan(img) & (img != 0)]
+        np.testing.assert_array_almost_equal(stats.means, [np.mean(vals)])
+        np.testing.assert_array_almost_equal(stats.stds, [np.std(vals)])
+
+    def test_parallel_histogram(self):
+        stats_uri = os.path.join(self.tmp_dir.name, 'stats.json')
+        img_path = os.path.join(self.tmp_dir.name, 'img.tif')
+        np.random.seed(1)
+        img = np.random.randint(0, 1000, (400, 500, 3)).astype(np.uint16)
+        with rasterio.open(
+                img_path,
+                'w',
+                driver='GTiff',
+                height=400,
+                width=500,
+                count=3,
+                dtype=np.uint16) as dataset:
+            dataset.write(img.transpose((2, 0, 1)))
+        scenes = []
+        for i in range(2):
+            rs = RasterioSourceConfig(uris=[img_path]).build(self.tmp_dir.name)
+            scenes.append(Scene(str(i), rs))
+
+        analyzer = StatsAnalyzerConfig(
+            output_uri=stats_uri,
+            sample_prob=None,
+            num_workers=2,
+            histogram=True,
+            percentiles=[50, 99]).build()
+        analyzer.process(scenes, self.tmp_dir.name)
+
+        stats = RasterStats.load(stats_uri)
+        histograms = file_to_json(get_histograms_uri(stats_uri))
+        for channel in range(img.shape[2]):
+            vals = img[:, :, channel]
+            vals = vals[vals != 0]
+            self.assertAlmostEqual(stats.means[channel], np.mean(vals))
+            self.assertAlmostEqual(stats.stds[channel], np.std(vals))
+            self.assertEqual(stats.percentiles['50'][channel],
+                             np.percentile(vals, 50, interpolation='lower'))
+            self.assertEqual(stats.percentiles['99'][channel],
+                             np.percentile(vals, 99, interpolation='lower'))
+
+            exp_values, exp_counts = np.unique(vals, return_counts=True)
+            self.assertListEqual(histograms[channel]['values'],
+                                 exp_values.tolist())
+            self.assertListEqual(histograms[channel]['counts'],
+                                 (exp_counts * 2).tolist())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,244 @@
+import unittest
+from os.path import join
+import glob
+import io
+import zipfile
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+import rasterio
+
+from rastervision.core.box import Box
+from rastervision.core.data import (ClassConfig, DatasetConfig,
+                                    RasterioSourceConfig, SceneConfig,
+                                    SemanticSegmentationLabelSourceConfig)
+from rastervision.core.data.label import SemanticSegmentationLabels
+from rastervision.core.data_sample import DataSample
+from rastervision.core.rv_pipeline import (SemanticSegmentationConfig,
+                                           SemanticSegmentationChipOptions,
+                                           SemanticSegmentationWindowMethod)
+from rastervision.pipeline import rv_config
+from rastervision.pytorch_backend import PyTorchSemanticSegmentationConfig
+from rastervision.pytorch_backend.pytorch_semantic_segmentation import (
+    PyTorchSemanticSegmentationSampleWriter)
+from rastervision.pytorch_learner import (SemanticSegmentationModelConfig,
+                                          SolverConfig)
+from rastervision.pytorch_learner.chip_shards import ChipShardDataset
+from rastervision.pytorch_learner.semantic_segmentation_learner import (
+    SemanticSegmentationDataset, SemanticSegmentationShardDataset)
+from rastervision.pytorch_learner.zip_reader import ZipReader
+
+
+class TestPyTorchSemanticSegmentationSampleWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir_obj = rv_config.get_tmp_dir()
+        self.tmp_dir = self.tmp_dir_obj.name
+        self.class_config = ClassConfig(names=['a', 'b'])
+
+    def tearDown(self):
+        self.tmp_dir_obj.cleanup()
+
+    def make_samples(self, nb_samples):
+        samples = []
+        for i in range(nb_samples):
+            window = Box(0, i * 10, 10, i * 10 + 10)
+            labels = SemanticSegmentationLabels()
+            labels.set_label_arr(window, np.random.randint(0, 2, (10, 10)))
+            chip = np.random.randint(0, 256, (10, 10, 3), dtype=np.uint8)
+            samples.append(
+                DataSample(
+                    chip=chip,
+                    window=window,
+                    labels=labels,
+                    scene_id='s',
+                    is_train=i % 2 == 0))
+        return samples
+
+    def write_samples(self, samples, **kwargs):
+        output_uri = join(self.tmp_dir, 'out', 'chips.zip')
+        writer = PyTorchSemanticSegmentationSampleWriter(
+            output_uri, self.class_config, self.tmp_dir, **kwargs)
+        with writer:
+            for sample in samples:
+                writer.write_sample(sample)
+        return output_uri
+
+    def test_write_samples(self):
+        samples = self.make_samples(9)
+        for num_encode_workers in [0, 2]:
+            output_uri = self.write_samples(
+                samples,
+                png_compress_level=1,
+                num_encode_workers=num_encode_workers)
+            with zipfile.ZipFile(output_uri) as zf:
+                infos = zf.infolist()
+                self.assertEqual(len(infos), 2 * len(samples))
+                for info in infos:
+                    self.assertEqual(info.compress_type, zipfile.ZIP_STORED)
+                for ind, sample in enumerate(samples):
+                    split = 'train' if sample.is_train else 'valid'
+                    img_path = '{}/img/s-{}.png'.format(split, ind)
+                    labels_path = '{}/labels/s-{}.png'.format(split, ind)
+                    img = Image.open(io.BytesIO(zf.read(img_path)))
+                    label_arr = Image.open(io.BytesIO(zf.read(labels_path)))
+                    np.testing.assert_equal(np.array(img), sample.chip)
+                    np.testing.assert_equal(
+                        np.array(label_arr),
+                        sample.labels.get_label_arr(sample.window))
+
+    def test_read_zip(self):
+        samples = self.make_samples(4)
+        output_uri = self.write_samples(samples)
+        zip_reader = ZipReader(output_uri)
+
+        ds = SemanticSegmentationDataset('train', zip_reader=zip_reader)
+        self.assertEqual(ds.img_paths,
+                         ['train/img/s-0.png', 'train/img/s-2.png'])
+        for ind, sample in zip(range(len(ds)), samples[::2]):
+            img, label_arr = ds.load_sample(ind)
+            np.testing.assert_equal(img, sample.chip)
+            np.testing.assert_equal(label_arr,
+                                    sample.labels.get_label_arr(sample.window))
+
+        output_uri = self.write_samples(samples, use_shards=True)
+        ds = SemanticSegmentationShardDataset(
+            'valid/shards', zip_reader=ZipReader(output_uri))
+        img, label_arr = ds.load_sample(1)
+        np.testing.assert_equal(img, samples[3].chip)
+
+    def test_write_shards(self):
+        samples = self.make_samples(9)
+        output_uri = self.write_samples(samples, use_shards=True, shard_sz=2)
+        data_dir = join(self.tmp_dir, 'data')
+        with zipfile.ZipFile(output_uri) as zf:
+            zf.extractall(data_dir)
+
+        for split in ['train', 'valid']:
+            split_samples = [
+                s for s in samples if s.is_train == (split == 'train')
+            ]
+            shard_dir = join(data_dir, split, 'shards')
+            ds = ChipShardDataset(shard_dir)
+            self.assertEqual(len(ds), len(split_samples))
+            for ind, sample in enumerate(split_samples):
+                img, label_arr = ds[ind]
+                np.testing.assert_equal(img, sample.chip)
+                np.testing.assert_equal(
+                    label_arr, sample.labels.get_label_arr(sample.window))
+
+            x, y = SemanticSegmentationShardDataset(shard_dir)[0]
+            self.assertEqual(tuple(x.shape), (3, 10, 10))
+            self.assertEqual(tuple(y.shape), (10, 10))
+
+    def test_write_shards_uint16(self):
+        samples = self.make_samples(2)
+        for sample in samples:
+            sample.chip = np.random.randint(
+                0, 2**16, (10, 10, 5), dtype=np.uint16)
+        output_uri = self.write_samples(samples, use_shards=True)
+
+        ds = SemanticSegmentationShardDataset(
+            'train/shards', zip_reader=ZipReader(output_uri))
+        img, label_arr = ds.load_sample(0)
+        self.assertEqual(img.dtype, np.uint16)
+        np.testing.assert_equal(img, samples[0].chip)
+        # Chips are scaled to [0, 1] by the max value of uint16.
+        x, y = ds[0]
+        self.assertEqual(tuple(x.shape), (5, 10, 10))
+        np.testing.assert_allclose(
+            x.numpy(), samples[0].chip.transpose(2, 0, 1) / 65535, rtol=1e-6)
+
+
+class TestChip(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir_obj = rv_config.get_tmp_dir()
+        self.tmp_dir = self.tmp_dir_obj.name
+        self.img_uri = join(self.tmp_dir, 'img.tif')
+        self.labels_uri = join(self.tmp_dir, 'labels.tif')
+        self.write_tif(self.img_uri,
+                       np.random.randint(0, 256, (3, 50, 40), dtype=np.uint8))
+        self.write_tif(self.labels_uri,
+                       np.random.randint(0, 2, (1, 50, 40), dtype=np.uint8))
+
+    def tearDown(self):
+        self.tmp_dir_obj.cleanup()
+
+    def write_tif(self, path, arr):
+        with rasterio.open(
+                path,
+                'w',
+                driver='GTiff',
+                height=arr.shape[1],
+                width=arr.shape[2],
+                count=arr.shape[0],
+                dtype=arr.dtype) as dataset:
+            dataset.write(arr)
+
+    def make_scene(self, id):
+        return SceneConfig(
+            id=id,
+            raster_source=RasterioSourceConfig(uris=[self.img_uri]),
+            label_source=SemanticSegmentationLabelSourceConfig(
+                raster_source=RasterioSourceConfig(uris=[self.labels_uri])))
+
+    def make_config(self, chip_workers):
+        root_uri = join(self.tmp_dir, str(chip_workers))
+        cfg = SemanticSegmentationConfig(
+            root_uri=root_uri,
+            dataset=DatasetConfig(
+                class_config=ClassConfig(names=['a', 'b'], null_class='a'),
+                train_scenes=[self.make_scene('s')],
+                validation_scenes=[self.make_scene('v')]),
+            backend=PyTorchSemanticSegmentationConfig(
+                model=SemanticSegmentationModelConfig(),
+                solver=SolverConfig()),
+            train_chip_sz=10,
+            chip_options=SemanticSegmentationChipOptions(
+                window_method=SemanticSegmentationWindowMethod.sliding,
+                stride=10),
+            chip_workers=chip_workers)
+        cfg.update()
+        return cfg
+
+    def chip(self, chip_workers):
+        """Chip the scenes and return the sorted chips of each split."""
+        cfg = self.make_config(chip_workers)
+        cfg.build(self.tmp_dir).chip()
+
+        chips = {}
+        zip_path, = glob.glob(join(cfg.root_uri, 'chip', '*.zip'))
+        with zipfile.ZipFile(zip_path) as zf:
+            for split in ['train', 'valid']:
+                img_paths = [
+                    p for p in zf.namelist()
+                    if p.startswith('{}/img/'.format(split))
+                ]
+                # Chips are numbered in the order they are written, which
+                # depends on the workers, so they are compared by content.
+                chips[split] = sorted((zf.read(p),
+                                       zf.read(p.replace('/img/', '/labels/')))
+                                      for p in img_paths)
+        return chips
+
+    def test_chip_workers(self):
+        serial_chips = self.chip(0)
+        self.assertEqual(len(serial_chips['train']), 20)
+        self.assertEqual(len(serial_chips['valid']), 20)
+        # With 3 workers and 2 scenes, each scene is split into 2 ranges.
+        for chip_workers in [2, 3]:
+            self.assertEqual(self.chip(chip_workers), serial_chips)
+
+    def test_chip_workers_write_error(self):
+        # Workers stop making samples and the error of the writer is raised.
+        cfg = self.make_config(2)
+        with patch.object(
+                PyTorchSemanticSegmentationSampleWriter,
+                'write_sample',
+                side_effect=ValueError('write')):
+            with self.assertRaisesRegex(ValueError, 'write'):
+                cfg.build(self.tmp_dir).chip()
+
+
+if __name__ == '__main__':
+    unittest.main()
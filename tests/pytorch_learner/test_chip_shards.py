@@ -0,0 +1,92 @@
+import unittest
+import io
+import os
+from os.path import join
+import pickle
+
+import numpy as np
+
+from rastervision.pipeline import rv_config
+from rastervision.pytorch_learner.chip_shards import (
+    ChipShardWriter, ChipShardDataset, SHARD_DIR, _npy_header)
+
+
+class TestChipShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir_obj = rv_config.get_tmp_dir()
+        self.tmp_dir = self.tmp_dir_obj.name
+        self.writer_tmp_dir = join(self.tmp_dir, 'writer')
+        os.makedirs(self.writer_tmp_dir)
+
+    def tearDown(self):
+        self.tmp_dir_obj.cleanup()
+
+    def open_file(self, path):
+        path = join(self.tmp_dir, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return open(path, 'wb')
+
+    def test_label_arrays(self):
+        writer = ChipShardWriter(
+            self.open_file, self.writer_tmp_dir, shard_sz=3)
+        samples = []
+        for i in range(8):
+            # The chip size changes part way through a shard.
+            sz = 4 if i < 5 else 6
+            img = np.random.randint(0, 2**16, (sz, sz, 5), dtype=np.uint16)
+            label = np.random.randint(0, 3, (sz, sz), dtype=np.uint8)
+            writer.write('train', img, label)
+            samples.append((img, label))
+        writer.close()
+
+        shard_dir = join(self.tmp_dir, 'train', SHARD_DIR)
+        ds = ChipShardDataset(shard_dir)
+        self.assertEqual(len(ds), len(samples))
+        self.assertEqual([s['size'] for s in ds.shards], [3, 2, 3])
+        for ind, (img, label) in enumerate(samples):
+            ds_img, ds_label = ds[ind]
+            self.assertEqual(ds_img.dtype, np.uint16)
+            np.testing.assert_equal(ds_img, img)
+            np.testing.assert_equal(ds_label, label)
+        np.testing.assert_equal(ds[-1][0], samples[-1][0])
+
+        # Memory maps aren't pickled.
+        ds = pickle.loads(pickle.dumps(ds))
+        self.assertEqual(ds._arrays, {})
+        np.testing.assert_equal(ds[1][0], samples[1][0])
+
+    def test_targets(self):
+        writer = ChipShardWriter(
+            self.open_file, self.writer_tmp_dir, shard_sz=2)
+        samples = []
+        for split in ['train', 'valid']:
+            for i in range(3):
+                img = np.random.randint(0, 256, (4, 4, 3), dtype=np.uint8)
+                writer.write(split, img, i)
+                samples.append((split, img, i))
+        writer.close()
+
+        for split in ['train', 'valid']:
+            ds = ChipShardDataset(join(self.tmp_dir, split, SHARD_DIR))
+            split_samples = [s for s in samples if s[0] == split]
+            self.assertEqual(len(ds), len(split_samples))
+            for ind, (_, img, target) in enumerate(split_samples):
+                ds_img, ds_target = ds[ind]
+                np.testing.assert_equal(ds_img, img)
+                self.assertEqual(ds_target, target)
+        self.assertEqual(os.listdir(self.writer_tmp_dir), [])
+
+    def test_npy_header(self):
+        dtype = np.dtype(np.uint16)
+        size = len(_npy_header(dtype, (10**6, 4)))
+        for num_rows in range(200):
+            f = io.BytesIO(_npy_header(dtype, (num_rows, 4), size))
+            self.assertEqual(len(f.getvalue()), size)
+            self.assertEqual(np.lib.format.read_magic(f), (1, 0))
+            self.assertEqual(
+                np.lib.format.read_array_header_1_0(f),
+                ((num_rows, 4), False, dtype))
+
+
+if __name__ == '__main__':
+    unittest.main()
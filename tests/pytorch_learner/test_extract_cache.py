@@ -0,0 +1,103 @@
+import unittest
+import os
+from os.path import join, isdir, isfile, basename, dirname
+import zipfile
+
+from rastervision.pipeline import rv_config
+from rastervision.pytorch_learner.extract_cache import (ExtractCache,
+                                                        LOCK_PREFIX)
+
+
+class TestExtractCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir_obj = rv_config.get_tmp_dir()
+        self.tmp_dir = self.tmp_dir_obj.name
+        self.cache_dir = join(self.tmp_dir, 'cache')
+
+    def tearDown(self):
+        self.tmp_dir_obj.cleanup()
+
+    def make_zip(self, name, sz):
+        zip_path = join(self.tmp_dir, '{}.zip'.format(name))
+        with zipfile.ZipFile(zip_path, 'w') as zipf:
+            zipf.writestr('train/{}.txt'.format(name), 'x' * sz)
+        return zip_path
+
+    def test_reuse(self):
+        zip_path = self.make_zip('a', 10)
+        data_dir = ExtractCache(self.cache_dir, 100).get(
+            's3://a.zip', zip_path)
+        with open(join(data_dir, 'train', 'a.txt')) as f:
+            self.assertEqual(f.read(), 'x' * 10)
+
+        # A new cache object reuses the entry.
+        os.remove(join(data_dir, 'train', 'a.txt'))
+        cache = ExtractCache(self.cache_dir, 100)
+        self.assertEqual(cache.get('s3://a.zip', zip_path), data_dir)
+        self.assertEqual(os.listdir(join(data_dir, 'train')), [])
+
+        # A different URI or a changed zip file is a different entry.
+        self.assertNotEqual(cache.get('s3://b.zip', zip_path), data_dir)
+        os.utime(zip_path, ns=(0, 0))
+        self.assertNotEqual(cache.get('s3://a.zip', zip_path), data_dir)
+
+    def test_evict(self):
+        zip_paths = [self.make_zip(name, 40) for name in 'abc']
+        data_dirs = []
+        for zip_path in zip_paths:
+            cache = ExtractCache(self.cache_dir, 100)
+            data_dirs.append(cache.get(zip_path, zip_path))
+            cache.close()
+        # a was evicted to make room for c.
+        self.assertFalse(isdir(data_dirs[0]))
+        self.assertTrue(isdir(data_dirs[1]))
+        self.assertTrue(isdir(data_dirs[2]))
+
+        # Using b makes c the least recently used.
+        os.utime(join(data_dirs[1], '..', 'meta.json'), (1e9 + 1, 1e9 + 1))
+        os.utime(join(data_dirs[2], '..', 'meta.json'), (1e9, 1e9))
+        cache = ExtractCache(self.cache_dir, 100)
+        cache.get(zip_paths[0], zip_paths[0])
+        cache.close()
+        self.assertTrue(isdir(data_dirs[1]))
+        self.assertFalse(isdir(data_dirs[2]))
+
+        # Entries used by the same cache object aren't evicted.
+        cache = ExtractCache(self.cache_dir, 100)
+        cache.get(zip_paths[1], zip_paths[1])
+        cache.get(zip_paths[0], zip_paths[0])
+        cache.get(zip_paths[2], zip_paths[2])
+        self.assertTrue(isdir(data_dirs[1]))
+        self.assertEqual(
+            len([fn for fn in os.listdir(self.cache_dir) if fn[0] != '.']), 3)
+
+        # Zip files larger than the cache aren't cached.
+        zip_path = self.make_zip('d', 200)
+        self.assertIsNone(cache.get(zip_path, zip_path))
+        cache.close()
+
+    def test_evict_locked(self):
+        zip_paths = [self.make_zip(name, 40) for name in 'abc']
+        # Entries in use by another job aren't evicted until it is done with
+        # them.
+        other_cache = ExtractCache(self.cache_dir, 100)
+        data_dir = other_cache.get(zip_paths[0], zip_paths[0])
+        cache = ExtractCache(self.cache_dir, 100)
+        cache.get(zip_paths[1], zip_paths[1])
+        cache.close()
+        cache.get(zip_paths[2], zip_paths[2])
+        self.assertTrue(isdir(data_dir))
+
+        other_cache.close()
+        cache.get(zip_paths[1], zip_paths[1])
+        self.assertFalse(isdir(data_dir))
+        key = basename(dirname(data_dir))
+        self.assertFalse(isfile(join(self.cache_dir, LOCK_PREFIX + key)))
+
+        # An evicted entry can be extracted again.
+        data_dir = other_cache.get(zip_paths[0], zip_paths[0])
+        self.assertTrue(isdir(data_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import os
+from os.path import join
+import pickle
+
+import numpy as np
+from PIL import Image
+
+from rastervision.pipeline import rv_config
+from rastervision.pytorch_learner.sample_cache import SampleCache
+from rastervision.pytorch_learner.semantic_segmentation_learner import (
+    SemanticSegmentationDataset)
+
+
+class TestSampleCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir_obj = rv_config.get_tmp_dir()
+        self.tmp_dir = self.tmp_dir_obj.name
+        self.imgs = [
+            np.random.randint(0, 256, (4, 4, 3), dtype=np.uint8)
+            for _ in range(4)
+        ]
+        self.imgs[3] = self.imgs[3][:2]
+        self.loaded_inds = []
+
+    def tearDown(self):
+        self.tmp_dir_obj.cleanup()
+
+    def load_fn(self, ind):
+        self.loaded_inds.append(ind)
+        return self.imgs[ind], np.full((4, 4), ind, dtype=np.uint8)
+
+    def test_get(self):
+        cache = SampleCache(join(self.tmp_dir, 'cache'))
+        cache.setup(len(self.imgs), self.load_fn)
+        self.assertEqual(self.loaded_inds, [0])
+
+        for ind in [0, 1, 1, 2, 3, 3]:
+            img, label = cache.get(ind, self.load_fn)
+            np.testing.assert_equal(img, self.imgs[ind])
+            np.testing.assert_equal(label, ind)
+        # The last sample has a different shape, so it isn't cached.
+        self.assertEqual(self.loaded_inds, [0, 1, 2, 3, 3])
+
+        # Returned arrays are copies.
+        img, _ = cache.get(1, self.load_fn)
+        img[:] = 0
+        np.testing.assert_equal(cache.get(1, self.load_fn)[0], self.imgs[1])
+
+        # Another process shares the cache.
+        cache = pickle.loads(pickle.dumps(cache))
+        self.assertIsNone(cache._arrays)
+        np.testing.assert_equal(cache.get(2, self.load_fn)[0], self.imgs[2])
+        self.assertEqual(self.loaded_inds, [0, 1, 2, 3, 3])
+
+    def test_empty(self):
+        cache = SampleCache(join(self.tmp_dir, 'cache'))
+        cache.setup(0, self.load_fn)
+        self.assertEqual(self.loaded_inds, [])
+
+    def test_semantic_segmentation_dataset(self):
+        data_dir = join(self.tmp_dir, 'data')
+        os.makedirs(join(data_dir, 'img'))
+        os.makedirs(join(data_dir, 'labels'))
+        for ind, img in enumerate(self.imgs[0:3]):
+            Image.fromarray(img).save(
+                join(data_dir, 'img', '{}.png'.format(ind)))
+            Image.fromarray(np.full((4, 4), ind, dtype=np.uint8)).save(
+                join(data_dir, 'labels', '{}.png'.format(ind)))
+
+        ds = SemanticSegmentationDataset(data_dir)
+        cache = SampleCache(join(self.tmp_dir, 'cache'))
+        cached_ds = SemanticSegmentationDataset(data_dir, sample_cache=cache)
+        for _ in range(2):
+            for ind in range(len(ds)):
+                x, y = ds[ind]
+                cached_x, cached_y = cached_ds[ind]
+                np.testing.assert_equal(cached_x.numpy(), x.numpy())
+                np.testing.assert_equal(cached_y.numpy(), y.numpy())
+        self.assertTrue(cache._filled.all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from os.path import join
+import io
+import pickle
+import zipfile
+
+import numpy as np
+from PIL import Image
+
+from rastervision.pipeline import rv_config
+from rastervision.pytorch_learner.zip_reader import ZipReader
+from rastervision.pytorch_learner.chip_shards import (
+    ChipShardWriter, ChipShardDataset, SHARD_DIR)
+from rastervision.pytorch_learner.image_folder import ZipImageFolder
+
+
+class TestZipReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir_obj = rv_config.get_tmp_dir()
+        self.tmp_dir = self.tmp_dir_obj.name
+        self.zip_path = join(self.tmp_dir, 'data.zip')
+
+    def tearDown(self):
+        self.tmp_dir_obj.cleanup()
+
+    def write_png(self, zipf, path, arr):
+        buf = io.BytesIO()
+        Image.fromarray(arr).save(buf, format='png')
+        zipf.writestr(path, buf.getvalue())
+
+    def test_members(self):
+        with zipfile.ZipFile(self.zip_path, 'w') as zipf:
+            zipf.writestr('train/a/1.txt', b'1')
+            zipf.writestr('train/a/0.txt', b'0')
+            zipf.writestr('train/b.json', b'{}')
+            zipf.writestr(
+                'stored.bin', b'abc', compress_type=zipfile.ZIP_STORED)
+            zipf.writestr(
+                'deflated.bin', b'abc', compress_type=zipfile.ZIP_DEFLATED)
+
+        reader = ZipReader(self.zip_path)
+        self.assertTrue(reader.isdir('train'))
+        self.assertTrue(reader.isdir('train/a/'))
+        self.assertFalse(reader.isdir('valid'))
+        self.assertFalse(reader.isdir('train/b.json'))
+        self.assertEqual(
+            reader.list_paths('train'),
+            ['train/a/0.txt', 'train/a/1.txt', 'train/b.json'])
+        self.assertEqual(reader.list_paths('train', '.json'), ['train/b.json'])
+        self.assertEqual(reader.read('train/a/1.txt'), b'1')
+        self.assertEqual(reader.open('train/a/0.txt').read(), b'0')
+
+        offset = reader.get_data_offset('stored.bin')
+        with open(self.zip_path, 'rb') as f:
+            f.seek(offset)
+            self.assertEqual(f.read(3), b'abc')
+        with self.assertRaises(ValueError):
+            reader.get_data_offset('deflated.bin')
+
+        reader = pickle.loads(pickle.dumps(reader))
+        self.assertIsNone(reader._zipf)
+        self.assertEqual(reader.read('train/b.json'), b'{}')
+
+    def test_shards(self):
+        with zipfile.ZipFile(self.zip_path, 'w') as zipf:
+            writer = ChipShardWriter(
+                lambda path: zipf.open(path, 'w', force_zip64=True),
+                self.tmp_dir,
+                shard_sz=2)
+            samples = {'train': [], 'valid': []}
+            for i in range(6):
+                # Chips of both splits are written while their shards are
+                # incomplete.
+                split = 'train' if i % 2 == 0 else 'valid'
+                img = np.random.randint(0, 256, (4, 4, 3), dtype=np.uint8)
+                label = np.random.randint(0, 2, (4, 4), dtype=np.uint8)
+                writer.write(split, img, label)
+                samples[split].append((img, label))
+            writer.close()
+
+        for split in ['train', 'valid']:
+            ds = ChipShardDataset(
+                join(split, SHARD_DIR), zip_reader=ZipReader(self.zip_path))
+            self.assertEqual(len(ds), len(samples[split]))
+            for ind, (img, label) in enumerate(samples[split]):
+                ds_img, ds_label = ds[ind]
+                np.testing.assert_equal(ds_img, img)
+                np.testing.assert_equal(ds_label, label)
+            self.assertIsInstance(ds._arrays['00000-img.npy'], np.memmap)
+
+    def test_image_folder(self):
+        imgs = [
+            np.random.randint(0, 256, (4, 4, 3), dtype=np.uint8)
+            for _ in range(3)
+        ]
+        with zipfile.ZipFile(self.zip_path, 'w') as zipf:
+            self.write_png(zipf, 'train/b/0.png', imgs[0])
+            self.write_png(zipf, 'train/a/1.png', imgs[1])
+            self.write_png(zipf, 'train/a/2.png', imgs[2])
+            zipf.writestr('train/a/notes.txt', b'')
+
+        reader = ZipReader(self.zip_path)
+        ds = ZipImageFolder(reader, 'train')
+        self.assertEqual(ds.classes, ['a', 'b'])
+        self.assertEqual(len(ds), 3)
+        img, target = ds[0]
+        np.testing.assert_equal(np.array(img), imgs[1])
+        self.assertEqual(target, 0)
+
+        ds = ZipImageFolder(reader, 'train', classes=['b', 'a', 'c'])
+        self.assertEqual([target for _, target in ds.samples], [1, 1, 0])
+        img, target = ds[2]
+        np.testing.assert_equal(np.array(img), imgs[0])
+        self.assertEqual(target, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()